@@ -6,55 +6,596 @@
 ##                                                                                                                                       ##
 ###########################################################################################################################################
 
-from os import getcwd, listdir
+from __future__ import annotations # Annotations naming pandas types mustn't import pandas when the function is defined.
+from os import getcwd, makedirs, replace as ReplaceFile, remove as RemoveFile, fsync, fstat, stat
+from os.path import exists, getsize, join as JoinPath, dirname
 import sys
+if sys.platform == 'win32': import msvcrt
+else: import fcntl
 import json
-import pandas as pd
-from unidecode import unidecode
-from datetime import datetime
-from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QTabWidget, QTableWidget, QGridLayout, QVBoxLayout, QHBoxLayout, QFormLayout,  QLabel, QScrollArea, QTableWidgetItem, QPushButton, QLineEdit, QDateEdit, QMessageBox
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QFont, QFontMetrics
-from pyautogui import size as ScreenSize
+import struct
+import mmap
+from hashlib import sha256
+from mimetypes import guess_type
+from uuid import uuid4
+from tempfile import gettempdir
+from bisect import bisect_left, insort
+from heapq import heapify, heappush, heappop
+from threading import Lock, RLock, Event
+from collections import Counter, OrderedDict, deque
+from copy import deepcopy
+from contextlib import contextmanager, nullcontext
+from functools import wraps, cache
+from importlib import import_module
+from importlib.util import find_spec
+from time import perf_counter, sleep
+from getpass import getuser
+from platform import node
+import cProfile
+import logging
+from logging.handlers import RotatingFileHandler
+from datetime import datetime, date, timedelta
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QTabWidget, QTableWidget, QTableView, QListView, QGridLayout, QVBoxLayout, QHBoxLayout, QFormLayout,  QLabel, QScrollArea, QTableWidgetItem, QPushButton, QLineEdit, QDateEdit, QMessageBox, QComboBox, QListWidget, QListWidgetItem, QProgressBar, QFileDialog, QDialog, QInputDialog, QStyle
+from PyQt6.QtCore import Qt, QSize, QTimer, QAbstractListModel, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal, QBuffer, QByteArray, QIODevice, QUrl
+from PyQt6.QtGui import QFont, QFontMetrics, QColor, QImage, QImageReader, QIcon, QPixmap, QDesktopServices
+
+# numpy, pandas and unidecode are only imported once something uses them, so the window can be on screen before they're loaded. On first use the stand-in
+# replaces itself in the module globals with the real thing.
+class LazyModule:
+    def __init__( self, module_name: str, global_name: str ) -> None:
+        self.module_name, self.global_name = module_name, global_name
+    def __getattr__( self, name: str ):
+        module = import_module( self.module_name )
+        globals()[ self.global_name ] = module
+        return getattr( module, name )
+
+np = LazyModule( 'numpy', 'np' )
+pd = LazyModule( 'pandas', 'pd' )
+msgpack = LazyModule( 'msgpack', 'msgpack' ) # Optional, only needed for binary snapshots.
+
+def unidecode( text: str ) -> str:
+    global unidecode
+    from unidecode import unidecode
+    return unidecode( text )
 
 app_name = 'MACOPLA - Aplicativo de Planejamento e Controle da Manutenção'
 folder_path = getcwd()
 script_path = folder_path[:1] + __file__[1:]
-script_name = script_path.rsplit( '\\', 1 )[-1]
-folder_files = tuple( file for file in listdir( folder_path ) if file != script_name )
+script_name = script_path.replace( '/', '\\' ).rsplit( '\\', 1 )[-1]
 main_db_name = 'Maintenance Database.json'
-main_db_preexists = main_db_name in folder_files
+def AppFilePath( name: str ) -> str:
+    return JoinPath( folder_path, name )
+workstation_name = f'{ getuser() }@{ node() }'
 
-for _ in range(2):
-    try:
-        with open( folder_path + '\\' + script_name[::-1].replace( '.py'[::-1], '.ini'[::-1], 1 )[::-1] ) as ini_file:
-            for line in ini_file.read().split('\n'):
-                line = line.split( '#', 1 )[0].strip()
-                if not '=' in line: continue
-                var, val = tuple( string.strip() for string in line.split( '=', 1 ) )
-                if var == 'app_lang': app_lang = val
-                if var == 'timezone': timezone = val
-                del line, var, val
-    except FileNotFoundError:
-        with open( folder_path + '\\' + script_name[::-1].replace( '.py'[::-1], '.ini'[::-1], 1 )[::-1], 'w' ) as ini_file:
-            ini_file.write( '# Language options: en-us, pt-br\napp_lang = en-us\ntimezone = sys_def' )
-    else: break
-
-if main_db_preexists:
-    try:
-        with open( folder_path + '\\' + main_db_name ) as data_file:
-            main_db = json.loads( data_file.read() )
-    except:
-        load_error_app = QApplication([])
-        load_error_dialog = QMessageBox()
-        load_error_dialog.setWindowTitle( 'Aviso' )
-        load_error_dialog.setText( 'Erro ao tentar carregar banco de dados JSON.' )
-        load_error_dialog.exec()
-        load_error_app.exec()
-else:
-    main_db = { 'machine_inv': dict() }
-
-ScreenWidth, ScreenHeight = ScreenSize()
+# Defaults until ReadConfig runs, right after the window is first shown.
+app_lang = 'en-us'
+timezone = 'sys_def'
+columnar_inventory = False
+instrumentation = False
+profiling = False
+snapshot_format = 'json'
+def ReadConfig() -> None:
+    global app_lang, timezone, columnar_inventory, instrumentation, profiling, snapshot_format, main_db_columns
+    for _ in range(2):
+        try:
+            with open( AppFilePath( script_name[::-1].replace( '.py'[::-1], '.ini'[::-1], 1 )[::-1] ) ) as ini_file:
+                for line in ini_file.read().split('\n'):
+                    line = line.split( '#', 1 )[0].strip()
+                    if not '=' in line: continue
+                    var, val = tuple( string.strip() for string in line.split( '=', 1 ) )
+                    if var == 'app_lang': app_lang = val
+                    if var == 'timezone': timezone = val
+                    if var == 'columnar_inventory': columnar_inventory = val.lower() in { 'on', 'true', 'yes', '1' }
+                    if var == 'instrumentation': instrumentation = val.lower() in { 'on', 'true', 'yes', '1' }
+                    if var == 'profiling': profiling = val.lower() in { 'on', 'true', 'yes', '1' }
+                    if var == 'snapshot_format': snapshot_format = val.lower()
+        except FileNotFoundError:
+            with open( AppFilePath( script_name[::-1].replace( '.py'[::-1], '.ini'[::-1], 1 )[::-1] ), 'w' ) as ini_file:
+                ini_file.write( '# Language options: en-us, pt-br\napp_lang = en-us\ntimezone = sys_def' )
+        else: break
+    diagnostics.Configure( instrumentation, profiling )
+    if snapshot_format not in { 'json', 'msgpack' } or ( snapshot_format == 'msgpack' and find_spec( 'msgpack' ) is None ): snapshot_format = 'json'
+    main_db_storage.snapshot_format = snapshot_format
+    if columnar_inventory and main_db_columns is None: main_db_columns = ColumnarInventory()
+
+# Opt-in through the ini file. Spans time the hot paths and go to a rotating JSON-lines log next to the database; counters and per-span totals feed the
+# diagnostics panel. When it's off, Span hands back a shared no-op context and Timed functions only check a flag, so next to nothing is paid for it.
+class Diagnostics:
+    log_max_bytes = 1 << 20
+    log_backups = 3
+    def __init__( self, log_path: str ) -> None:
+        self.enabled, self.log_path = False, log_path
+        self.lock = Lock()
+        self.counters, self.span_totals, self.recent_spans = Counter(), dict(), deque( maxlen = 200 )
+        self.null_span = nullcontext()
+        self.logger = None
+        self.profiler = None
+    def Configure( self, enabled: bool, profiling: bool ) -> None:
+        self.enabled = enabled or profiling
+        if profiling and not self.profiler:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+    def Log( self, entry: dict ) -> None:
+        if self.logger is None: # The log file is only opened once there's something to write.
+            self.logger = logging.getLogger( 'MaCoPlA.diagnostics' )
+            self.logger.propagate = False
+            self.logger.setLevel( logging.INFO )
+            self.logger.addHandler( RotatingFileHandler( self.log_path, maxBytes = self.log_max_bytes, backupCount = self.log_backups, encoding = 'utf-8' ) )
+        self.logger.info( json.dumps( entry, default = str ) )
+    def Span( self, name: str, **fields ):
+        return self.TimedSpan( name, fields ) if self.enabled else self.null_span
+    class TimedSpan:
+        __slots__ = ( 'name', 'fields', 'start' )
+        def __init__( self, name: str, fields: dict ) -> None:
+            self.name, self.fields = name, fields
+        def __enter__( self ):
+            self.start = perf_counter()
+            return self
+        def __exit__( self, exc_type, exc_value, traceback ) -> None:
+            diagnostics.EndSpan( self.name, ( perf_counter() - self.start ) * 1000, self.fields | ( { 'error': exc_type.__name__ } if exc_type else dict() ) )
+    def EndSpan( self, name: str, elapsed_ms: float, fields: dict ) -> None:
+        entry = { 'time': datetime.now().isoformat( timespec = 'milliseconds' ), 'span': name, 'ms': round( elapsed_ms, 3 ) } | fields
+        with self.lock:
+            count, total_ms, max_ms = self.span_totals.get( name, ( 0, 0.0, 0.0 ) )
+            self.span_totals[ name ] = ( count + 1, total_ms + elapsed_ms, max( max_ms, elapsed_ms ) )
+            self.recent_spans.append( entry )
+            self.Log( entry )
+    def Count( self, name: str, amount: int = 1 ) -> None:
+        if not self.enabled: return
+        with self.lock: self.counters[ name ] += amount
+    def Snapshot( self ) -> tuple[ dict, dict, list ]:
+        with self.lock: return dict( self.span_totals ), dict( self.counters ), list( self.recent_spans )
+    def SaveProfile( self, path: str ) -> None:
+        if not self.profiler: return
+        self.profiler.disable()
+        self.profiler.dump_stats( path )
+        self.profiler.enable()
+    def Close( self ) -> None:
+        if not self.enabled: return
+        with self.lock: self.Log( { 'time': datetime.now().isoformat( timespec = 'milliseconds' ), 'counters': dict( self.counters ) } )
+        self.SaveProfile( AppFilePath( main_db_name.rsplit( '.', 1 )[0] + '.prof' ) )
+
+diagnostics = Diagnostics( AppFilePath( 'MaCoPlA Diagnostics.jsonl' ) )
+
+def Timed( name: str, count: str | None = None ):
+    def Decorator( function ):
+        @wraps( function )
+        def TimedFunction( *args, **kwargs ):
+            if not diagnostics.enabled: return function( *args, **kwargs )
+            with diagnostics.Span( name ): result = function( *args, **kwargs )
+            if count and result is not None: diagnostics.Count( count )
+            return result
+        return TimedFunction
+    return Decorator
+
+# Held across processes, so workstations sharing the database folder take turns reading and appending to the journal.
+class FileLock:
+    def __init__( self, path: str ) -> None:
+        self.path = path
+        self.lock_file = None
+    def __enter__( self ):
+        self.lock_file = open( self.path, 'a+b' )
+        if sys.platform == 'win32':
+            while True: # msvcrt has no blocking lock without a timeout, and a compaction can take longer than its 10s.
+                try:
+                    self.lock_file.seek( 0 )
+                    msvcrt.locking( self.lock_file.fileno(), msvcrt.LK_NBLCK, 1 )
+                    break
+                except OSError: sleep( 0.05 )
+        else: fcntl.flock( self.lock_file.fileno(), fcntl.LOCK_EX )
+        return self
+    def __exit__( self, exc_type, exc_value, traceback ) -> None:
+        if sys.platform == 'win32':
+            self.lock_file.seek( 0 )
+            msvcrt.locking( self.lock_file.fileno(), msvcrt.LK_UNLCK, 1 )
+        else: fcntl.flock( self.lock_file.fileno(), fcntl.LOCK_UN )
+        self.lock_file.close()
+
+class SaveConflict( Exception ):
+    def __init__( self, changes: list[ dict ] ) -> None:
+        super().__init__( f'{ len( changes ) } pending changes touch records saved by another workstation after they were read.' )
+        self.changes = changes
+
+# Snapshots carry the version of their layout. Older ones are brought forward on load, one step at a time, by the migrations from their version on, and a
+# snapshot from a newer version is refused rather than misread.
+snapshot_schema_version = 1
+
+def MigrateSnapshot0( database: dict ) -> None:
+    # Version 0 predates record versions, every record starts at version 0.
+    database[ '_record_versions' ], database[ '_table_versions' ] = list(), dict()
+
+snapshot_migrations = ( MigrateSnapshot0, )
+
+def MigrateSnapshot( database: dict ) -> dict:
+    schema_version = database.pop( '_schema_version', 0 )
+    if schema_version > snapshot_schema_version: raise Exception( f'The database was saved with snapshot schema version { schema_version }, newer than this MaCoPlA.' )
+    for migration in snapshot_migrations[ schema_version: ]: migration( database )
+    return database
+
+# Optional binary snapshot, chosen with snapshot_format = msgpack in the ini file: a magic number and the schema version, then the index in MessagePack. Tables of
+# records are stored by column, each field name once and an array of values per field, about half the size of the JSON and quicker to decode. The details of
+# each machine are MessagePack too, while the journal stays JSON lines. Compaction writes whichever format is configured, which is also how a database goes back.
+snapshot_magic = b'MaCoPlA\x00'
+absent_field = object() # Decoded in place of the fields a record of a table doesn't have.
+
+def PackTable( table: dict[ str, dict ] ) -> dict:
+    field_names = list( dict.fromkeys( name for record in table.values() for name in record ) )
+    absent = msgpack.ExtType( 0, b'' )
+    return { 'keys': list( table ), 'fields': field_names, 'columns': [ [ record.get( name, absent ) for record in table.values() ] for name in field_names ], 'complete': all( len( record ) == len( field_names ) for record in table.values() ) }
+
+def UnpackTable( table: dict ) -> dict[ str, dict ]:
+    field_names, rows = table[ 'fields' ], zip( *table[ 'columns' ] )
+    if table[ 'complete' ]: return dict( zip( table[ 'keys' ], [ dict( zip( field_names, row ) ) for row in rows ] ) )
+    return dict( zip( table[ 'keys' ], [ { name: value for name, value in zip( field_names, row ) if value is not absent_field } for row in rows ] ) )
+
+def PackSnapshot( index: dict ) -> bytes:
+    is_table = lambda value: isinstance( value, dict ) and value and all( isinstance( record, dict ) and record for record in value.values() )
+    payload = { 'tables': { name: PackTable( value ) for name, value in index.items() if is_table( value ) }, 'values': { name: value for name, value in index.items() if not is_table( value ) } }
+    return snapshot_magic + struct.pack( '<H', snapshot_schema_version ) + msgpack.packb( payload )
+
+def UnpackSnapshot( snapshot_data: bytes ) -> dict:
+    schema_version, = struct.unpack_from( '<H', snapshot_data, len( snapshot_magic ) )
+    payload = msgpack.unpackb( memoryview( snapshot_data )[ len( snapshot_magic ) + 2: ], ext_hook = lambda code, data: absent_field )
+    database = payload[ 'values' ] | { name: UnpackTable( table ) for name, table in payload[ 'tables' ].items() }
+    database[ '_schema_version' ] = schema_version
+    return database
+
+# Saves append only the pending changes to the journal; once it outgrows a fraction of the snapshot it's compacted through a temp file and an atomic rename.
+# The snapshot is split in an index, parsed at startup, and a details file holding each machine's heavy fields, which are paged in by byte offset on demand.
+# Several workstations may share the files. Every journaled change carries a sequence number and a record's version is the number of the last change to it. Under
+# the lock file a save first pulls what the others appended since this one last read the journal, then refuses the pending changes made to records that have a newer
+# version than the one they were based on. A compaction restarts the journal with a header naming the new details generation, which tells the others to reload.
+class JournaledStorage:
+    detail_fields = ( 'spec_sheet', 'features_sheet', 'procedures_history' )
+    def __init__( self, snapshot_path: str, compaction_ratio: float = 0.5, min_compaction_bytes: int = 1 << 20 ) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + '.journal'
+        self.lock = FileLock( snapshot_path + '.lock' )
+        self.compaction_ratio, self.min_compaction_bytes = compaction_ratio, min_compaction_bytes
+        self.snapshot_format, self.stored_format = 'json', 'json' # The format compaction writes, and the one the files on disk are in.
+        self.pending_changes = list()
+        self.remote_changes = list()
+        self.previous_records = dict() # What the records pulled changes touched looked like before, for updating what's derived from them.
+        self.details_generation = None
+        self.details_index = dict()
+        self.snapshot_size = getsize( self.snapshot_path ) if exists( self.snapshot_path ) else 0
+        self.journal_size = 0 # Bytes of the journal read so far.
+        self.journal_generation, self.journal_signature = None, None
+        self.last_seq = 0
+        self.record_versions, self.table_versions = dict(), dict()
+    def DetailsPath( self, generation: int ) -> str:
+        return self.snapshot_path + f'.details.{ generation }'
+    def Load( self ) -> dict:
+        with self.lock: return self.LoadUnlocked()
+    def LoadUnlocked( self ) -> dict:
+        if exists( self.snapshot_path ):
+            with open( self.snapshot_path, 'rb' ) as data_file: snapshot_data = data_file.read()
+            self.stored_format = 'msgpack' if snapshot_data.startswith( snapshot_magic ) else 'json'
+            database = UnpackSnapshot( snapshot_data ) if self.stored_format == 'msgpack' else json.loads( snapshot_data )
+        else: database = { 'machine_inv': dict() }
+        MigrateSnapshot( database )
+        self.snapshot_size = getsize( self.snapshot_path ) if exists( self.snapshot_path ) else 0
+        self.details_generation = database.pop( '_details_generation', None )
+        self.details_index = { key: tuple( record.pop( '_details' ) ) for key, record in database[ 'machine_inv' ].items() if '_details' in record }
+        if self.details_generation is not None: self.snapshot_size += getsize( self.DetailsPath( self.details_generation ) )
+        self.record_versions = { tuple( entry[ :-1 ] ): entry[-1] for entry in database.pop( '_record_versions' ) }
+        self.table_versions = database.pop( '_table_versions' )
+        self.journal_size, self.journal_generation, self.last_seq = 0, None, 0
+        self.remote_changes.clear()
+        self.previous_records.clear()
+        self.ApplyChanges( database, self.ReadJournal() )
+        return database
+    def ReadJournal( self ) -> list[ dict ]:
+        # The changes appended since the journal was last read, from journal_size on. Sequence numbers and versions move past them.
+        changes = list()
+        if exists( self.journal_path ):
+            valid_bytes = self.journal_size
+            with open( self.journal_path, 'rb' ) as journal_file:
+                journal_file.seek( self.journal_size )
+                for line in journal_file:
+                    if not line.endswith( b'\n' ): break # Torn write from an interrupted save, everything after it is discarded.
+                    try: change = json.loads( line )
+                    except ValueError: break
+                    valid_bytes += len( line )
+                    if change[ 'op' ] == 'base': # Written first by Compact, every change up to this number is in the snapshot.
+                        self.last_seq = change[ 'seq' ]
+                        self.journal_generation = change[ 'generation' ]
+                        continue
+                    self.last_seq = change.setdefault( 'seq', self.last_seq + 1 ) # Journals written before there were sequence numbers count their lines.
+                    self.SetVersion( change[ 'path' ], self.last_seq )
+                    changes.append( change )
+            if valid_bytes != getsize( self.journal_path ):
+                with open( self.journal_path, 'r+b' ) as journal_file: journal_file.truncate( valid_bytes )
+            self.journal_size = valid_bytes
+        self.journal_signature = self.JournalSignature()
+        return changes
+    def ApplyChanges( self, database: dict, changes: list[ dict ] ) -> None:
+        for change in changes:
+            ApplyChange( database, change[ 'op' ], change[ 'path' ], change.get( 'value' ) )
+            self.ForgetDetails( change[ 'path' ] )
+    def JournalSignature( self ) -> tuple[ int, int ] | None:
+        try: journal_stat = stat( self.journal_path )
+        except FileNotFoundError: return None
+        return journal_stat.st_size, journal_stat.st_mtime_ns
+    def JournalGeneration( self ) -> int | None:
+        try:
+            with open( self.journal_path, 'rb' ) as journal_file: header = json.loads( journal_file.readline() )
+        except ( FileNotFoundError, ValueError ): return None
+        return header.get( 'generation' ) if header.get( 'op' ) == 'base' else None
+    def HasRemoteChanges( self ) -> bool:
+        # A single stat, cheap enough to poll. Saves made here update the signature, so only another workstation's writes show up.
+        return self.JournalSignature() != self.journal_signature
+    def SetVersion( self, path: list, seq: int ) -> None:
+        self.table_versions[ path[0] ] = seq
+        self.record_versions[ tuple( path[ :2 ] ) ] = seq
+    def RecordVersion( self, path: tuple | list ) -> int:
+        # Records never changed through the journal are at version 0. Replacing a whole table changes the version of every record in it.
+        if len( path ) == 1: return self.table_versions.get( path[0], 0 )
+        return max( self.record_versions.get( tuple( path[ :2 ] ), 0 ), self.record_versions.get( tuple( path[ :1 ] ), 0 ) )
+    def Synchronize( self, database: dict ) -> None:
+        with self.lock: self.PullUnlocked( database )
+    def PullUnlocked( self, database: dict ) -> None:
+        if not self.HasRemoteChanges(): return
+        if self.JournalGeneration() != self.journal_generation or ( getsize( self.journal_path ) if exists( self.journal_path ) else 0 ) < self.journal_size: return self.ReloadUnlocked( database )
+        changes = self.ReadJournal()
+        # Pending changes overlapping a pulled one are applied again, so main_db keeps showing what this workstation is about to save. Their values are copied
+        # first, main_db holds the same objects and the pulled changes may modify them.
+        pulled_records, pulled_tables = { tuple( change[ 'path' ][ :2 ] ) for change in changes }, { change[ 'path' ][0] for change in changes }
+        overlapping_changes = [ change for change in self.pending_changes if tuple( change[ 'path' ][ :2 ] ) in pulled_records or ( change[ 'path' ][0], ) in pulled_records or ( len( change[ 'path' ] ) == 1 and change[ 'path' ][0] in pulled_tables ) ]
+        for change in overlapping_changes:
+            if 'value' in change: change[ 'value' ] = deepcopy( change[ 'value' ] )
+        for table, record_key in dict.fromkeys( tuple( change[ 'path' ][ :2 ] ) for change in changes if len( change[ 'path' ] ) > 1 ):
+            if ( table, record_key ) in self.previous_records: continue # The oldest version not yet taken is the one to compare with.
+            if table == 'machine_inv' and record_key in self.details_index: self.PageInDetails( database, record_key )
+            self.previous_records[ ( table, record_key ) ] = deepcopy( database.get( table, dict() ).get( record_key ) )
+        self.ApplyChanges( database, changes )
+        self.ApplyChanges( database, overlapping_changes )
+        self.remote_changes += changes
+    def ReloadUnlocked( self, database: dict ) -> None:
+        # Another workstation compacted, so the changes it folded in can only be read back from the snapshot. The pending changes are applied over it.
+        reloaded_db = self.LoadUnlocked()
+        self.ApplyChanges( reloaded_db, self.pending_changes )
+        database.clear()
+        database.update( reloaded_db )
+        self.remote_changes.append( { 'op': 'reload', 'path': [] } )
+    def TakeRemoteChanges( self ) -> tuple[ list[ dict ], dict[ tuple, dict | None ] ]:
+        # The pulled changes, and the records they touched as they were before.
+        remote_changes, self.remote_changes, previous_records, self.previous_records = self.remote_changes, list(), self.previous_records, dict()
+        return remote_changes, previous_records
+    def ForgetDetails( self, path: list ) -> None:
+        # A whole machine record replaced or removed no longer owns the details stored for its key.
+        if len( path ) <= 2 and path[0] == 'machine_inv':
+            if len( path ) == 1: self.details_index.clear()
+            else: self.details_index.pop( path[1], None )
+    def EncodeDetails( self, details: dict ) -> bytes:
+        return msgpack.packb( details ) if self.snapshot_format == 'msgpack' else json.dumps( details ).encode()
+    def DecodeDetails( self, details_data: bytes ) -> dict:
+        return msgpack.unpackb( details_data ) if self.stored_format == 'msgpack' else json.loads( details_data )
+    def ReadDetails( self, key: str ) -> bytes:
+        offset, length = self.details_index[ key ]
+        with open( self.DetailsPath( self.details_generation ), 'rb' ) as details_file:
+            details_file.seek( offset )
+            return details_file.read( length )
+    def PageInDetails( self, database: dict, key: str ) -> dict:
+        record = database[ 'machine_inv' ][ key ]
+        if key in self.details_index:
+            for field, value in self.DecodeDetails( self.ReadDetails( key ) ).items(): record.setdefault( field, value ) # Values set through the journal take precedence.
+            del self.details_index[ key ]
+        return record
+    def ReadAllDetails( self, field: str ):
+        # One sequential pass over the details file for every machine still paged out, instead of a seek and an open per machine.
+        if self.details_generation is None: return
+        with open( self.DetailsPath( self.details_generation ), 'rb' ) as details_file:
+            for key, ( offset, length ) in sorted( self.details_index.items(), key = lambda item: item[1][0] ):
+                details_file.seek( offset )
+                yield key, self.DecodeDetails( details_file.read( length ) ).get( field )
+    def RecordSet( self, path: tuple, value ) -> None:
+        # Each change remembers the version of the record it was made on, the one main_db shows right now.
+        self.ForgetDetails( list( path ) )
+        self.pending_changes.append( { 'op': 'set', 'path': list( path ), 'value': value, 'base': self.RecordVersion( path ) } )
+    def RecordDelete( self, path: tuple ) -> None:
+        self.ForgetDetails( list( path ) )
+        self.pending_changes.append( { 'op': 'del', 'path': list( path ), 'base': self.RecordVersion( path ) } )
+    def HasPendingChanges( self ) -> bool:
+        return bool( self.pending_changes )
+    def Conflicts( self ) -> list[ dict ]:
+        return [ change for change in self.pending_changes if self.RecordVersion( change[ 'path' ] ) > change[ 'base' ] ]
+    def Overwrite( self, changes: list[ dict ] ) -> None:
+        # The conflicting changes are rebased on the current versions, so the next commit saves them over the other workstation's.
+        for change in changes: change[ 'base' ] = self.RecordVersion( change[ 'path' ] )
+    def Discard( self, database: dict, changes: list[ dict ] ) -> None:
+        discarded = { id( change ) for change in changes }
+        self.pending_changes = [ change for change in self.pending_changes if id( change ) not in discarded ]
+        with self.lock: self.ReloadUnlocked( database )
+    def Commit( self, database: dict ) -> int:
+        with self.lock:
+            self.PullUnlocked( database )
+            conflicts = self.Conflicts()
+            if conflicts: raise SaveConflict( conflicts )
+            if self.pending_changes:
+                first_seq = self.last_seq + 1
+                journal_chunk = ''.join( json.dumps( { name: value for name, value in change.items() if name != 'base' } | { 'seq': first_seq + change_idx, 'writer': workstation_name } ) + '\n' for change_idx, change in enumerate( self.pending_changes ) ).encode()
+                with open( self.journal_path, 'ab' ) as journal_file:
+                    journal_file.write( journal_chunk )
+                    journal_file.flush()
+                    fsync( journal_file.fileno() )
+                for change_idx, change in enumerate( self.pending_changes ): self.SetVersion( change[ 'path' ], first_seq + change_idx )
+                self.last_seq += len( self.pending_changes )
+                self.journal_size += len( journal_chunk )
+                self.journal_signature = self.JournalSignature()
+                diagnostics.Count( 'bytes_written', len( journal_chunk ) )
+                self.pending_changes.clear()
+            else: journal_chunk = b''
+            if self.journal_size > max( self.min_compaction_bytes, self.snapshot_size * self.compaction_ratio ): self.Compact( database )
+        return len( journal_chunk )
+    def SplitDetails( self, database: dict ) -> None:
+        # A database written before details had their own file carries all of them inline, and the journal would take long to reach half its size. It's
+        # compacted right away instead, and the details dropped from memory until a machine is opened.
+        with self.lock:
+            if self.details_generation is not None or not any( field in record for record in database[ 'machine_inv' ].values() for field in self.detail_fields ): return
+            self.PullUnlocked( database )
+            if self.details_generation is None: self.Compact( database, page_out = True ) # Unless another workstation just did.
+    @Timed( 'compact' )
+    def Compact( self, database: dict, page_out: bool = False ) -> None:
+        # Details go to a new generation file first, so the index rename is the single commit point. Replaying set/del changes is idempotent, so a crash before the journal is replaced is harmless.
+        new_generation = ( self.details_generation or 0 ) + 1
+        new_details_index = dict()
+        index = { name: value for name, value in database.items() if name != 'machine_inv' }
+        index[ 'machine_inv' ] = dict()
+        with open( self.DetailsPath( new_generation ), 'wb' ) as details_file:
+            offset = 0
+            for key, record in database[ 'machine_inv' ].items():
+                if key in self.details_index and not any( field in record for field in self.detail_fields ):
+                    details = self.ReadDetails( key ) # Never paged in, copied as raw bytes unless the format changes.
+                    if self.stored_format != self.snapshot_format: details = self.EncodeDetails( self.DecodeDetails( details ) )
+                else:
+                    if key in self.details_index: self.PageInDetails( database, key )
+                    details = self.EncodeDetails( { field: record[ field ] for field in self.detail_fields if field in record } )
+                details_file.write( details )
+                new_details_index[ key ] = ( offset, len( details ) )
+                index[ 'machine_inv' ][ key ] = { name: value for name, value in MachineRecord( key, record ).items() if name not in self.detail_fields } | { '_details': new_details_index[ key ] }
+                offset += len( details )
+            details_file.flush()
+            fsync( details_file.fileno() )
+        index[ '_details_generation' ] = new_generation
+        index[ '_record_versions' ], index[ '_table_versions' ] = [ [ *record_key, seq ] for record_key, seq in self.record_versions.items() ], self.table_versions
+        index_data = PackSnapshot( index ) if self.snapshot_format == 'msgpack' else json.dumps( { '_schema_version': snapshot_schema_version } | index ).encode()
+        with open( self.snapshot_path + '.tmp', 'wb' ) as temp_file:
+            temp_file.write( index_data )
+            temp_file.flush()
+            fsync( temp_file.fileno() )
+        ReplaceFile( self.snapshot_path + '.tmp', self.snapshot_path )
+        journal_header = json.dumps( { 'op': 'base', 'seq': self.last_seq, 'generation': new_generation } ) + '\n'
+        with open( self.journal_path + '.tmp', 'w' ) as temp_file:
+            temp_file.write( journal_header )
+            temp_file.flush()
+            fsync( temp_file.fileno() )
+        ReplaceFile( self.journal_path + '.tmp', self.journal_path )
+        # The previous generation is kept until the next compaction, other workstations read their paged-out details from it until they reload.
+        if self.details_generation is not None and exists( self.DetailsPath( self.details_generation - 1 ) ):
+            try: RemoveFile( self.DetailsPath( self.details_generation - 1 ) )
+            except OSError: pass # Still open somewhere, it's left behind.
+        # Records keep whatever was paged in, unless asked to page it out; everything else now points into the new details file.
+        if page_out:
+            for record in database[ 'machine_inv' ].values():
+                for field in self.detail_fields: record.pop( field, None )
+        self.details_index = { key: new_details_index[ key ] for key, record in database[ 'machine_inv' ].items() if not any( field in record for field in self.detail_fields ) }
+        self.details_generation, self.stored_format = new_generation, self.snapshot_format
+        self.snapshot_size, self.journal_size = len( index_data ) + offset, len( journal_header )
+        self.journal_generation, self.journal_signature = new_generation, self.JournalSignature()
+        diagnostics.Count( 'bytes_written', self.snapshot_size )
+        diagnostics.Count( 'compactions' )
+        self.pending_changes.clear()
+
+def ApplyChange( database: dict, op: str, path: list, value = None ) -> None:
+    container = database
+    for key in path[:-1]: container = container.setdefault( key, dict() )
+    if op == 'set': container[ path[-1] ] = value
+    elif op == 'del': container.pop( path[-1], None )
+    else: raise Exception( f'{ op } isn\'t a valid journal operation.' )
+
+main_db_storage = JournaledStorage( AppFilePath( main_db_name ) )
+main_db = { 'machine_inv': dict() } # Filled by MainWindow.LoadDatabase once the window is on screen.
+main_db_lock = RLock() # Held by the GUI thread while editing and by background jobs while reading main_db or its storage.
+
+def GetMachineDetails( key: str ) -> dict:
+    with main_db_lock: return MachineRecord( key, main_db_storage.PageInDetails( main_db, key ) )
+
+def SetRecord( path: tuple, value ) -> None:
+    with main_db_lock:
+        ApplyChange( main_db, 'set', path, value )
+        main_db_storage.RecordSet( path, value )
+
+def DeleteRecord( path: tuple ) -> None:
+    with main_db_lock:
+        ApplyChange( main_db, 'del', path )
+        main_db_storage.RecordDelete( path )
+
+def NewRecordKey() -> str:
+    # Random, not the next free number: other workstations may be adding records to the same table, and their keys must never collide with these.
+    return uuid4().hex
+
+# Attached files are stored once per content, named by their SHA-256, in a folder next to the database. main_db only holds the small records linking them to
+# machines and work orders, so no attached file is read at startup. Files are hashed while they're copied in, one chunk at a time, and read back through memory
+# maps. Thumbnails are decoded at their display size and kept in memory, least recently used first out once they pass the byte budget.
+class AttachmentStore:
+    chunk_size = 1 << 20
+    thumbnail_cache_bytes = 64 << 20
+    def __init__( self, folder: str ) -> None:
+        self.folder = folder
+        self.thumbnails, self.thumbnails_bytes = OrderedDict(), 0
+        self.thumbnails_lock = Lock()
+    def BlobPath( self, digest: str ) -> str:
+        return JoinPath( self.folder, digest[ :2 ], digest[ 2: ] )
+    def Ingest( self, path: str, on_progress = None ) -> dict:
+        makedirs( JoinPath( self.folder, 'tmp' ), exist_ok = True )
+        temp_path = JoinPath( self.folder, 'tmp', uuid4().hex )
+        digest, size = sha256(), 0
+        try:
+            with open( path, 'rb' ) as source_file, open( temp_path, 'wb' ) as temp_file:
+                while chunk := source_file.read( self.chunk_size ):
+                    digest.update( chunk )
+                    temp_file.write( chunk )
+                    size += len( chunk )
+                    if on_progress: on_progress( size )
+                temp_file.flush()
+                fsync( temp_file.fileno() )
+            blob_path = self.BlobPath( digest.hexdigest() )
+            if exists( blob_path ): RemoveFile( temp_path ) # Same content already stored, possibly under another name.
+            else:
+                makedirs( dirname( blob_path ), exist_ok = True )
+                ReplaceFile( temp_path, blob_path )
+        except BaseException:
+            if exists( temp_path ): RemoveFile( temp_path )
+            raise
+        return { 'hash': digest.hexdigest(), 'name': path.replace( '\\', '/' ).rsplit( '/', 1 )[-1], 'size': size, 'type': guess_type( path )[0] or '', 'added': date.today().isoformat() }
+    @contextmanager
+    def Map( self, digest: str ):
+        with open( self.BlobPath( digest ), 'rb' ) as blob_file:
+            if not fstat( blob_file.fileno() ).st_size: # Empty files can't be mapped.
+                yield b''
+                return
+            with mmap.mmap( blob_file.fileno(), 0, access = mmap.ACCESS_READ ) as mapped: yield mapped
+    def Export( self, digest: str, path: str ) -> str:
+        with self.Map( digest ) as mapped, open( path, 'wb' ) as target_file: target_file.write( mapped )
+        return path
+    def Thumbnail( self, record: dict, size: int ) -> QImage | None:
+        if not record.get( 'type', '' ).startswith( 'image/' ): return None
+        thumbnail_key = ( record[ 'hash' ], size )
+        with self.thumbnails_lock:
+            if thumbnail_key in self.thumbnails:
+                self.thumbnails.move_to_end( thumbnail_key )
+                return self.thumbnails[ thumbnail_key ]
+        with self.Map( record[ 'hash' ] ) as mapped:
+            image_buffer = QBuffer()
+            image_buffer.setData( QByteArray( mapped ) )
+        image_buffer.open( QIODevice.OpenModeFlag.ReadOnly )
+        image_reader = QImageReader( image_buffer )
+        if image_reader.size().isValid(): image_reader.setScaledSize( image_reader.size().scaled( size, size, Qt.AspectRatioMode.KeepAspectRatio ) ) # JPEGs are decoded straight at the smaller size.
+        thumbnail = image_reader.read()
+        if thumbnail.isNull(): return None
+        with self.thumbnails_lock:
+            if thumbnail_key not in self.thumbnails:
+                self.thumbnails[ thumbnail_key ] = thumbnail
+                self.thumbnails_bytes += thumbnail.sizeInBytes()
+            while self.thumbnails_bytes > self.thumbnail_cache_bytes:
+                _, evicted_thumbnail = self.thumbnails.popitem( last = False )
+                self.thumbnails_bytes -= evicted_thumbnail.sizeInBytes()
+        return thumbnail
+
+main_attachments = AttachmentStore( AppFilePath( 'Maintenance Attachments' ) )
+attachment_thumbnail_size = 128
+
+def MachineWorkOrderCodes( machine_key: str ) -> list[ str ]:
+    return [ str( code ) for code, order in main_db.get( 'work_orders', dict() ).items() if str( order.get( 'machine' ) ) == machine_key ]
+
+def MachineAttachments( machine_key: str, work_order: str | None = None ) -> dict[ str, dict ]:
+    with main_db_lock: return { attachment_key: record for attachment_key, record in main_db.get( 'attachments', dict() ).items() if record.get( 'machine' ) == machine_key and record.get( 'work_order' ) == work_order } # IngestAttachmentsJob adds records from a worker.
+
+ScreenWidth, ScreenHeight = 1920, 1080 # Replaced with ScreenSize() once the QApplication exists.
+def ScreenSize() -> tuple[ int, int ]:
+    screen_size = QApplication.primaryScreen().size()
+    return screen_size.width(), screen_size.height()
 date_string_format = r'%d/%m/%y'
 string_color_dict = {
     'bold'         : '\033[1m',
@@ -93,20 +634,90 @@ excluded_models = { default_model, 'Nenhum', '' }
 excluded_sectors = { default_sector, 'Outros', 'Nenhum', '' }
 attribute_labels = ( 'Tipo', 'Fabricante', 'Modelo', 'Fornecedor', 'Setor', 'N° de Patrimônio', 'Data de Aquisição', 'Status' )
 attribute_internal_names = ( 'type', 'manufacturer', 'model', 'supplier', 'sector', 'id', 'acquisition_date', 'status' )
+attribute_defaults = dict( zip( attribute_internal_names, ( '', default_manufacturer, default_model, default_supplier, default_sector, default_id, default_acquisition_date, default_status ) ) )
+
+# Counts inventory machines per ( type, manufacturer, model ), so telling whether a name needs disambiguation is a single lookup instead of an inventory scan.
+class MachineUniquenessIndex:
+    def __init__( self ) -> None:
+        self.name_key_counts = Counter()
+        self.machine_name_keys = dict()
+    def Rebuild( self, machine_inv: dict ) -> None:
+        self.machine_name_keys = { machine_key: MachineNameKey( record ) for machine_key, record in machine_inv.items() }
+        self.name_key_counts = Counter( self.machine_name_keys.values() )
+    def Set( self, machine_key: str, name_key: tuple ) -> bool:
+        old_name_key = self.machine_name_keys.get( machine_key )
+        if old_name_key == name_key: return False
+        if old_name_key is not None: self.name_key_counts[ old_name_key ] -= 1
+        self.name_key_counts[ name_key ] += 1
+        self.machine_name_keys[ machine_key ] = name_key
+        return ( old_name_key is not None and self.name_key_counts[ old_name_key ] == 1 ) or self.name_key_counts[ name_key ] == 2 # Whether some other machine's name gained or lost its ID suffix.
+    def Remove( self, machine_key: str ) -> bool:
+        old_name_key = self.machine_name_keys.pop( machine_key, None )
+        if old_name_key is None: return False
+        self.name_key_counts[ old_name_key ] -= 1
+        return self.name_key_counts[ old_name_key ] == 1
+    def IsUnique( self, machine_key: str ) -> bool:
+        return self.name_key_counts[ self.machine_name_keys[ machine_key ] ] <= 1 if machine_key in self.machine_name_keys else True
+
+def MachineNameKey( record: dict ) -> tuple:
+    return ( record.get( 'type' ), record.get( 'manufacturer', default_manufacturer ), record.get( 'model', default_model ) )
+
+machine_uniqueness_index = MachineUniquenessIndex()
+
+# Spec and features sheets stacked into one string array; cells are only turned into Qt values when a row is painted, and widths, spans and header rows are worked out once per sheet.
+class SpecSheetModel( QAbstractTableModel ):
+    def __init__( self, spec_sheet: pd.DataFrame, features_sheet: pd.DataFrame, header_font: QFont ) -> None:
+        super().__init__()
+        self.header_font = header_font
+        self.spec_rows = len( spec_sheet )
+        cells = np.full( ( len( spec_sheet ) + len( features_sheet ), max( len( spec_sheet.columns ), len( features_sheet.columns ) ) ), '', dtype = object )
+        cells[ : self.spec_rows, : len( spec_sheet.columns ) ] = spec_sheet.to_numpy()
+        cells[ self.spec_rows :, : len( features_sheet.columns ) ] = features_sheet.to_numpy()
+        self.cells = cells.astype( str )
+        self.header_rows = { row_idx for row_idx, sheet in ( ( 0, spec_sheet ), ( self.spec_rows, features_sheet ) ) if not sheet.empty }
+        # Features sheets whose extra columns are all blank are shown as full-width centered lines.
+        self.features_collapsed = 0 < len( features_sheet.columns ) <= 3 and not ( self.cells[ self.spec_rows :, 1 : len( features_sheet.columns ) ] != '' ).any()
+    def rowCount( self, parent: QModelIndex = QModelIndex() ) -> int:
+        return 0 if parent.isValid() else self.cells.shape[0]
+    def columnCount( self, parent: QModelIndex = QModelIndex() ) -> int:
+        return 0 if parent.isValid() else self.cells.shape[1]
+    def data( self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole ):
+        if not index.isValid(): return None
+        if role == Qt.ItemDataRole.DisplayRole: return str( self.cells[ index.row(), index.column() ] )
+        if role == Qt.ItemDataRole.FontRole and index.row() in self.header_rows and index.column() == 0: return self.header_font
+        if role == Qt.ItemDataRole.TextAlignmentRole and ( ( index.row() in self.header_rows and index.column() == 0 ) or ( self.features_collapsed and index.row() >= self.spec_rows ) ): return Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter
+        return None
+    def ColumnWidths( self, font_width: int, min_col_width: int, max_col_width: int ) -> list[ int ]:
+        if not self.cells.size: return [ min_col_width ] * self.cells.shape[1]
+        text_lengths = np.char.str_len( self.cells ).max( axis = 0 )
+        return np.clip( text_lengths * font_width + 10, min_col_width, max_col_width ).tolist()
+    def SpannedRows( self ) -> list[ int ]:
+        spanned_rows = { 0 } if self.spec_rows else set()
+        if self.features_collapsed: spanned_rows |= set( range( self.spec_rows, self.cells.shape[0] ) )
+        return sorted( spanned_rows )
 
 class Machine:
-    procedures_array = tuple()
-    procedures_schedule = list()
-    procedures_history = list()
-    spec_sheet = pd.DataFrame()
-    features_sheet = pd.DataFrame()
+    __slots__ = attribute_internal_names + ( 'name_cache', 'inventory_key', 'procedures_array', 'procedures_schedule', 'procedures_history', 'spec_sheet', 'features_sheet' )
+    name_attributes = frozenset( ( 'type', 'manufacturer', 'model', 'sector', 'id' ) )
     def __init__( self, type: str, manufacturer: str = default_manufacturer, model: str = default_model, supplier: str = default_supplier, sector: str = default_sector, id: int | float | str = default_id, acquisition_date: datetime | str = default_acquisition_date, status: str = default_status ) -> None:
+        self.name_cache, self.inventory_key = dict(), None
+        self.procedures_array, self.procedures_schedule, self.procedures_history = tuple(), list(), list()
+        self.spec_sheet = self.features_sheet = None # Sheets are only built for machines actually opened.
         self.type, self.manufacturer, self.model, self.supplier, self.sector, self.id, self.acquisition_date = type, manufacturer, model, supplier, sector, id, acquisition_date
         if status in set( status_dict.keys() ) | { 'Nenhuma máquina selecionada' }: self.status = status
         else: raise Exception( f'{ status } status isn\'t on the status dictionary.' )
+    def __setattr__( self, name: str, value ) -> None:
+        # Only its own names go stale; stored machines are changed through SetMachineRecord, which updates the indexes.
+        object.__setattr__( self, name, value )
+        if name in Machine.name_attributes: self.name_cache.clear()
     def GetName( self, shorthand: bool = False ) -> str:
-        machine_name = f'{ self.type }{ ( ' ' + self.manufacturer ) if self.manufacturer not in excluded_manufacturers else '' }{ ( ' ' + self.model ) if self.model not in excluded_models else '' }{ ( ' – ' + self.sector ) if ( self.sector not in excluded_sectors ) and not ( self.manufacturer not in excluded_manufacturers and self.model not in excluded_models ) and not shorthand else '' }{ ( ' – ID: ' + self.id ) if self.id in { int, float } and not self.IsUnique() and not shorthand else '' }'
+        # Cached per ( shorthand, uniqueness ), so another machine becoming a duplicate of this one is picked up without explicit invalidation.
+        name_variant = ( shorthand, shorthand or self.IsUnique() )
+        if name_variant in self.name_cache: return self.name_cache[ name_variant ]
+        machine_name = f'{ self.type }{ ( ' ' + self.manufacturer ) if self.manufacturer not in excluded_manufacturers else '' }{ ( ' ' + self.model ) if self.model not in excluded_models else '' }{ ( ' – ' + self.sector ) if ( self.sector not in excluded_sectors ) and not ( self.manufacturer not in excluded_manufacturers and self.model not in excluded_models ) and not shorthand else '' }{ ( ' – ID: ' + str( self.id ) ) if type( self.id ) in { int, float } and not name_variant[1] else '' }'
+        self.name_cache[ name_variant ] = machine_name
         return machine_name
+    @Timed( 'info_box_widget', count = 'widgets_created' )
     def GetInfoBoxWidget( self ) -> QWidget:
         attribute_values = tuple( str( getattr( self, internal_name ) ) for internal_name in attribute_internal_names )
         info_box = QWidget()
@@ -131,67 +742,451 @@ class Machine:
             info_box_layout.addWidget( value_widget, idx, 1, 1, 1, alignment = Qt.AlignmentFlag.AlignRight )
         info_box.setLayout( info_box_layout )
         return info_box
-    def GetSpecSheetWidget( self ) -> QTableWidget | None:
-        sheet_widget = QTableWidget()
-        if not ( self.spec_sheet.empty and self.features_sheet.empty ):
-            sheet_widget.setRowCount( len( self.spec_sheet ) + len( self.features_sheet ) )
-            sheet_widget.setColumnCount( max( len( self.spec_sheet.columns ), len( self.features_sheet.columns ) ) )
-            sheet_widget.verticalHeader().setVisible( False )
-            sheet_widget.horizontalHeader().setVisible( False )
+    @Timed( 'spec_sheet_widget', count = 'widgets_created' )
+    def GetSpecSheetWidget( self ) -> QTableView | None:
+        spec_sheet = pd.DataFrame( self.spec_sheet ) if self.spec_sheet is not None else pd.DataFrame() # Also takes the plain column dicts of null_machine.
+        features_sheet = pd.DataFrame( self.features_sheet ) if self.features_sheet is not None else pd.DataFrame()
+        if not ( spec_sheet.empty and features_sheet.empty ):
             font_family = ( 'Times', )
             font_size = 10
             sheet_font = QFont( font_family, font_size )
-            sheet_header_font = QFont( font_family, round( font_size * 1.25 ), 2 )
-            font_width = QFontMetrics( sheet_font ).averageCharWidth()
+            sheet_model = SpecSheetModel( spec_sheet, features_sheet, QFont( font_family, round( font_size * 1.25 ), 2 ) )
+            sheet_widget = QTableView()
+            sheet_widget.setModel( sheet_model )
+            sheet_model.setParent( sheet_widget )
+            sheet_widget.verticalHeader().setVisible( False )
+            sheet_widget.horizontalHeader().setVisible( False )
             sheet_widget.setFont( sheet_font )
-            max_col_width = max( 300, round( ScreenWidth * 0.15 ) )
-            for col_idx in range( len( self.spec_sheet.columns ) ):
-                for row_idx in range( len( self.spec_sheet ) ):
-                    sheet_widget.setColumnWidth( col_idx, min( max_col_width, max( sheet_widget.columnWidth( col_idx ), len( self.spec_sheet.iloc[ row_idx, col_idx ] ) * font_width + 10 ) ) )
-                    sheet_widget.setItem( row_idx, col_idx, QTableWidgetItem( str( self.spec_sheet.iloc[ row_idx, col_idx ] ) ) )
-            for row_idx in range( len( self.spec_sheet ), len( self.spec_sheet ) + len( self.features_sheet ) ):
-                for col_idx in range( len( self.features_sheet.columns ) ):
-                    sheet_widget.setColumnWidth( col_idx, min( max_col_width, max( sheet_widget.columnWidth( col_idx ), len( self.features_sheet.iloc[ row_idx - len( self.spec_sheet ), col_idx ] ) * font_width + 10 ) ) )
-                    sheet_widget.setItem( row_idx, col_idx, QTableWidgetItem( str( self.features_sheet.iloc[ row_idx - len( self.spec_sheet ), col_idx ] ) ) )
-                if 0 < len( self.features_sheet.columns ) <= 3 and not any( self.features_sheet.iloc[ :, 1:: ].any( axis = 0 ) ):
-                    sheet_widget.setSpan( row_idx, 0, 1, sheet_widget.columnCount() )
-                    if row_idx > len( self.features_sheet ):
-                        row_item = sheet_widget.item( row_idx, 0 )
-                        row_item.setTextAlignment( Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter )
-            table_width = sum( sheet_widget.columnWidth( col ) for col in range( sheet_widget.columnCount() ) )
-            if not self.spec_sheet.empty:
-                sheet_widget.setSpan( 0, 0, 1, sheet_widget.columnCount() )
-                spec_sheet_header = QTableWidgetItem( str( self.spec_sheet.iloc[ 0, 0 ] ) )
-                spec_sheet_header.setTextAlignment( Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter )
-                spec_sheet_header.setFont( sheet_header_font )
-                sheet_widget.setItem( 0, 0, spec_sheet_header )
-            if not self.features_sheet.empty:
-                features_sheet_header = QTableWidgetItem( str( self.features_sheet.iloc[ 0, 0 ] ) )
-                features_sheet_header.setTextAlignment( Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter )
-                features_sheet_header.setFont( sheet_header_font )
-                sheet_widget.setItem( len( self.spec_sheet ), 0, features_sheet_header )
-            sheet_widget.setMinimumWidth( max( 60, table_width + 19 ) )
+            column_widths = sheet_model.ColumnWidths( QFontMetrics( sheet_font ).averageCharWidth(), sheet_widget.horizontalHeader().defaultSectionSize(), max( 300, round( ScreenWidth * 0.15 ) ) )
+            for col_idx, column_width in enumerate( column_widths ): sheet_widget.setColumnWidth( col_idx, column_width )
+            for row_idx in sheet_model.SpannedRows(): sheet_widget.setSpan( row_idx, 0, 1, sheet_model.columnCount() )
+            sheet_widget.setMinimumWidth( max( 60, sum( column_widths ) + 19 ) )
             return sheet_widget
         else: return None
-    def IsUnique( self ) -> bool: # Work in Progress!
-        unique_status = True
-        return unique_status
+    def IsUnique( self ) -> bool:
+        return self.inventory_key is None or machine_uniqueness_index.IsUnique( self.inventory_key )
 
 null_machine = Machine( 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada', 'Nenhuma máquina selecionada' )
-null_machine.spec_sheet = pd.DataFrame( {
+null_machine.spec_sheet = {
     'A': ( 'Especificações Técnicas', 'Specification', 'Maximum Force', 'Return Force', 'Rapid Descent Speed', 'Working Speed - Slow', 'Useful Working Length', 'Return Speed', 'Distance between Table and Piston', 'Machine Weight', 'Number of Cylinders', 'General Aspects', 'Positioning Precision on X-axis', 'Machine Axes' ),
     'B': ( '', 'Value', '450', '28', '0/100', '0/10', '2100', '0/120', '340', '3500', '2', 'Delem Control', 'With NR12', '4 (y1, y2, x, r)' ),
     'C': ( '', 'Unit', 'KN', 'KN', 'MM/S', 'MM/S', 'MM', 'MM/S', 'MM', 'KG', 'QUANT', '-', '-', '-' )
-} ) # PLACEHOLDER!
-null_machine.features_sheet = pd.DataFrame( {
+} # PLACEHOLDER!
+null_machine.features_sheet = {
     'A': ( 'Características Gerais', 'Peso = 500kg', 'Número de partes = 2000' ),
     'B': ( '', '', '' ),
     'C': ( '', '', '' )
-} ) # PLACEHOLDER!
+} # PLACEHOLDER!
+
+def MachineFromRecord( record: dict, machine_key: str | None = None, sheets: bool = True ) -> Machine:
+    # Without sheets for names and indexes: building the DataFrames costs far more than the rest of the machine.
+    machine = Machine( **{ internal_name: record[ internal_name ] for internal_name in attribute_internal_names if internal_name in record } )
+    machine.inventory_key = machine_key
+    if not sheets: return machine
+    if 'spec_sheet' in record: machine.spec_sheet = pd.DataFrame( record[ 'spec_sheet' ] )
+    if 'features_sheet' in record: machine.features_sheet = pd.DataFrame( record[ 'features_sheet' ] )
+    return machine
+
+def NormalizeSearchText( text: str ) -> str:
+    return unidecode( text.replace( '– ', '' ) ).replace( '-', '' ).replace( '  ', ' ' ).upper()
+
+# Normalized names, sectors and IDs are computed once per machine and kept up to date on edits. Queries of three or more characters intersect trigram posting sets,
+# shorter ones do a bisected prefix lookup over the sorted word tokens, and numeric queries also hit the ID table.
+class MachineSearchIndex:
+    def __init__( self ) -> None:
+        self.lock = Lock()
+        self.search_texts = dict()
+        self.machine_order = dict()
+        self.trigram_postings = dict()
+        self.id_postings = dict()
+        self.machine_ids = dict()
+        self.sorted_tokens = list()
+        self.next_order = 0
+    def Rebuild( self, machine_inv: dict ) -> None:
+        with self.lock:
+            self.search_texts, self.machine_order, self.trigram_postings, self.id_postings, self.machine_ids, self.sorted_tokens, self.next_order = dict(), dict(), dict(), dict(), dict(), list(), 0
+            for machine_key, record in machine_inv.items(): self.AddUnlocked( machine_key, record )
+            self.sorted_tokens.sort()
+    def Add( self, machine_key: str, record: dict ) -> None:
+        with self.lock:
+            machine_order = self.machine_order.get( machine_key ) # Edited machines keep their place in the list.
+            self.RemoveUnlocked( machine_key )
+            self.AddUnlocked( machine_key, record, keep_sorted = True, machine_order = machine_order )
+    def Remove( self, machine_key: str ) -> None:
+        with self.lock: self.RemoveUnlocked( machine_key )
+    def AddUnlocked( self, machine_key: str, record: dict, keep_sorted: bool = False, machine_order: int | None = None ) -> None:
+        machine = MachineFromRecord( record, sheets = False )
+        search_text = NormalizeSearchText( machine.GetName() + ' ' + str( machine.sector ) )
+        self.search_texts[ machine_key ] = search_text
+        if machine_order is None:
+            machine_order = self.next_order
+            self.next_order += 1
+        self.machine_order[ machine_key ] = machine_order
+        for trigram in { search_text[ idx : idx + 3 ] for idx in range( len( search_text ) - 2 ) }: self.trigram_postings.setdefault( trigram, set() ).add( machine_key )
+        for token in set( search_text.split() ):
+            if keep_sorted: insort( self.sorted_tokens, ( token, machine_key ) )
+            else: self.sorted_tokens.append( ( token, machine_key ) )
+        numeric_id = NumericMachineId( machine.id )
+        if numeric_id is not None:
+            self.id_postings.setdefault( numeric_id, set() ).add( machine_key )
+            self.machine_ids[ machine_key ] = numeric_id
+    def RemoveUnlocked( self, machine_key: str ) -> None:
+        search_text = self.search_texts.pop( machine_key, None )
+        if search_text is None: return
+        self.machine_order.pop( machine_key )
+        for trigram in { search_text[ idx : idx + 3 ] for idx in range( len( search_text ) - 2 ) }: self.trigram_postings[ trigram ].discard( machine_key )
+        for token in set( search_text.split() ):
+            token_idx = bisect_left( self.sorted_tokens, ( token, machine_key ) )
+            if token_idx < len( self.sorted_tokens ) and self.sorted_tokens[ token_idx ] == ( token, machine_key ): del self.sorted_tokens[ token_idx ]
+        if machine_key in self.machine_ids: self.id_postings[ self.machine_ids.pop( machine_key ) ].discard( machine_key )
+    def Query( self, search_filter_text: str ) -> list[ str ]:
+        with self.lock:
+            if not search_filter_text: return list( self.machine_order )
+            if len( search_filter_text ) >= 3:
+                trigram_sets = sorted( ( self.trigram_postings.get( search_filter_text[ idx : idx + 3 ], set() ) for idx in range( len( search_filter_text ) - 2 ) ), key = len )
+                candidates = set.intersection( *trigram_sets ) if trigram_sets[0] else set()
+                matches = { machine_key for machine_key in candidates if search_filter_text in self.search_texts[ machine_key ] }
+            else:
+                token_idx = bisect_left( self.sorted_tokens, ( search_filter_text, '' ) )
+                matches = set()
+                while token_idx < len( self.sorted_tokens ) and self.sorted_tokens[ token_idx ][0].startswith( search_filter_text ):
+                    matches.add( self.sorted_tokens[ token_idx ][1] )
+                    token_idx += 1
+            if search_filter_text.isnumeric(): matches |= self.id_postings.get( float( search_filter_text ), set() )
+            return sorted( matches, key = self.machine_order.__getitem__ )
+    def Matches( self, machine_key: str, search_filter_text: str ) -> bool:
+        with self.lock:
+            if machine_key not in self.search_texts: return False
+            if not search_filter_text: return True
+            if len( search_filter_text ) >= 3: return search_filter_text in self.search_texts[ machine_key ] or ( search_filter_text.isnumeric() and machine_key in self.id_postings.get( float( search_filter_text ), set() ) )
+            return any( token.startswith( search_filter_text ) for token in self.search_texts[ machine_key ].split() ) or ( search_filter_text.isnumeric() and machine_key in self.id_postings.get( float( search_filter_text ), set() ) )
+
+def NumericMachineId( machine_id: int | float | str ) -> float | None:
+    if type( machine_id ) in { int, float }: return float( machine_id )
+    if type( machine_id ) == str and machine_id.isnumeric(): return float( machine_id )
+    return None
+
+main_search_index = MachineSearchIndex()
+
+# Optional column-per-attribute store of the inventory's attributes, which main_db's machine records then leave out: low-cardinality attributes are held as integer
+# codes into a category table, so filtering by status, sector or manufacturer is a single numpy comparison and each distinct string is stored once. Rows of removed
+# machines are tombstoned and reused if the key comes back.
+class ColumnarInventory:
+    categorical_attributes = ( 'type', 'manufacturer', 'model', 'supplier', 'sector', 'status' )
+    object_attributes = ( 'id', 'acquisition_date' )
+    attributes = categorical_attributes + object_attributes
+    def __init__( self ) -> None:
+        self.Rebuild( dict() )
+    def Rebuild( self, machine_inv: dict ) -> None:
+        capacity = max( 1024, len( machine_inv ) )
+        self.machine_keys, self.key_rows = list(), dict()
+        self.alive = np.zeros( capacity, dtype = bool )
+        self.present = np.zeros( capacity, dtype = np.uint16 ) # One bit per attribute the record had, so records are written back with the fields they came with.
+        self.codes = { name: np.zeros( capacity, dtype = np.int32 ) for name in self.categorical_attributes }
+        self.categories = { name: list() for name in self.categorical_attributes }
+        self.category_codes = { name: dict() for name in self.categorical_attributes }
+        self.objects = { name: list() for name in self.object_attributes }
+        for machine_key, record in machine_inv.items(): self.Set( machine_key, record )
+    def CategoryCode( self, name: str, value: str ) -> int:
+        if value not in self.category_codes[ name ]:
+            self.category_codes[ name ][ value ] = len( self.categories[ name ] )
+            self.categories[ name ].append( value )
+        return self.category_codes[ name ][ value ]
+    def Set( self, machine_key: str, record: dict ) -> None:
+        row = self.key_rows.get( machine_key )
+        if row is None:
+            row = self.key_rows[ machine_key ] = len( self.machine_keys )
+            self.machine_keys.append( machine_key )
+            for name in self.object_attributes: self.objects[ name ].append( None )
+            if row == len( self.alive ):
+                self.alive, self.present = ( np.concatenate( ( column, np.zeros( row, dtype = column.dtype ) ) ) for column in ( self.alive, self.present ) )
+                for name in self.categorical_attributes: self.codes[ name ] = np.concatenate( ( self.codes[ name ], np.zeros( row, dtype = np.int32 ) ) )
+        self.alive[ row ] = True
+        self.present[ row ] = sum( 1 << attribute_idx for attribute_idx, name in enumerate( self.attributes ) if name in record )
+        for name in self.categorical_attributes: self.codes[ name ][ row ] = self.CategoryCode( name, record.get( name, attribute_defaults[ name ] ) )
+        for name in self.object_attributes: self.objects[ name ][ row ] = record.get( name, attribute_defaults[ name ] )
+    def Remove( self, machine_key: str ) -> None:
+        if machine_key in self.key_rows: self.alive[ self.key_rows[ machine_key ] ] = False
+    def GetValue( self, machine_key: str, name: str ):
+        row = self.key_rows[ machine_key ]
+        if name in self.codes: return self.categories[ name ][ self.codes[ name ][ row ] ]
+        return self.objects[ name ][ row ]
+    def Record( self, machine_key: str, record: dict ) -> dict:
+        # The attributes the machine had when it was stored, under whatever the record has been given since.
+        row = self.key_rows.get( machine_key )
+        if row is None: return dict( record )
+        return { name: self.GetValue( machine_key, name ) for attribute_idx, name in enumerate( self.attributes ) if self.present[ row ] >> attribute_idx & 1 } | record
+    def Strip( self, record: dict ) -> 'ColumnarRecord':
+        return ColumnarRecord( self, ( ( name, value ) for name, value in record.items() if name not in self.attributes ) )
+    def Filter( self, **conditions ) -> list[ str ]:
+        selected_rows = self.alive[ : len( self.machine_keys ) ].copy()
+        for name, value in conditions.items():
+            if value not in self.category_codes[ name ]: return list()
+            selected_rows &= self.codes[ name ][ : len( self.machine_keys ) ] == self.category_codes[ name ][ value ]
+        return [ self.machine_keys[ row ] for row in np.flatnonzero( selected_rows ) ]
+    def ValueCounts( self, name: str ) -> dict[ str, int ]:
+        counts = np.bincount( self.codes[ name ][ : len( self.machine_keys ) ][ self.alive[ : len( self.machine_keys ) ] ], minlength = len( self.categories[ name ] ) )
+        return { category: int( count ) for category, count in zip( self.categories[ name ], counts ) if count }
+
+# A machine record in main_db while columnar_inventory is on, its attributes left in the columnar inventory that stored it. Attributes set on it later, field by
+# field, take precedence.
+class ColumnarRecord( dict ):
+    __slots__ = ( 'store', )
+    def __init__( self, store: ColumnarInventory, fields ) -> None:
+        super().__init__( fields )
+        self.store = store
+    def __deepcopy__( self, memo: dict ) -> 'ColumnarRecord':
+        return ColumnarRecord( self.store, deepcopy( dict( self ), memo ) )
+
+def MachineRecord( machine_key: str, record: dict ) -> dict:
+    return record.store.Record( machine_key, record ) if isinstance( record, ColumnarRecord ) else record
+
+# Machine whose attributes live in the columnar inventory instead of its own slots, so opening any number of machines allocates almost nothing.
+class StoredMachine( Machine ):
+    __slots__ = ( 'store', )
+    def __init__( self, store: ColumnarInventory, machine_key: str ) -> None:
+        self.name_cache, self.inventory_key, self.store = dict(), machine_key, store
+        self.procedures_array, self.procedures_schedule, self.procedures_history = tuple(), list(), list()
+        self.spec_sheet = self.features_sheet = None
+
+def StoredAttribute( name: str ) -> property:
+    # Read-only: edits go through SetMachineRecord, so the journal and every index see them.
+    return property( lambda self: self.store.GetValue( self.inventory_key, name ) )
+
+for internal_name in attribute_internal_names: setattr( StoredMachine, internal_name, StoredAttribute( internal_name ) )
+del internal_name
+
+main_db_columns = None # Created by ReadConfig when columnar_inventory is on.
 
-class WorkOrdersSheet: # WORK IN PROGRESS!
-    def __init__( self, WO_Sheet: pd.DataFrame = pd.DataFrame() ) -> None:
-        self.WO_Sheet = WO_Sheet
+machine_cache = dict()
+
+def GetMachine( machine_key: str ) -> Machine:
+    if machine_key not in machine_cache: machine_cache[ machine_key ] = StoredMachine( main_db_columns, machine_key ) if main_db_columns else MachineFromRecord( main_db[ 'machine_inv' ][ machine_key ], machine_key, sheets = False )
+    return machine_cache[ machine_key ]
+
+machine_statuses = tuple( status for status in status_dict if status not in { 'Nenhuma máquina selecionada', '' } )
+
+def MachinesWithStatus( machine_inv: dict, columns: ColumnarInventory | None, status: str ) -> list[ str ]:
+    if columns: return columns.Filter( status = status )
+    return [ machine_key for machine_key, record in machine_inv.items() if record.get( 'status', default_status ) == status ]
+
+def MachineStatusCounts( machine_inv: dict, columns: ColumnarInventory | None ) -> dict[ str, int ]:
+    if columns: return columns.ValueCounts( 'status' )
+    return Counter( record.get( 'status', default_status ) for record in machine_inv.values() )
+
+# Only the rows scrolled into view are ever asked for their data, and adding or removing a machine touches a single row instead of rebuilding the list.
+class MachineListModel( QAbstractListModel ):
+    def __init__( self, machine_inv: dict, search_index: MachineSearchIndex, parent: QWidget | None = None ) -> None:
+        super().__init__( parent )
+        self.machine_inv = machine_inv
+        self.search_index = search_index
+        self.search_filter_text, self.status_filter = '', None
+        self.machine_keys = list( self.machine_inv.keys() )
+    def rowCount( self, parent: QModelIndex = QModelIndex() ) -> int:
+        return 0 if parent.isValid() else len( self.machine_keys )
+    def data( self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole ):
+        if not index.isValid(): return None
+        machine_key = self.machine_keys[ index.row() ]
+        if role == Qt.ItemDataRole.DisplayRole: return GetMachine( machine_key ).GetName()
+        if role == Qt.ItemDataRole.ForegroundRole: return QColor( status_dict.get( GetMachine( machine_key ).status, 'black' ) )
+        if role == Qt.ItemDataRole.UserRole: return machine_key
+        return None
+    def KeyMatches( self, machine_key: str ) -> bool:
+        return self.search_index.Matches( machine_key, self.search_filter_text ) and ( self.status_filter is None or GetMachine( machine_key ).status == self.status_filter )
+    def SetFilter( self, search_filter_text: str, machine_keys: list[ str ], status_filter: str | None = None ) -> None:
+        self.beginResetModel()
+        self.search_filter_text, self.status_filter = search_filter_text, status_filter
+        self.machine_keys = machine_keys
+        self.endResetModel()
+    def MachineAdded( self, machine_key: str ) -> None:
+        if machine_key in self.machine_keys or not self.KeyMatches( machine_key ): return
+        self.beginInsertRows( QModelIndex(), len( self.machine_keys ), len( self.machine_keys ) )
+        self.machine_keys.append( machine_key )
+        self.endInsertRows()
+    def MachineRemoved( self, machine_key: str ) -> None:
+        if machine_key not in self.machine_keys: return
+        row = self.machine_keys.index( machine_key )
+        self.beginRemoveRows( QModelIndex(), row, row )
+        del self.machine_keys[ row ]
+        self.endRemoveRows()
+    def MachineChanged( self, machine_key: str ) -> None:
+        if machine_key not in self.machine_keys: return self.MachineAdded( machine_key )
+        if not self.KeyMatches( machine_key ): return self.MachineRemoved( machine_key )
+        model_index = self.index( self.machine_keys.index( machine_key ) )
+        self.dataChanged.emit( model_index, model_index )
+    def RefreshNames( self ) -> None:
+        if self.machine_keys: self.dataChanged.emit( self.index( 0 ), self.index( len( self.machine_keys ) - 1 ), [ Qt.ItemDataRole.DisplayRole ] )
+
+# Every recurring procedure in main_db has exactly one live entry, its next due date, kept in a heap until that date has passed and then moved, once, to the overdue
+# table. Occurrences after it are expanded from the interval only when a query reaches them. Rescheduling pushes a new entry and bumps the procedure's version, so the
+# old one is skipped when popped instead of being searched for.
+class MaintenanceScheduler:
+    default_usage_hours_per_day = 8
+    def __init__( self ) -> None:
+        self.lock = Lock() # Queries pop and push heap entries, and the parts forecast runs them off the GUI thread.
+        self.Rebuild( dict() )
+    def Rebuild( self, machine_inv: dict ) -> None:
+        with self.lock:
+            self.due_heap, self.overdue, self.versions, self.procedures, self.machine_procedures = list(), dict(), dict(), dict(), dict()
+            for machine_key, record in machine_inv.items(): self.ScheduleMachineUnlocked( machine_key, record, push = False )
+            heapify( self.due_heap )
+    def ScheduleMachine( self, machine_key: str, record: dict ) -> None:
+        with self.lock: self.ScheduleMachineUnlocked( machine_key, record )
+    def ScheduleMachineUnlocked( self, machine_key: str, record: dict, push: bool = True ) -> None:
+        self.RemoveMachineUnlocked( machine_key )
+        usage_hours_per_day = record.get( 'usage_hours_per_day' ) or self.default_usage_hours_per_day
+        self.machine_procedures[ machine_key ] = len( record.get( 'procedures_array', () ) )
+        for procedure_idx, procedure in enumerate( record.get( 'procedures_array', () ) ):
+            procedure_key = ( machine_key, procedure_idx )
+            self.procedures[ procedure_key ] = ( procedure, usage_hours_per_day )
+            self.versions[ procedure_key ] = self.versions.get( procedure_key, 0 ) + 1
+            due_date = self.NextDue( procedure, usage_hours_per_day )
+            if due_date is None: continue
+            heap_entry = ( due_date.toordinal(), machine_key, procedure_idx, self.versions[ procedure_key ] )
+            if push: heappush( self.due_heap, heap_entry )
+            else: self.due_heap.append( heap_entry )
+    def RemoveMachine( self, machine_key: str ) -> None:
+        with self.lock: self.RemoveMachineUnlocked( machine_key )
+    def RemoveMachineUnlocked( self, machine_key: str ) -> None:
+        for procedure_idx in range( self.machine_procedures.pop( machine_key, 0 ) ):
+            self.procedures.pop( ( machine_key, procedure_idx ), None )
+            self.overdue.pop( ( machine_key, procedure_idx ), None )
+            self.versions[ ( machine_key, procedure_idx ) ] += 1
+        if len( self.due_heap ) > 2 * len( self.procedures ) + 64: # Mostly stale entries, rebuilt from the live ones.
+            self.due_heap = [ heap_entry for heap_entry in self.due_heap if self.IsLive( heap_entry ) ]
+            heapify( self.due_heap )
+    def IsLive( self, heap_entry: tuple ) -> bool:
+        return self.versions.get( ( heap_entry[1], heap_entry[2] ) ) == heap_entry[3] and ( heap_entry[1], heap_entry[2] ) in self.procedures
+    @staticmethod
+    def Interval( procedure: dict, usage_hours_per_day: float ) -> timedelta | None:
+        # Usage-based intervals are turned into calendar time through the machine's expected daily usage; with both kinds, whichever comes first wins.
+        intervals = [ timedelta( days = procedure[ 'interval_days' ] ) ] if procedure.get( 'interval_days' ) else list()
+        if procedure.get( 'interval_hours' ): intervals.append( timedelta( days = procedure[ 'interval_hours' ] / usage_hours_per_day ) )
+        return min( intervals ) if intervals else None
+    def NextDue( self, procedure: dict, usage_hours_per_day: float ) -> date | None:
+        interval = self.Interval( procedure, usage_hours_per_day )
+        if interval is None: return None
+        if procedure.get( 'last_done' ): return date.fromisoformat( procedure[ 'last_done' ] ) + interval
+        return date.fromisoformat( procedure[ 'start' ] ) if procedure.get( 'start' ) else date.today()
+    def AdvanceToUnlocked( self, today: date ) -> None:
+        while self.due_heap and self.due_heap[0][0] < today.toordinal():
+            heap_entry = heappop( self.due_heap )
+            if self.IsLive( heap_entry ): self.overdue[ ( heap_entry[1], heap_entry[2] ) ] = heap_entry
+    def RecurrencesBetween( self, first_day: date, last_day: date, today: date | None = None, parts_only: bool = False ) -> list[ tuple[ date, timedelta, str, dict ] ]:
+        # ( first occurrence in the range, interval, machine, procedure ) for every procedure due in it. Overdue procedures keep recurring from the date they
+        # were due, so they're included too.
+        with self.lock:
+            self.AdvanceToUnlocked( today or date.today() )
+            due_entries = list()
+            while self.due_heap and self.due_heap[0][0] <= last_day.toordinal():
+                heap_entry = heappop( self.due_heap )
+                if self.IsLive( heap_entry ): due_entries.append( heap_entry )
+            for heap_entry in due_entries: heappush( self.due_heap, heap_entry )
+            due_entries += self.overdue.values()
+            recurrences = list()
+            for due_ordinal, machine_key, procedure_idx, _ in due_entries:
+                procedure, usage_hours_per_day = self.procedures[ ( machine_key, procedure_idx ) ]
+                if parts_only and not procedure.get( 'parts' ): continue
+                due_date, interval = date.fromordinal( due_ordinal ), timedelta( days = max( self.Interval( procedure, usage_hours_per_day ).days, 1 ) ) # Dates drop the fraction of a day.
+                if due_date < first_day: due_date += interval * -( ( due_date - first_day ) // interval ) # Skip to the first recurrence inside the range.
+                if due_date <= last_day: recurrences.append( ( due_date, interval, machine_key, procedure ) )
+        return recurrences
+    def DueBetween( self, first_day: date, last_day: date, today: date | None = None ) -> list[ tuple[ date, str, dict ] ]:
+        occurrences = list()
+        for due_date, interval, machine_key, procedure in self.RecurrencesBetween( first_day, last_day, today ):
+            while due_date <= last_day:
+                occurrences.append( ( due_date, machine_key, procedure ) )
+                due_date += interval
+        return sorted( occurrences, key = lambda occurrence: occurrence[0] )
+    def Overdue( self, today: date, parts_only: bool = False ) -> list[ tuple[ date, str, dict ] ]:
+        with self.lock:
+            self.AdvanceToUnlocked( today )
+            overdue = [ ( date.fromordinal( due_ordinal ), machine_key, self.procedures[ ( machine_key, procedure_idx ) ][0] ) for due_ordinal, machine_key, procedure_idx, _ in sorted( heap_entry for heap_entry in self.overdue.values() if heap_entry[0] < today.toordinal() ) ]
+        return [ occurrence for occurrence in overdue if occurrence[2].get( 'parts' ) ] if parts_only else overdue
+
+def PlannedPartUses( scheduler: MaintenanceScheduler, today: date, planning_days: int ) -> list[ tuple[ str, float, int, float ] ]:
+    # ( part, quantity, days until the first execution, days between executions ) for every procedure that uses parts and is due in the next planning_days. An
+    # overdue procedure is also done once today, on top of its recurrences.
+    part_uses = [ ( part_key, quantity, 0, np.inf ) for _, _, procedure in scheduler.Overdue( today, parts_only = True ) for part_key, quantity in procedure[ 'parts' ].items() ]
+    for due_date, interval, _, procedure in scheduler.RecurrencesBetween( today, today + timedelta( days = planning_days ), today, parts_only = True ):
+        part_uses += [ ( part_key, quantity, ( due_date - today ).days, interval.days ) for part_key, quantity in procedure[ 'parts' ].items() ]
+    return part_uses
+
+main_scheduler = MaintenanceScheduler()
+
+closed_work_order_statuses = { 'Fechada', 'Concluída', 'Completed' }
+work_order_columns = ( 'code', 'machine', 'description', 'status', 'opened', 'closed' )
+work_order_labels = { 'code': 'Ordem de Serviço', 'machine': 'Máquina', 'description': 'Descrição', 'status': 'Status', 'opened': 'Abertura', 'closed': 'Encerramento' }
+
+def WorkOrdersFrame( work_orders: dict ) -> pd.DataFrame:
+    return pd.DataFrame.from_dict( work_orders, orient = 'index' ).rename_axis( 'code' ).reset_index().reindex( columns = work_order_columns )
+
+# Rows reach the view in batches through canFetchMore/fetchMore. Filtering and sorting are done on the whole registry (a masked, stably sorted DataFrame) and reset
+# the fetched window, so the view never sorts or filters rows itself.
+class WorkOrdersModel( QAbstractTableModel ):
+    fetch_batch_size = 200
+    def __init__( self, work_orders: pd.DataFrame, parent: QWidget | None = None ) -> None:
+        super().__init__( parent )
+        self.source = work_orders
+        self.columns = list( work_orders.columns )
+        self.filters, self.sort_column, self.sort_descending = dict(), None, False
+        self.Refresh()
+    def Refresh( self ) -> None:
+        self.beginResetModel()
+        row_mask = np.ones( len( self.source ), dtype = bool )
+        for name, value in self.filters.items():
+            if name == 'opened_from': row_mask &= ( self.source[ 'opened' ] >= value ).to_numpy()
+            elif name == 'opened_to': row_mask &= ( self.source[ 'opened' ] <= value ).to_numpy()
+            else: row_mask &= ( self.source[ name ] == value ).to_numpy()
+        self.view_frame = self.source[ row_mask ]
+        if self.sort_column: self.view_frame = self.view_frame.sort_values( self.sort_column, ascending = not self.sort_descending, kind = 'stable', na_position = 'last' )
+        self.column_values = [ self.view_frame[ column ].to_numpy() for column in self.columns ]
+        self.total_rows = len( self.view_frame )
+        self.loaded_rows = 0
+        self.endResetModel()
+        self.fetchMore()
+    def rowCount( self, parent: QModelIndex = QModelIndex() ) -> int:
+        return 0 if parent.isValid() else self.loaded_rows
+    def columnCount( self, parent: QModelIndex = QModelIndex() ) -> int:
+        return 0 if parent.isValid() else len( self.columns )
+    def canFetchMore( self, parent: QModelIndex = QModelIndex() ) -> bool:
+        return not parent.isValid() and self.loaded_rows < self.total_rows
+    def fetchMore( self, parent: QModelIndex = QModelIndex() ) -> None:
+        fetch_rows = min( self.fetch_batch_size, self.total_rows - self.loaded_rows )
+        if parent.isValid() or fetch_rows <= 0: return
+        self.beginInsertRows( QModelIndex(), self.loaded_rows, self.loaded_rows + fetch_rows - 1 )
+        self.loaded_rows += fetch_rows
+        self.endInsertRows()
+    def data( self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole ):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole: return None
+        value = self.column_values[ index.column() ][ index.row() ]
+        return '' if value is None or ( isinstance( value, float ) and value != value ) else str( value )
+    def headerData( self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole ):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal: return work_order_labels.get( self.columns[ section ], str( self.columns[ section ] ) )
+        return None
+    def sort( self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder ) -> None:
+        self.sort_column, self.sort_descending = self.columns[ column ], order == Qt.SortOrder.DescendingOrder
+        self.Refresh()
+    def SetFilter( self, **filters ) -> None:
+        self.filters = { name: value for name, value in filters.items() if value not in { None, '' } }
+        self.Refresh()
+    def Value( self, row: int, column: str ):
+        return self.column_values[ self.columns.index( column ) ][ row ] if column in self.columns else None
+    def Statuses( self ) -> list[ str ]:
+        return sorted( str( status ) for status in self.source[ 'status' ].dropna().unique() ) if 'status' in self.source else list()
+    def ColumnWidths( self, font_width: int, max_col_width: int, sample_size: int = 256 ) -> list[ int ]:
+        # Widths fit the 95th percentile of a sample of each column, never narrower than its header.
+        sample_frame = self.view_frame.sample( n = min( sample_size, len( self.view_frame ) ), random_state = 0 )
+        column_widths = list()
+        for column in self.columns:
+            text_lengths = sample_frame[ column ].fillna( '' ).astype( str ).str.len()
+            header_length = len( work_order_labels.get( column, str( column ) ) ) + 2
+            column_widths.append( int( min( max_col_width, max( header_length, text_lengths.quantile( 0.95 ) if len( text_lengths ) else 0 ) * font_width + 10 ) ) )
+        return column_widths
+
+class WorkOrdersSheet:
+    def __init__( self, WO_Sheet: pd.DataFrame | dict | None = None ) -> None:
+        self.WO_Sheet = WO_Sheet if WO_Sheet is not None else dict.fromkeys( work_order_columns, () )
     def GetWidget( self ) -> QWidget:
         widget = QWidget()
         layout = QGridLayout()
@@ -201,40 +1196,549 @@ class WorkOrdersSheet: # WORK IN PROGRESS!
         layout.addWidget( scroll_area, 1, 0, -1, -1, alignment = Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignBottom )
         widget.setLayout( layout )
         return widget
-    def GetSheet( self ) -> QTableWidget:
-        sheet_widget = QTableWidget()
-        sheet_widget.setRowCount( len( self.WO_Sheet ) )
-        sheet_widget.setColumnCount( len( self.WO_Sheet ) )
+    @Timed( 'work_orders_sheet_widget', count = 'widgets_created' )
+    def GetSheet( self ) -> QTableView:
+        if isinstance( self.WO_Sheet, dict ): self.WO_Sheet = pd.DataFrame( self.WO_Sheet ) # Built on first display, so pandas isn't needed before that.
+        sheet_widget = QTableView()
+        sheet_model = WorkOrdersModel( self.WO_Sheet, sheet_widget )
+        sheet_widget.setModel( sheet_model )
         sheet_widget.verticalHeader().setVisible( False )
-        sheet_widget.horizontalHeader().setVisible( False )
         font_family = ( 'Times', )
         font_size = 10
         sheet_font = QFont( font_family, font_size )
-        sheet_header_font = QFont( font_family, round( font_size * 1.25 ), 2 )
-        font_width = QFontMetrics( sheet_font ).averageCharWidth()
         sheet_widget.setFont( sheet_font )
-        for col_idx in range( len( self.WO_Sheet.columns ) ):
-            max_col_width = max( 300, round( ScreenWidth * 0.15 ) ) # SHOULD BE COLUMN SENSITIVE! MAKE SURE TO PROPERLY IMPLEMENT LOGIC!
-            for row_idx in range( len( self.WO_Sheet ) ):
-                cel_text = self.WO_Sheet.iloc[ row_idx, col_idx ]
-                sheet_widget.setColumnWidth( col_idx, min( max_col_width, max( sheet_widget.columnWidth( col_idx ), len( cel_text ) * font_width + 10 ) ) )
-                sheet_widget.setItem( row_idx, col_idx, QTableWidgetItem( str( self.WO_Sheet.iloc[ row_idx, col_idx ] ) ) )
-        table_width = sum( sheet_widget.columnWidth( col ) for col in range( sheet_widget.columnCount() ) )
-        if not self.WO_Sheet.empty:
-            sheet_widget.setSpan( 0, 0, 1, sheet_widget.columnCount() )
-            WO_Sheet_header = QTableWidgetItem( str( self.WO_Sheet.iloc[ 0, 0 ] ) )
-            WO_Sheet_header.setTextAlignment( Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter )
-            WO_Sheet_header.setFont( sheet_header_font )
-            sheet_widget.setItem( 0, 0, WO_Sheet_header )
-        sheet_widget.setMinimumWidth( max( 60, table_width + 19 ) )
+        sheet_widget.horizontalHeader().setFont( QFont( font_family, font_size, 2 ) )
+        sheet_widget.horizontalHeader().setSortIndicatorShown( True )
+        sheet_widget.horizontalHeader().sortIndicatorChanged.connect( sheet_model.sort )
+        column_widths = sheet_model.ColumnWidths( QFontMetrics( sheet_font ).averageCharWidth(), max( 300, round( ScreenWidth * 0.15 ) ) )
+        for col_idx, column_width in enumerate( column_widths ): sheet_widget.setColumnWidth( col_idx, column_width )
+        sheet_widget.setMinimumWidth( max( 60, sum( column_widths ) + 19 ) )
         return sheet_widget
 
 placeholder_sheet = {
-    'Work Order': ['WO001', 'WO002', 'WO003', 'WO004', 'WO005'],
-    'Description': ['Repair Laptop', 'Install Software', 'Replace Hard Drive', 'Upgrade RAM', 'Virus Removal'],
-    'Status': ['Completed', 'In Progress', 'Pending', 'Completed', 'In Progress']
+    'code': ['WO001', 'WO002', 'WO003', 'WO004', 'WO005'],
+    'description': ['Repair Laptop', 'Install Software', 'Replace Hard Drive', 'Upgrade RAM', 'Virus Removal'],
+    'status': ['Completed', 'In Progress', 'Pending', 'Completed', 'In Progress']
 } # PLACEHOLDER
-null_work_sheet = WorkOrdersSheet( pd.DataFrame( placeholder_sheet ) ) # PLACEHOLDER
+null_work_sheet = WorkOrdersSheet( placeholder_sheet ) # PLACEHOLDER
+
+analytics_labels = { 'machine': 'Máquina', 'sector': 'Setor', 'manufacturer': 'Fabricante', 'mtbf_days': 'MTBF (dias)', 'mttr_days': 'MTTR (dias)', 'availability': 'Disponibilidade', 'backlog': 'Ordens em Aberto', 'backlog_age_days': 'Idade Média do Backlog (dias)', 'preventive_compliance': 'Cumprimento das Preventivas' }
+
+def EpochDays( values: pd.Series ) -> np.ndarray:
+    dates = pd.to_datetime( values, format = 'ISO8601', errors = 'coerce' ).to_numpy( 'datetime64[D]' )
+    return np.where( np.isnat( dates ), np.nan, dates.astype( 'int64' ) )
+
+def EpochDay( value ) -> float:
+    try: return float( ( date.fromisoformat( str( value )[:10] ) - date( 1970, 1, 1 ) ).days )
+    except ValueError: return np.nan
+
+# Reliability KPIs are derived from a few running sums per machine, sector and manufacturer: work orders are repairs, opened at the failure and closed when it was
+# fixed, and procedures_history entries ({ 'procedure', 'due_date', 'done_date' }) are preventive executions. Rebuild computes the sums for the whole history with
+# grouped operations; afterwards each work order, history entry or machine change only adds its contribution to (or subtracts it from) three groups.
+class MaintenanceAnalytics:
+    dimensions = ( 'machine', 'sector', 'manufacturer' )
+    sum_fields = ( 'machines', 'failures', 'repairs', 'repair_days', 'open_orders', 'open_opened_days', 'preventives', 'preventives_on_time' )
+    def __init__( self ) -> None:
+        self.ready = False
+        self.period_start = float( 'nan' )
+        self.machine_groups = dict()
+        self.sums = { dimension: dict() for dimension in self.dimensions }
+    def Rebuild( self, machine_inv: dict, work_orders: pd.DataFrame, histories ) -> None:
+        self.machine_groups = { machine_key: ( record.get( 'sector', default_sector ), record.get( 'manufacturer', default_manufacturer ) ) for machine_key, record in machine_inv.items() }
+        opened, closed = EpochDays( work_orders[ 'opened' ] ), EpochDays( work_orders[ 'closed' ] )
+        failed, repaired = ~np.isnan( opened ), ~np.isnan( opened ) & ~np.isnan( closed )
+        history_rows = [ ( machine_key, entry.get( 'due_date' ), entry.get( 'done_date' ) ) for machine_key, history in histories for entry in history or () ]
+        history = pd.DataFrame( history_rows, columns = [ 'machine', 'due_date', 'done_date' ] )
+        due, done = EpochDays( history[ 'due_date' ] ), EpochDays( history[ 'done_date' ] )
+        contributions = pd.concat( [
+            pd.DataFrame( { 'machine': work_orders[ 'machine' ].to_numpy( dtype = object ), 'failures': failed, 'repairs': repaired, 'repair_days': np.where( repaired, closed - opened, 0 ),
+                'open_orders': failed & ~repaired, 'open_opened_days': np.where( failed & ~repaired, opened, 0 ) } ),
+            pd.DataFrame( { 'machine': history[ 'machine' ].to_numpy(), 'preventives': ~np.isnan( done ), 'preventives_on_time': done <= due } ),
+            pd.DataFrame( { 'machine': list( self.machine_groups ), 'machines': 1 } ),
+        ] ).dropna( subset = 'machine' ).reindex( columns = ( 'machine', ) + self.sum_fields ).fillna( 0 )
+        machine_sums = contributions.groupby( 'machine' )[ list( self.sum_fields ) ].sum().astype( 'float64' )
+        self.sums[ 'machine' ] = dict( zip( machine_sums.index, machine_sums.to_numpy() ) )
+        for dimension_idx, dimension in enumerate( self.dimensions[1:] ):
+            groups = machine_sums.index.map( lambda machine_key: self.machine_groups.get( machine_key, ( None, None ) )[ dimension_idx ] )
+            group_sums = machine_sums[ groups.notna() ].groupby( groups[ groups.notna() ] ).sum()
+            self.sums[ dimension ] = dict( zip( group_sums.index, group_sums.to_numpy() ) )
+        self.period_start = np.nanmin( np.concatenate( ( opened, due, [ np.nan ] ) ) ) if len( opened ) or len( due ) else np.nan
+        self.ready = True
+    def Apply( self, machine_key: str, delta: np.ndarray ) -> None:
+        for dimension, group in zip( self.dimensions, ( machine_key, ) + self.machine_groups.get( machine_key, ( None, None ) ) ):
+            if group is None: continue
+            if group in self.sums[ dimension ]: self.sums[ dimension ][ group ] += delta
+            else: self.sums[ dimension ][ group ] = delta.copy()
+    def WorkOrderDelta( self, order: dict ) -> np.ndarray:
+        opened, closed = EpochDay( order.get( 'opened' ) ), EpochDay( order.get( 'closed' ) )
+        if np.isnan( opened ): return np.zeros( len( self.sum_fields ) )
+        self.period_start = np.fmin( self.period_start, opened )
+        if np.isnan( closed ): return np.array( ( 0, 1, 0, 0, 1, opened, 0, 0 ), dtype = 'float64' )
+        return np.array( ( 0, 1, 1, closed - opened, 0, 0, 0, 0 ), dtype = 'float64' )
+    def AddWorkOrder( self, order: dict ) -> None:
+        if order.get( 'machine' ) is not None: self.Apply( str( order[ 'machine' ] ), self.WorkOrderDelta( order ) )
+    def RemoveWorkOrder( self, order: dict ) -> None:
+        if order.get( 'machine' ) is not None: self.Apply( str( order[ 'machine' ] ), -self.WorkOrderDelta( order ) )
+    def PreventiveDelta( self, entry: dict ) -> np.ndarray:
+        due, done = EpochDay( entry.get( 'due_date' ) ), EpochDay( entry.get( 'done_date' ) )
+        if np.isnan( done ): return np.zeros( len( self.sum_fields ) )
+        self.period_start = np.fmin( self.period_start, due )
+        return np.array( ( 0, 0, 0, 0, 0, 0, 1, done <= due ), dtype = 'float64' )
+    def AddPreventive( self, machine_key: str, entry: dict ) -> None:
+        self.Apply( machine_key, self.PreventiveDelta( entry ) )
+    def RemovePreventive( self, machine_key: str, entry: dict ) -> None:
+        self.Apply( machine_key, -self.PreventiveDelta( entry ) )
+    def ReplacePreventives( self, machine_key: str, previous_history: list | None, history: list | None ) -> None:
+        if previous_history == history: return
+        for entry in previous_history or (): self.RemovePreventive( machine_key, entry )
+        for entry in history or (): self.AddPreventive( machine_key, entry )
+    def ReplaceWorkOrder( self, previous_order: dict | None, order: dict | None ) -> None:
+        if previous_order: self.RemoveWorkOrder( previous_order )
+        if order: self.AddWorkOrder( order )
+    def SetMachine( self, machine_key: str, record: dict ) -> None:
+        # A machine moving to another sector or manufacturer carries its whole contribution with it.
+        machine_sums = self.sums[ 'machine' ].get( machine_key )
+        machine_sums = np.zeros( len( self.sum_fields ) ) if machine_sums is None else machine_sums.copy()
+        if machine_key in self.machine_groups: self.RemoveMachine( machine_key )
+        machine_sums[0] = 1
+        self.machine_groups[ machine_key ] = ( record.get( 'sector', default_sector ), record.get( 'manufacturer', default_manufacturer ) )
+        self.Apply( machine_key, machine_sums )
+    def RemoveMachine( self, machine_key: str ) -> None:
+        machine_sums = self.sums[ 'machine' ].get( machine_key )
+        if machine_sums is not None and machine_key in self.machine_groups: self.Apply( machine_key, -machine_sums )
+        self.machine_groups.pop( machine_key, None )
+        self.sums[ 'machine' ].pop( machine_key, None )
+    def KPIs( self, dimension: str, today: date | None = None ) -> pd.DataFrame:
+        groups = list( self.sums[ dimension ] )
+        if not groups: return pd.DataFrame( columns = [ dimension, 'mtbf_days', 'mttr_days', 'availability', 'backlog', 'backlog_age_days', 'preventive_compliance' ] )
+        machines, failures, repairs, repair_days, open_orders, open_opened_days, preventives, preventives_on_time = np.array( [ self.sums[ dimension ][ group ] for group in groups ] ).T
+        today_day = float( ( ( today or date.today() ) - date( 1970, 1, 1 ) ).days )
+        calendar_days = machines * max( 1.0, today_day - np.nan_to_num( self.period_start, nan = today_day ) )
+        downtime_days = repair_days + open_orders * today_day - open_opened_days
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            return pd.DataFrame( {
+                dimension: groups,
+                'mtbf_days': np.where( failures > 0, np.maximum( calendar_days - downtime_days, 0 ) / failures, np.nan ),
+                'mttr_days': np.where( repairs > 0, repair_days / repairs, np.nan ),
+                'availability': np.where( calendar_days > 0, np.clip( 1 - downtime_days / calendar_days, 0, 1 ), np.nan ),
+                'backlog': open_orders.astype( int ),
+                'backlog_age_days': np.where( open_orders > 0, today_day - open_opened_days / open_orders, np.nan ),
+                'preventive_compliance': np.where( preventives > 0, preventives_on_time / preventives, np.nan ),
+            } )
+
+main_analytics = MaintenanceAnalytics()
+
+part_labels = { 'part': 'Peça', 'name': 'Descrição', 'unit': 'Unidade', 'on_hand': 'Em Estoque', 'reserved': 'Reservado', 'available': 'Disponível', 'reorder_point': 'Ponto de Pedido', 'daily_usage': 'Consumo Diário', 'lead_time_demand': 'Demanda no Prazo de Entrega', 'horizon_demand': 'Demanda Prevista', 'stockout_days': 'Dias até Faltar', 'order_quantity': 'Quantidade a Pedir' }
+
+# Spare parts: main_db[ 'parts' ] describes each part ({ 'name', 'unit', 'reorder_point', 'reorder_quantity', 'lead_time_days', 'machines' }). Stock moves are
+# 'part_ledger' records ({ 'part', 'quantity', 'date', 'machine', 'work_order', 'procedure' }), positive for receipts and negative for issues, and parts set aside
+# for work orders are 'part_reservations' records ({ 'part', 'quantity', 'machine', 'work_order', 'date' }) until they're issued or cancelled. Preventive
+# procedures list the parts each execution uses in their 'parts' ({ part: quantity }). On hand and reserved quantities are running sums per part; the forecast
+# is computed for every part at once, from the corrective usage in the ledger and the executions the scheduler has due.
+class PartsInventory:
+    default_lead_time_days = 14
+    usage_window_days = 365
+    def __init__( self ) -> None:
+        self.ready = False
+        self.on_hand, self.reserved = dict(), dict()
+    def Rebuild( self, ledger: dict, reservations: dict ) -> None:
+        self.on_hand, self.reserved = self.PartSums( ledger.values() ), self.PartSums( reservations.values() )
+        self.ready = True
+    @staticmethod
+    def PartSums( records ) -> dict[ str, float ]:
+        records = list( records )
+        part_codes, part_keys = pd.factorize( np.array( [ record[ 'part' ] for record in records ], dtype = object ) )
+        sums = np.bincount( part_codes, weights = np.array( [ record[ 'quantity' ] for record in records ], dtype = 'float64' ), minlength = len( part_keys ) )
+        return dict( zip( part_keys, sums.tolist() ) )
+    @staticmethod
+    def Apply( sums: dict[ str, float ], record: dict | None, sign: int ) -> None:
+        if record: sums[ record[ 'part' ] ] = sums.get( record[ 'part' ], 0.0 ) + sign * record[ 'quantity' ]
+    def AddEntry( self, entry: dict ) -> None:
+        self.Apply( self.on_hand, entry, 1 )
+    def RemoveEntry( self, entry: dict ) -> None:
+        self.Apply( self.on_hand, entry, -1 )
+    def AddReservation( self, reservation: dict ) -> None:
+        self.Apply( self.reserved, reservation, 1 )
+    def RemoveReservation( self, reservation: dict ) -> None:
+        self.Apply( self.reserved, reservation, -1 )
+    def Available( self, part_key: str ) -> float:
+        return self.on_hand.get( part_key, 0.0 ) - self.reserved.get( part_key, 0.0 )
+    def Forecast( self, parts: dict, ledger: dict, part_uses: list[ tuple[ str, float, int, float ] ], today: date | None = None, horizon_days: int = 90 ) -> pd.DataFrame:
+        # A part is reordered when what's available, less the demand expected before an order placed today arrives, falls below its reorder point. Planned
+        # demand counts the executions of each procedure ( PlannedPartUses ) that fall inside the horizon or the part's lead time.
+        today = today or date.today()
+        part_index = pd.Index( list( parts ), dtype = object )
+        field = lambda name, default: np.array( [ float( part.get( name ) or default ) for part in parts.values() ], dtype = 'float64' )
+        reorder_point, reorder_quantity, lead_time = field( 'reorder_point', 0 ), field( 'reorder_quantity', 0 ), field( 'lead_time_days', self.default_lead_time_days )
+        entries = list( ledger.values() )
+        entry_parts = part_index.get_indexer( [ entry[ 'part' ] for entry in entries ] )
+        entry_quantities = np.array( [ entry[ 'quantity' ] for entry in entries ], dtype = 'float64' )
+        entry_days = EpochDays( pd.Series( [ entry.get( 'date' ) for entry in entries ], dtype = object ) ) - EpochDay( today.isoformat() )
+        corrective = ( entry_parts >= 0 ) & ( entry_quantities < 0 ) & ( entry_days > -self.usage_window_days ) & ( entry_days <= 0 ) & np.array( [ not entry.get( 'procedure' ) for entry in entries ], dtype = bool )
+        daily_usage = np.bincount( entry_parts[ corrective ], weights = -entry_quantities[ corrective ], minlength = len( part_index ) ) / self.usage_window_days
+        planned_parts = part_index.get_indexer( [ part_key for part_key, _, _, _ in part_uses ] )
+        planned_quantities, planned_due_days, planned_intervals = ( np.array( [ part_use[ column ] for part_use in part_uses ], dtype = 'float64' ) for column in ( 1, 2, 3 ) )
+        known = planned_parts >= 0 # Procedures may list parts that aren't registered (yet).
+        planned_parts, planned_quantities, planned_due_days, planned_intervals = planned_parts[ known ], planned_quantities[ known ], planned_due_days[ known ], planned_intervals[ known ]
+        executions = lambda window_days: np.where( planned_due_days <= window_days, np.floor( ( window_days - planned_due_days ) / planned_intervals ) + 1, 0 )
+        horizon_demand = daily_usage * horizon_days + np.bincount( planned_parts, weights = planned_quantities * executions( horizon_days ), minlength = len( part_index ) )
+        lead_time_demand = daily_usage * lead_time + np.bincount( planned_parts, weights = planned_quantities * executions( lead_time[ planned_parts ] ), minlength = len( part_index ) )
+        on_hand = np.array( [ self.on_hand.get( part_key, 0.0 ) for part_key in part_index ], dtype = 'float64' )
+        reserved = np.array( [ self.reserved.get( part_key, 0.0 ) for part_key in part_index ], dtype = 'float64' )
+        available = on_hand - reserved
+        reorder = available - lead_time_demand < reorder_point
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            forecast = pd.DataFrame( {
+                'part': part_index.to_numpy(),
+                'name': [ part.get( 'name', '' ) for part in parts.values() ],
+                'unit': [ part.get( 'unit', '' ) for part in parts.values() ],
+                'on_hand': on_hand, 'reserved': reserved, 'available': available, 'reorder_point': reorder_point,
+                'daily_usage': daily_usage, 'lead_time_demand': lead_time_demand, 'horizon_demand': horizon_demand,
+                'stockout_days': np.where( horizon_demand > 0, np.maximum( available, 0 ) / ( horizon_demand / horizon_days ), np.nan ),
+                'order_quantity': np.where( reorder, np.maximum( reorder_quantity, reorder_point + lead_time_demand - available ), 0 ),
+            } )
+        return forecast.sort_values( [ 'order_quantity', 'stockout_days' ], ascending = [ False, True ], kind = 'stable', na_position = 'last' ).reset_index( drop = True )
+
+main_parts = PartsInventory()
+parts_horizon_days = 90
+
+def MachineParts( machine_key: str ) -> dict[ str, dict ]:
+    # Parts fitted to the machine and the ones its preventive procedures use.
+    procedure_parts = { part_key for procedure in main_db[ 'machine_inv' ].get( machine_key, dict() ).get( 'procedures_array', () ) for part_key in procedure.get( 'parts' ) or () }
+    return { part_key: part for part_key, part in main_db.get( 'parts', dict() ).items() if part_key in procedure_parts or machine_key in part.get( 'machines', () ) }
+
+def WorkOrderReservations( work_order: str ) -> dict[ str, dict ]:
+    return { reservation_key: reservation for reservation_key, reservation in main_db.get( 'part_reservations', dict() ).items() if reservation.get( 'work_order' ) == work_order }
+
+def CurrentParts() -> PartsInventory:
+    # Stale sums, after a load or changes pulled from another workstation, are rebuilt on the spot, so stock checks never go by them.
+    global main_parts
+    with main_db_lock:
+        if not main_parts.ready:
+            parts = PartsInventory()
+            parts.Rebuild( main_db.get( 'part_ledger', dict() ), main_db.get( 'part_reservations', dict() ) )
+            main_parts = parts
+        return main_parts
+
+def AddLedgerEntry( part_key: str, quantity: float, machine_key: str | None = None, work_order: str | None = None, procedure: str | None = None ) -> str:
+    # Under the lock, so the check and the sums always agree with the ledger.
+    with main_db_lock:
+        if part_key not in main_db.get( 'parts', dict() ): raise Exception( f'{ part_key } isn\'t a registered part.' )
+        parts = CurrentParts()
+        if quantity < 0 and parts.on_hand.get( part_key, 0.0 ) < -quantity: raise Exception( f'Only { parts.on_hand.get( part_key, 0.0 ):g} of { part_key } in stock.' )
+        entry = { 'part': part_key, 'quantity': quantity, 'date': date.today().isoformat(), 'machine': machine_key, 'work_order': work_order, 'procedure': procedure }
+        entry_key = NewRecordKey()
+        SetRecord( ( 'part_ledger', entry_key ), entry )
+        parts.AddEntry( entry )
+    return entry_key
+
+def ReceivePart( part_key: str, quantity: float ) -> str:
+    if quantity <= 0: raise Exception( 'The quantity received must be positive.' )
+    return AddLedgerEntry( part_key, quantity )
+
+def IssuePart( part_key: str, quantity: float, machine_key: str | None, work_order: str | None = None, procedure: str | None = None ) -> str:
+    if quantity <= 0: raise Exception( 'The quantity issued must be positive.' )
+    return AddLedgerEntry( part_key, -quantity, machine_key, work_order, procedure )
+
+def ReservePart( part_key: str, quantity: float, work_order: str, machine_key: str | None = None ) -> str:
+    # Reserving more than is available is allowed, the work order waits for the parts and the shortfall shows up in the forecast as a reorder.
+    if quantity <= 0: raise Exception( 'The quantity reserved must be positive.' )
+    with main_db_lock:
+        if part_key not in main_db.get( 'parts', dict() ): raise Exception( f'{ part_key } isn\'t a registered part.' )
+        reservation = { 'part': part_key, 'quantity': quantity, 'machine': machine_key, 'work_order': work_order, 'date': date.today().isoformat() }
+        reservation_key = NewRecordKey()
+        SetRecord( ( 'part_reservations', reservation_key ), reservation )
+        CurrentParts().AddReservation( reservation )
+    return reservation_key
+
+def CancelReservation( reservation_key: str ) -> dict:
+    with main_db_lock:
+        reservation = main_db[ 'part_reservations' ][ reservation_key ]
+        DeleteRecord( ( 'part_reservations', reservation_key ) )
+        CurrentParts().RemoveReservation( reservation )
+    return reservation
+
+def IssueReservation( reservation_key: str ) -> str:
+    with main_db_lock:
+        reservation = main_db[ 'part_reservations' ][ reservation_key ]
+        on_hand = CurrentParts().on_hand.get( reservation[ 'part' ], 0.0 )
+        if on_hand < reservation[ 'quantity' ]: raise Exception( f'Only { on_hand:g} of { reservation[ 'part' ] } in stock.' )
+        CancelReservation( reservation_key )
+        return IssuePart( reservation[ 'part' ], reservation[ 'quantity' ], reservation.get( 'machine' ), reservation[ 'work_order' ] )
+
+class JobCancelled( Exception ): pass
+
+class JobSignals( QObject ):
+    progress = pyqtSignal( int, int )
+    finished = pyqtSignal( object )
+    failed = pyqtSignal( object )
+    cancelled = pyqtSignal()
+
+# Runs function( job, *args, **kwargs ) on the pool. The function reports through job.ReportProgress, which is also where a requested cancellation surfaces,
+# and its result or exception comes back through queued signals, so the connected callbacks always run on the GUI thread.
+class Job( QRunnable ):
+    def __init__( self, function, *args, **kwargs ) -> None:
+        super().__init__()
+        self.function, self.args, self.kwargs = function, args, kwargs
+        self.signals = JobSignals()
+        self.cancel_event = Event()
+        self.setAutoDelete( False )
+    def Cancel( self ) -> None:
+        self.cancel_event.set()
+    def ReportProgress( self, done: int, total: int ) -> None:
+        if self.cancel_event.is_set(): raise JobCancelled()
+        self.signals.progress.emit( done, total )
+    def run( self ) -> None:
+        try: result = self.function( self, *self.args, **self.kwargs )
+        except JobCancelled: self.signals.cancelled.emit()
+        except Exception as error: self.signals.failed.emit( error )
+        else: self.signals.finished.emit( result )
+
+class JobManager:
+    def __init__( self, thread_pool: QThreadPool | None = None ) -> None:
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.active_jobs = set()
+    def Submit( self, function, *args, on_finished = None, on_failed = None, on_progress = None, on_cancelled = None, **kwargs ) -> Job:
+        job = Job( function, *args, **kwargs )
+        for signal, callback in ( ( job.signals.finished, on_finished ), ( job.signals.failed, on_failed ), ( job.signals.progress, on_progress ), ( job.signals.cancelled, on_cancelled ) ):
+            if callback: signal.connect( callback )
+        for signal in ( job.signals.finished, job.signals.failed, job.signals.cancelled ): signal.connect( lambda *_, job = job: self.active_jobs.discard( job ) )
+        self.active_jobs.add( job ) # Keeps the job and its signals alive until they've been delivered.
+        self.thread_pool.start( job )
+        return job
+    def CancelAll( self ) -> None:
+        for job in tuple( self.active_jobs ): job.Cancel()
+    def WaitForDone( self ) -> None:
+        self.thread_pool.waitForDone()
+
+job_manager = JobManager()
+
+@Timed( 'load_database' )
+def LoadDatabaseJob( job: Job ) -> tuple:
+    # Everything here works on fresh objects, the GUI keeps using the current ones until InstallDatabase swaps them in.
+    job.ReportProgress( 0, 5 )
+    loaded_db = main_db_storage.Load()
+    main_db_storage.SplitDetails( loaded_db )
+    return BuildDatabaseIndexes( job, loaded_db )
+
+@Timed( 'rebuild_indexes' )
+def RebuildIndexesJob( job: Job ) -> tuple:
+    with main_db_lock: return BuildDatabaseIndexes( job, main_db )
+
+def BuildDatabaseIndexes( job: Job, loaded_db: dict ) -> tuple:
+    machine_inv = { machine_key: MachineRecord( machine_key, record ) for machine_key, record in loaded_db[ 'machine_inv' ].items() } if main_db_columns else loaded_db[ 'machine_inv' ]
+    job.ReportProgress( 1, 5 )
+    search_index = MachineSearchIndex()
+    search_index.Rebuild( machine_inv )
+    job.ReportProgress( 2, 5 )
+    uniqueness_index = MachineUniquenessIndex()
+    uniqueness_index.Rebuild( machine_inv )
+    job.ReportProgress( 3, 5 )
+    scheduler = MaintenanceScheduler()
+    scheduler.Rebuild( machine_inv )
+    job.ReportProgress( 4, 5 )
+    columns = None
+    if main_db_columns:
+        columns = ColumnarInventory()
+        columns.Rebuild( machine_inv )
+        for machine_key, record in machine_inv.items(): loaded_db[ 'machine_inv' ][ machine_key ] = columns.Strip( record )
+    job.ReportProgress( 5, 5 )
+    return loaded_db, search_index, uniqueness_index, scheduler, columns
+
+def InstallDatabase( loaded_db: dict, search_index: MachineSearchIndex, uniqueness_index: MachineUniquenessIndex, scheduler: MaintenanceScheduler, columns: ColumnarInventory | None ) -> None:
+    global main_search_index, machine_uniqueness_index, main_scheduler, main_db_columns, main_analytics, main_parts
+    if loaded_db is not main_db:
+        with main_db_lock:
+            main_db.clear()
+            main_db.update( loaded_db )
+    main_search_index, machine_uniqueness_index, main_scheduler = search_index, uniqueness_index, scheduler
+    if columns: main_db_columns = columns
+    main_analytics = MaintenanceAnalytics() # Rebuilt from the new data the next time it's shown.
+    main_parts = PartsInventory()
+    machine_cache.clear()
+
+def SaveChangesJob( job: Job ) -> int:
+    return SaveChanges()
+
+@Timed( 'sync_changes' )
+def SyncChangesJob( job: Job ) -> None:
+    with main_db_lock: main_db_storage.Synchronize( main_db )
+
+def DiscardChangesJob( job: Job, changes: list[ dict ] ) -> None:
+    with main_db_lock: main_db_storage.Discard( main_db, changes )
+
+@Timed( 'ingest_attachments' )
+def IngestAttachmentsJob( job: Job, paths: list[ str ], machine_key: str, work_order: str | None ) -> int:
+    # Progress is reported in KiB, byte counts of large files don't fit the signal's int.
+    total_kib, ingested_bytes = sum( getsize( path ) for path in paths ) >> 10, 0
+    for path in paths:
+        record = main_attachments.Ingest( path, lambda done_bytes: job.ReportProgress( ( ingested_bytes + done_bytes ) >> 10, total_kib ) )
+        SetRecord( ( 'attachments', NewRecordKey() ), record | { 'machine': machine_key, 'work_order': work_order } )
+        ingested_bytes += record[ 'size' ]
+    return len( paths )
+
+@Timed( 'attachment_thumbnails' )
+def AttachmentThumbnailsJob( job: Job, records: dict[ str, dict ] ) -> dict[ str, QImage ]:
+    thumbnails = dict()
+    for attachment_key, record in records.items():
+        thumbnail = main_attachments.Thumbnail( record, attachment_thumbnail_size )
+        if thumbnail is not None: thumbnails[ attachment_key ] = thumbnail
+    return thumbnails
+
+def ExportAttachmentJob( job: Job, digest: str, path: str ) -> str:
+    return main_attachments.Export( digest, path )
+
+@Timed( 'inventory_search' )
+def InventorySearchJob( job: Job, search_filter_text: str, status_filter: str | None = None ) -> list[ str ]:
+    machine_keys = main_search_index.Query( search_filter_text )
+    if status_filter is None: return machine_keys
+    with main_db_lock: status_keys = set( MachinesWithStatus( main_db[ 'machine_inv' ], main_db_columns, status_filter ) )
+    return [ machine_key for machine_key in machine_keys if machine_key in status_keys ]
+
+@Timed( 'analytics' )
+def AnalyticsJob( job: Job ) -> MaintenanceAnalytics:
+    analytics = MaintenanceAnalytics()
+    with main_db_lock:
+        job.ReportProgress( 0, 3 )
+        work_orders = WorkOrdersFrame( main_db.get( 'work_orders', dict() ) )
+        job.ReportProgress( 1, 3 )
+        machine_inv = { machine_key: MachineRecord( machine_key, record ) for machine_key, record in main_db[ 'machine_inv' ].items() } if main_db_columns else main_db[ 'machine_inv' ]
+        histories = [ ( machine_key, record[ 'procedures_history' ] ) for machine_key, record in machine_inv.items() if 'procedures_history' in record ]
+        histories += [ ( machine_key, history ) for machine_key, history in main_db_storage.ReadAllDetails( 'procedures_history' ) if 'procedures_history' not in machine_inv.get( machine_key, { 'procedures_history': None } ) ]
+        job.ReportProgress( 2, 3 )
+        analytics.Rebuild( machine_inv, work_orders, histories )
+    job.ReportProgress( 3, 3 )
+    return analytics
+
+@Timed( 'parts_forecast' )
+def PartsForecastJob( job: Job, horizon_days: int ) -> pd.DataFrame:
+    with main_db_lock:
+        job.ReportProgress( 0, 3 )
+        parts = CurrentParts()
+        job.ReportProgress( 1, 3 )
+        planning_days = max( [ horizon_days ] + [ float( part.get( 'lead_time_days' ) or PartsInventory.default_lead_time_days ) for part in main_db.get( 'parts', dict() ).values() ] )
+        part_uses = PlannedPartUses( main_scheduler, date.today(), planning_days )
+        job.ReportProgress( 2, 3 )
+        forecast = parts.Forecast( main_db.get( 'parts', dict() ), main_db.get( 'part_ledger', dict() ), part_uses, horizon_days = horizon_days )
+    job.ReportProgress( 3, 3 )
+    return forecast
+
+@cache
+def SpreadsheetColumnNames() -> dict[ str, str ]:
+    return { NormalizeSearchText( name ): internal_name for internal_name, label in zip( attribute_internal_names, attribute_labels ) for name in ( internal_name, label ) } | { 'KEY': 'key', 'CHAVE': 'key' }
+importable_statuses = set( status_dict.keys() ) - { 'Nenhuma máquina selecionada' }
+
+def ReadSpreadsheetChunks( path: str, chunk_size: int, header: bool = True ):
+    # CSV through pandas' chunked reader, XLSX row by row through openpyxl's read-only mode; either way only one chunk is in memory. Every cell is read as text.
+    if path.lower().endswith( '.csv' ):
+        yield from pd.read_csv( path, chunksize = chunk_size, dtype = str, keep_default_na = False, header = 0 if header else None, sep = None, engine = 'python' )
+        return
+    from openpyxl import load_workbook
+    workbook = load_workbook( path, read_only = True, data_only = True )
+    try:
+        sheet_rows = workbook.active.iter_rows( values_only = True )
+        columns = [ str( name ) for name in next( sheet_rows, () ) ] if header else None
+        chunk_rows = list()
+        for sheet_row in sheet_rows:
+            chunk_rows.append( [ '' if value is None else str( value ) for value in sheet_row ] )
+            if len( chunk_rows ) == chunk_size:
+                yield pd.DataFrame( chunk_rows, columns = columns )
+                chunk_rows = list()
+        if chunk_rows: yield pd.DataFrame( chunk_rows, columns = columns )
+    finally: workbook.close()
+
+def NewMachineKeys():
+    next_key = max( ( int( machine_key ) for machine_key in main_db[ 'machine_inv' ] if machine_key.isdigit() ), default = 0 ) + 1
+    while True:
+        if str( next_key ) not in main_db[ 'machine_inv' ]: yield str( next_key )
+        next_key += 1
+
+@Timed( 'import_inventory' )
+def ImportInventoryJob( job: Job, path: str, chunk_size: int = 5000 ) -> tuple[ list[ tuple[ int, str | None, dict ] ], list[ str ] ]:
+    # Only reads and validates, one chunk at a time; the rows are applied to main_db on the GUI thread by ApplyInventoryImport. Blank cells are left out, so a row
+    # for an existing machine only updates the fields it fills.
+    import_rows, row_errors, rows_read = list(), list(), 0
+    for chunk in ReadSpreadsheetChunks( path, chunk_size ):
+        job.ReportProgress( rows_read, 0 )
+        column_names = { column: SpreadsheetColumnNames().get( NormalizeSearchText( str( column ) ).strip() ) for column in chunk.columns }
+        chunk = chunk[ [ column for column in chunk.columns if column_names[ column ] ] ].rename( columns = column_names )
+        chunk = chunk.loc[ :, ~chunk.columns.duplicated() ].apply( lambda column: column.str.strip() )
+        invalid_rows = ( chunk[ 'status' ] != '' ) & ~chunk[ 'status' ].isin( importable_statuses ) if 'status' in chunk else pd.Series( False, index = chunk.index )
+        for row_idx in np.flatnonzero( invalid_rows.to_numpy() ): row_errors.append( f'Linha { rows_read + row_idx + 2 }: status "{ chunk[ 'status' ].iat[ row_idx ] }" inválido' )
+        for row_idx, record in zip( np.flatnonzero( ~invalid_rows.to_numpy() ), chunk[ ~invalid_rows ].to_dict( 'records' ) ):
+            machine_key = record.pop( 'key', '' ) or None
+            record = { name: value for name, value in record.items() if value != '' }
+            if 'id' in record and record[ 'id' ].isdigit(): record[ 'id' ] = int( record[ 'id' ] )
+            import_rows.append( ( rows_read + int( row_idx ) + 2, machine_key, record ) )
+        rows_read += len( chunk )
+    job.ReportProgress( rows_read, rows_read )
+    return import_rows, row_errors
+
+def ApplyInventoryImport( import_rows: list[ tuple[ int, str | None, dict ] ] ) -> tuple[ int, list[ str ] ]:
+    # Rows are matched to existing machines by key, then by numeric ID. Existing machines are updated field by field so their paged-out details stay where they
+    # are; new ones need a type.
+    imported_rows, row_errors = 0, list()
+    with main_db_lock:
+        machine_ids = { machine_key: NumericMachineId( MachineRecord( machine_key, record ).get( 'id' ) ) for machine_key, record in main_db[ 'machine_inv' ].items() }
+        id_keys = { numeric_id: machine_key for machine_key, numeric_id in machine_ids.items() if numeric_id is not None }
+        new_keys = NewMachineKeys()
+        for row_number, machine_key, record in import_rows:
+            if machine_key is None: machine_key = id_keys.get( NumericMachineId( record.get( 'id' ) ) )
+            if machine_key in main_db[ 'machine_inv' ]:
+                for name, value in record.items(): SetRecord( ( 'machine_inv', machine_key, name ), value )
+            elif 'type' not in record:
+                row_errors.append( f'Linha { row_number }: tipo vazio' )
+                continue
+            else:
+                machine_key = machine_key or next( new_keys )
+                SetRecord( ( 'machine_inv', machine_key ), record )
+            if NumericMachineId( record.get( 'id' ) ) is not None: id_keys[ NumericMachineId( record[ 'id' ] ) ] = machine_key
+            imported_rows += 1
+    return imported_rows, row_errors
+
+def ImportSheetJob( job: Job, path: str ) -> dict[ str, list ]:
+    # The whole sheet replaces the machine's, cells as text and columns lettered like the spreadsheet's. Set on the GUI thread by SheetImported.
+    sheet_chunks = list( ReadSpreadsheetChunks( path, 1000, header = False ) )
+    if not sheet_chunks: raise Exception( 'A planilha está vazia.' )
+    sheet = pd.concat( sheet_chunks, ignore_index = True )
+    sheet.columns = [ chr( ord( 'A' ) + col_idx ) for col_idx in range( len( sheet.columns ) ) ]
+    return sheet.to_dict( 'list' )
+
+def WriteSpreadsheetChunks( path: str, columns: list[ str ], chunks ) -> int:
+    written_rows = 0
+    if path.lower().endswith( '.csv' ):
+        with open( path, 'w', newline = '', encoding = 'utf-8-sig' ) as spreadsheet_file:
+            pd.DataFrame( columns = columns ).to_csv( spreadsheet_file, index = False )
+            for chunk in chunks:
+                chunk.to_csv( spreadsheet_file, index = False, header = False )
+                written_rows += len( chunk )
+        return written_rows
+    from openpyxl import Workbook
+    workbook = Workbook( write_only = True )
+    sheet = workbook.create_sheet()
+    sheet.append( columns )
+    for chunk in chunks:
+        for sheet_row in chunk.itertuples( index = False ): sheet.append( [ None if value is None or value != value else value for value in sheet_row ] )
+        written_rows += len( chunk )
+    workbook.save( path )
+    return written_rows
+
+def ExportInventoryJob( job: Job, path: str, chunk_size: int = 10000 ) -> int:
+    with main_db_lock: machine_keys = list( main_db[ 'machine_inv' ] )
+    def InventoryChunks():
+        for chunk_start in range( 0, len( machine_keys ), chunk_size ):
+            job.ReportProgress( chunk_start, len( machine_keys ) )
+            with main_db_lock: records = [ MachineRecord( machine_key, main_db[ 'machine_inv' ].get( machine_key, dict() ) ) for machine_key in machine_keys[ chunk_start : chunk_start + chunk_size ] ]
+            yield pd.DataFrame( [ [ machine_key ] + [ record.get( name, attribute_defaults[ name ] ) for name in attribute_internal_names ] for machine_key, record in zip( machine_keys[ chunk_start : chunk_start + chunk_size ], records ) ] )
+    return WriteSpreadsheetChunks( path, [ 'Chave' ] + list( attribute_labels ), InventoryChunks() )
+
+def ExportWorkOrdersJob( job: Job, path: str, chunk_size: int = 10000 ) -> int:
+    with main_db_lock: work_orders = WorkOrdersFrame( main_db.get( 'work_orders', dict() ) )
+    def WorkOrderChunks():
+        for chunk_start in range( 0, len( work_orders ), chunk_size ):
+            job.ReportProgress( chunk_start, len( work_orders ) )
+            yield work_orders.iloc[ chunk_start : chunk_start + chunk_size ]
+    return WriteSpreadsheetChunks( path, [ work_order_labels[ column ] for column in work_order_columns ], WorkOrderChunks() )
 
 class MainWindow( QWidget ):
     def __init__( self ) -> None:
@@ -245,43 +1749,158 @@ class MainWindow( QWidget ):
         self.setGeometry( round( ScreenWidth * 0.1 ), round( ScreenHeight * 0.1 ), round( ScreenWidth * 0.8 ), round( ScreenHeight * 0.8 ) )
         self.tab = QTabWidget( self )
         
+        # Tabs start empty and are filled in the first time they're selected, the one on screen right after the window is shown.
+        self.cal_tab, self.doc_tab, self.his_tab, self.inv_tab, self.par_tab = QWidget( self ), QWidget( self ), QWidget( self ), QWidget( self ), QWidget( self )
+        self.tab.addTab( self.cal_tab, 'Calendário de Manutenções Preventivas' )
+        self.tab.addTab( self.doc_tab, 'Controle de Manutenções Preventivas' )
+        self.tab.addTab( self.his_tab, 'Registro de Ordens de Serviço' )
+        self.tab.addTab( self.inv_tab, 'Inventário de Máquinas' )
+        self.tab.addTab( self.par_tab, 'Peças de Reposição' )
+        self.tab_builders = { self.cal_tab: self.BuildCalendarTab, self.doc_tab: self.BuildDocumentationTab, self.his_tab: self.BuildRepairRegistryTab, self.inv_tab: self.BuildInventoryTab, self.par_tab: self.BuildPartsTab }
+        self.tab.currentChanged.connect( self.BuildTab )
+        self.main_layout.addWidget( self.tab, 0, 0, 1, 1 )
+        
+        self.work_orders_sheet = null_work_sheet
+        self.worksheet = None
+        self.inv_tab_search_enabled = True
+        self.inv_tab_search_timer = QTimer( self )
+        self.inv_tab_search_timer.setSingleShot( True )
+        self.inv_tab_search_timer.setInterval( 150 )
+        self.inv_tab_search_timer.timeout.connect( self.RunInventorySearch )
+        self.inv_tab_search_sequence = 0
+        self.inv_tab_list_model = MachineListModel( main_db[ 'machine_inv' ], main_search_index, self )
+        self.database_loading, self.sync_running = False, False
+        self.selected_machine_key = None
+        self.doc_tab_thumbnails_sequence = 0
+        self.par_tab_forecast_sequence = 0
+        self.sync_timer = QTimer( self )
+        self.sync_timer.setInterval( 3000 )
+        self.sync_timer.timeout.connect( self.CheckRemoteChanges )
+        
+        self.save_buttom = QPushButton( 'Salvar Alterações' )
+        self.save_buttom.setEnabled( False )
+        self.save_buttom.clicked.connect( self.SaveChangesClick )
+        self.main_layout.addWidget( self.save_buttom, 2, 0, alignment = Qt.AlignmentFlag.AlignBottom )
+        self.job_progress_bar = QProgressBar()
+        self.job_progress_bar.setVisible( False )
+        self.main_layout.addWidget( self.job_progress_bar, 3, 0 )
+        self.job_cancel_button = QPushButton( 'Cancelar' )
+        self.job_cancel_button.setVisible( False )
+        self.job_cancel_button.clicked.connect( job_manager.CancelAll )
+        self.main_layout.addWidget( self.job_cancel_button, 3, 1 )
+    
+    def Startup( self ) -> None:
+        # Runs once the window has been painted: the visible tab is filled in, then the ini file is read and the database load is started.
+        self.BuildTab( self.tab.currentIndex() )
+        ReadConfig()
+        if diagnostics.enabled:
+            self.diagnostics_button = QPushButton( 'Diagnóstico' )
+            self.diagnostics_button.clicked.connect( self.ShowDiagnostics )
+            self.main_layout.addWidget( self.diagnostics_button, 2, 1, alignment = Qt.AlignmentFlag.AlignBottom )
+        self.LoadDatabase()
+        self.sync_timer.start()
+    
+    def BuildTab( self, tab_idx: int ) -> None:
+        tab_builder = self.tab_builders.pop( self.tab.widget( tab_idx ), None )
+        if tab_builder: tab_builder()
+    
+    def TabBuilt( self, tab: QWidget ) -> bool:
+        return tab not in self.tab_builders
+    
+    def BuildCalendarTab( self ) -> None:
         # Maintenance Calendar
-        self.cal_tab = QWidget( self )
         self.cal_tab_layout = QVBoxLayout()
+        self.cal_tab_overdue_label = QLabel( 'Manutenções Atrasadas' )
+        self.cal_tab_overdue_list = QListWidget()
+        self.cal_tab_upcoming_label = QLabel( 'Manutenções dos Próximos 7 Dias' )
+        self.cal_tab_upcoming_list = QListWidget()
+        for cal_tab_widget in ( self.cal_tab_overdue_label, self.cal_tab_overdue_list, self.cal_tab_upcoming_label, self.cal_tab_upcoming_list ): self.cal_tab_layout.addWidget( cal_tab_widget )
         self.cal_tab.setLayout( self.cal_tab_layout )
-        self.tab.addTab( self.cal_tab, 'Calendário de Manutenções Preventivas' )
-        
+        self.update_cal_tab_lists()
+    
+    def BuildDocumentationTab( self ) -> None:
         # Preventive Maintenance Documentation
-        self.doc_tab = QWidget( self )
         self.doc_tab_layout = QVBoxLayout()
+        self.doc_tab_machine_label = QLabel()
+        self.doc_tab_layout.addWidget( self.doc_tab_machine_label )
+        self.doc_tab_work_order = QComboBox()
+        self.doc_tab_work_order.currentIndexChanged.connect( self.UpdateAttachmentList )
+        self.doc_tab_layout.addWidget( self.doc_tab_work_order, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.doc_tab_buttons_layout = QHBoxLayout()
+        self.doc_tab_attach = QPushButton( 'Anexar Arquivos' )
+        self.doc_tab_attach.clicked.connect( self.AttachFilesClick )
+        self.doc_tab_open = QPushButton( 'Abrir Anexo' )
+        self.doc_tab_open.clicked.connect( lambda: self.ExportAttachmentClick( open_file = True ) )
+        self.doc_tab_save = QPushButton( 'Salvar Anexo Como' )
+        self.doc_tab_save.clicked.connect( lambda: self.ExportAttachmentClick( open_file = False ) )
+        self.doc_tab_remove = QPushButton( 'Remover Anexo' )
+        self.doc_tab_remove.clicked.connect( self.RemoveAttachmentClick )
+        for doc_tab_button in ( self.doc_tab_attach, self.doc_tab_open, self.doc_tab_save, self.doc_tab_remove ): self.doc_tab_buttons_layout.addWidget( doc_tab_button )
+        self.doc_tab_buttons_layout.addStretch()
+        self.doc_tab_layout.addLayout( self.doc_tab_buttons_layout )
+        self.doc_tab_attachments = QListWidget()
+        self.doc_tab_attachments.setViewMode( QListView.ViewMode.IconMode )
+        self.doc_tab_attachments.setIconSize( QSize( attachment_thumbnail_size, attachment_thumbnail_size ) )
+        self.doc_tab_attachments.setGridSize( QSize( attachment_thumbnail_size + 40, attachment_thumbnail_size + 40 ) )
+        self.doc_tab_attachments.setResizeMode( QListView.ResizeMode.Adjust )
+        self.doc_tab_attachments.setWordWrap( True )
+        self.doc_tab_attachments.itemDoubleClicked.connect( lambda _: self.ExportAttachmentClick( open_file = True ) )
+        self.doc_tab_attachments.itemSelectionChanged.connect( self.UpdateAttachmentButtons )
+        self.doc_tab_layout.addWidget( self.doc_tab_attachments )
         self.doc_tab.setLayout( self.doc_tab_layout )
-        self.tab.addTab( self.doc_tab, 'Controle de Manutenções Preventivas' )
-        
+        self.ShowMachineAttachments()
+    
+    def BuildRepairRegistryTab( self ) -> None:
         # Repair Registry
-        self.his_tab = QWidget( self )
         self.his_tab_layout = QVBoxLayout()
-        self.worksheet = null_work_sheet.GetSheet()
-        self.his_tab_layout.addWidget( self.worksheet )
+        self.his_tab_status_filter = QComboBox()
+        self.his_tab_status_filter.currentTextChanged.connect( self.FilterWorkOrders )
+        self.his_tab_layout.addWidget( self.his_tab_status_filter, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.his_tab_buttons_layout = QHBoxLayout()
+        self.his_tab_new_order = QPushButton( 'Nova Ordem de Serviço' )
+        self.his_tab_new_order.clicked.connect( self.NewWorkOrderClick )
+        self.his_tab_set_status = QPushButton( 'Alterar Status' )
+        self.his_tab_set_status.clicked.connect( self.SetWorkOrderStatusClick )
+        self.his_tab_delete_order = QPushButton( 'Excluir Ordem de Serviço' )
+        self.his_tab_delete_order.clicked.connect( self.DeleteWorkOrderClick )
+        for his_tab_button in ( self.his_tab_new_order, self.his_tab_set_status, self.his_tab_delete_order ): self.his_tab_buttons_layout.addWidget( his_tab_button )
+        self.his_tab_buttons_layout.addStretch()
+        self.his_tab_layout.addLayout( self.his_tab_buttons_layout )
+        self.his_tab_export = QPushButton( 'Exportar Ordens de Serviço' )
+        self.his_tab_export.clicked.connect( lambda: self.ExportClick( ExportWorkOrdersJob, 'Exportar Ordens de Serviço' ) )
+        self.his_tab_layout.addWidget( self.his_tab_export, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.his_tab_analytics = QPushButton( 'Indicadores de Confiabilidade' )
+        self.his_tab_analytics.clicked.connect( self.ShowAnalytics )
+        self.his_tab_layout.addWidget( self.his_tab_analytics, alignment = Qt.AlignmentFlag.AlignLeft )
         self.his_tab.setLayout( self.his_tab_layout )
-        self.tab.addTab( self.his_tab, 'Registro de Ordens de Serviço' )
-        
+        self.SetWorkOrdersSheet( self.work_orders_sheet )
+    
+    def BuildInventoryTab( self ) -> None:
         # Machine Inventory
-        self.inv_tab = QWidget( self )
         self.inv_tab_layout = QGridLayout()
         self.inv_tab.setLayout( self.inv_tab_layout )
+        self.inv_tab_search_layout = QHBoxLayout()
         self.inv_tab_search_bar = QLineEdit()
         self.inv_tab_search_bar.setPlaceholderText( 'Buscar Máquina...' )
-        self.inv_tab_search_bar.setFixedWidth( min( 450, round( ScreenWidth * 0.4 ) ) + 37 )
-        self.inv_tab_layout.addWidget( self.inv_tab_search_bar, 0, 0, 1, 1, alignment = Qt.AlignmentFlag.AlignLeft )
-        self.inv_tab_scroll_area = QScrollArea()
-        self.inv_tab_scroll_area.setFixedWidth( min( 450, round( ScreenWidth * 0.4 ) ) + 37 )
-        self.inv_tab_scroll_widget = QWidget()
-        self.inv_tab_scroll_layout = QVBoxLayout()
-        self.inv_tab_scroll_layout.setSpacing( 0 )
-        self.update_inv_tab_scroll_list()
-        self.inv_tab_scroll_widget.setLayout( self.inv_tab_scroll_layout )
-        self.inv_tab_scroll_area.setWidget( self.inv_tab_scroll_widget )
-        self.inv_tab_layout.addWidget( self.inv_tab_scroll_area, 1, 0, -1, 1, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.inv_tab_search_bar.setFixedWidth( min( 450, round( ScreenWidth * 0.4 ) ) + 37 - 166 )
+        self.inv_tab_search_bar.setEnabled( self.inv_tab_search_enabled )
+        self.inv_tab_search_bar.textChanged.connect( self.update_inv_tab_scroll_list )
+        self.inv_tab_search_layout.addWidget( self.inv_tab_search_bar )
+        self.inv_tab_status_filter = QComboBox()
+        self.inv_tab_status_filter.setFixedWidth( 160 )
+        self.inv_tab_status_filter.addItem( 'Todos os status', None )
+        for status in machine_statuses: self.inv_tab_status_filter.addItem( status, status )
+        self.inv_tab_status_filter.currentIndexChanged.connect( self.RunInventorySearch )
+        self.inv_tab_search_layout.addWidget( self.inv_tab_status_filter )
+        self.inv_tab_layout.addLayout( self.inv_tab_search_layout, 0, 0, 1, 1, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.UpdateStatusCounts()
+        self.inv_tab_list_view = QListView()
+        self.inv_tab_list_view.setModel( self.inv_tab_list_model )
+        self.inv_tab_list_view.setUniformItemSizes( True )
+        self.inv_tab_list_view.setFixedWidth( min( 450, round( ScreenWidth * 0.4 ) ) + 37 )
+        self.inv_tab_list_view.setStyleSheet( 'QListView { font-family: Arial; font-size: 7pt; } QListView::item { height: 15px; }' )
+        self.inv_tab_list_view.clicked.connect( self.SelectMachine )
+        self.inv_tab_layout.addWidget( self.inv_tab_list_view, 1, 0, -1, 1, alignment = Qt.AlignmentFlag.AlignLeft )
         self.inv_tab_add_machine = QPushButton( 'Adicionar Máquina' )
         #self.inv_tab_add_machine.clicked.connect(  )
         self.inv_tab_layout.addWidget( self.inv_tab_add_machine, 0, 1, 1, 1 )
@@ -297,6 +1916,16 @@ class MainWindow( QWidget ):
         self.inv_tab_machine_history.setEnabled( False )
         #self.inv_tab_machine_history.clicked.connect(  )
         self.inv_tab_layout.addWidget( self.inv_tab_machine_history, 1, 2, 1, 1, alignment = Qt.AlignmentFlag.AlignTop )
+        self.inv_tab_import = QPushButton( 'Importar Planilha' )
+        self.inv_tab_import.clicked.connect( self.ImportInventoryClick )
+        self.inv_tab_layout.addWidget( self.inv_tab_import, 0, 3, 1, 1 )
+        self.inv_tab_export = QPushButton( 'Exportar Inventário' )
+        self.inv_tab_export.clicked.connect( lambda: self.ExportClick( ExportInventoryJob, 'Exportar Inventário' ) )
+        self.inv_tab_layout.addWidget( self.inv_tab_export, 1, 3, 1, 1, alignment = Qt.AlignmentFlag.AlignTop )
+        self.inv_tab_import_sheet = QPushButton( 'Importar Ficha Técnica' )
+        self.inv_tab_import_sheet.setEnabled( False )
+        self.inv_tab_import_sheet.clicked.connect( self.ImportSheetClick )
+        self.inv_tab_layout.addWidget( self.inv_tab_import_sheet, 0, 4, 1, 1 )
         self.inv_tab_info_display_scroll = QScrollArea()
         self.inv_tab_info_display_scroll.setMinimumHeight( min( 300, round( ScreenHeight * 0.35 ) ) )
         self.inv_tab_info_display = QWidget()
@@ -309,28 +1938,542 @@ class MainWindow( QWidget ):
         self.inv_tab_info_display.setLayout( self.inv_tab_info_display_layout )
         self.inv_tab_info_display_scroll.setWidget( self.inv_tab_info_display )
         self.inv_tab_layout.addWidget( self.inv_tab_info_display_scroll, 2, 1, -1, 2 )
-        self.tab.addTab( self.inv_tab, 'Inventário de Máquinas' )
-        self.main_layout.addWidget( self.tab, 0, 0, 1, 1 )
-        
-        self.save_buttom = QPushButton( 'Salvar Alterações' )
-        self.save_buttom.setEnabled( False )
-        self.save_buttom.clicked.connect( self.SaveChangesClick )
-        self.main_layout.addWidget( self.save_buttom, 2, 0, alignment = Qt.AlignmentFlag.AlignBottom )
     
+    def BuildPartsTab( self ) -> None:
+        # Spare Parts
+        self.par_tab_layout = QVBoxLayout()
+        self.par_tab_buttons_layout = QHBoxLayout()
+        self.par_tab_add_part = QPushButton( 'Cadastrar Peça' )
+        self.par_tab_add_part.clicked.connect( self.AddPartClick )
+        self.par_tab_receive = QPushButton( 'Registrar Entrada' )
+        self.par_tab_receive.clicked.connect( self.ReceivePartClick )
+        self.par_tab_reserve = QPushButton( 'Reservar para Ordem de Serviço' )
+        self.par_tab_reserve.clicked.connect( self.ReservePartClick )
+        self.par_tab_issue = QPushButton( 'Baixar Reserva' )
+        self.par_tab_issue.clicked.connect( self.IssueReservationClick )
+        for par_tab_button in ( self.par_tab_add_part, self.par_tab_receive, self.par_tab_reserve, self.par_tab_issue ): self.par_tab_buttons_layout.addWidget( par_tab_button )
+        self.par_tab_buttons_layout.addStretch()
+        self.par_tab_layout.addLayout( self.par_tab_buttons_layout )
+        self.par_tab_forecast_label = QLabel( f'Previsão de consumo para os próximos { parts_horizon_days } dias' )
+        self.par_tab_layout.addWidget( self.par_tab_forecast_label )
+        self.par_tab_sheet = None
+        self.par_tab.setLayout( self.par_tab_layout )
+        self.UpdatePartsForecast()
+    
+    def SetInventorySearchEnabled( self, enabled: bool ) -> None:
+        self.inv_tab_search_enabled = enabled
+        if self.TabBuilt( self.inv_tab ): self.inv_tab_search_bar.setEnabled( enabled )
+
+    def UpdateStatusCounts( self ) -> None:
+        if not self.TabBuilt( self.inv_tab ): return
+        with main_db_lock: status_counts = MachineStatusCounts( main_db[ 'machine_inv' ], main_db_columns )
+        self.inv_tab_status_filter.setItemText( 0, f'Todos os status ({ sum( status_counts.values() ) })' )
+        for status_idx, status in enumerate( machine_statuses, 1 ): self.inv_tab_status_filter.setItemText( status_idx, f'{ status } ({ status_counts.get( status, 0 ) })' )
+
     def update_inv_tab_scroll_list( self, search_filter_text: str = '' ) -> None:
-        while self.inv_tab_scroll_layout.count():
-            machine_button = self.inv_tab_scroll_layout.takeAt(0).widget()
-            if machine_button: machine_button.deleteLater()
-            del machine_button
-        for registred_machine in range( 101 ):
-            if search_filter_text and not ( ( search_filter_text in unidecode( registred_machine.GetName() ).replace( '– ', '' ).replace( '-','' ).upper() ) or ( search_filter_text.isnumeric() and type( registred_machine.id ) in { int, float } and float( search_filter_text ) == registred_machine.id ) ): continue
-            machine_button = QPushButton( f'Item { registred_machine }' )
-            machine_button.setFixedSize( QSize( min( 450, round( ScreenWidth * 0.4 ) ), 15 ) )
-            machine_button.setStyleSheet( 'QPushButton { font-family: Arial; font-size: 7pt; }' )
-            self.inv_tab_scroll_layout.addWidget( machine_button )
-            del machine_button
+        self.inv_tab_search_timer.start() # Debounced, the query runs once typing pauses.
+
+    def RunInventorySearch( self ) -> None:
+        self.inv_tab_search_sequence += 1
+        search_sequence, search_filter_text = self.inv_tab_search_sequence, NormalizeSearchText( self.inv_tab_search_bar.text() if self.TabBuilt( self.inv_tab ) else '' )
+        status_filter = self.inv_tab_status_filter.currentData() if self.TabBuilt( self.inv_tab ) else None
+        job_manager.Submit( InventorySearchJob, search_filter_text, status_filter, on_finished = lambda machine_keys: self.ApplyInventorySearch( search_sequence, search_filter_text, status_filter, machine_keys ) )
+
+    @Timed( 'inventory_list_filter' )
+    def ApplyInventorySearch( self, search_sequence: int, search_filter_text: str, status_filter: str | None, machine_keys: list ) -> None:
+        if search_sequence == self.inv_tab_search_sequence: self.inv_tab_list_model.SetFilter( search_filter_text, machine_keys, status_filter ) # Results of superseded queries are dropped.
+
+    def SelectMachine( self, model_index: QModelIndex ) -> None:
+        self.ShowMachine( model_index.data( Qt.ItemDataRole.UserRole ) )
+
+    def ShowMachine( self, machine_key: str ) -> None:
+        self.selected_machine_key = machine_key
+        self.ShowMachineAttachments()
+        machine = MachineFromRecord( GetMachineDetails( machine_key ), machine_key )
+        for old_widget in ( self.inv_tab_info_display_top_box, self.inv_tab_info_display_spec_sheet ):
+            if old_widget:
+                self.inv_tab_info_display_layout.removeWidget( old_widget )
+                old_widget.deleteLater()
+        self.inv_tab_info_display_top_box = machine.GetInfoBoxWidget()
+        self.inv_tab_info_display_layout.addWidget( self.inv_tab_info_display_top_box, alignment = Qt.AlignmentFlag.AlignHCenter )
+        self.inv_tab_info_display_spec_sheet = machine.GetSpecSheetWidget()
+        if self.inv_tab_info_display_spec_sheet: self.inv_tab_info_display_layout.addWidget( self.inv_tab_info_display_spec_sheet, alignment = Qt.AlignmentFlag.AlignHCenter )
+        for machine_button in ( self.inv_tab_remove_machine, self.inv_tab_edit_machine, self.inv_tab_machine_history, self.inv_tab_import_sheet ): machine_button.setEnabled( True )
+
+    def SetMachineRecord( self, machine_key: str, record: dict ) -> None:
+        previous_record = GetMachineDetails( machine_key ) if main_analytics.ready and machine_key in main_db[ 'machine_inv' ] else None # With its history paged in.
+        SetRecord( ( 'machine_inv', machine_key ), record )
+        self.MachineRecordChanged( machine_key, record, previous_record )
+        self.UpdateStatusCounts()
+        self.UpdatePartsForecast() # Its procedures may use parts.
+        self.save_buttom.setEnabled( True )
+
+    def MachineRecordChanged( self, machine_key: str, record: dict, previous_record: dict | None = None ) -> None:
+        # Everything derived from a machine record, for edits made here and ones pulled from other workstations.
+        if main_db_columns:
+            record = MachineRecord( machine_key, record )
+            main_db_columns.Set( machine_key, record )
+            with main_db_lock: main_db[ 'machine_inv' ][ machine_key ] = main_db_columns.Strip( record ) # A copy, the pending change still holds the whole record.
+        main_scheduler.ScheduleMachine( machine_key, record )
+        if main_analytics.ready:
+            main_analytics.SetMachine( machine_key, record )
+            main_analytics.ReplacePreventives( machine_key, ( previous_record or dict() ).get( 'procedures_history' ), record.get( 'procedures_history' ) )
+        machine_cache.pop( machine_key, None )
+        main_search_index.Add( machine_key, record )
+        self.inv_tab_list_model.MachineChanged( machine_key )
+        if machine_uniqueness_index.Set( machine_key, MachineNameKey( record ) ): self.inv_tab_list_model.RefreshNames()
+
+    def DeleteMachineRecord( self, machine_key: str ) -> None:
+        self.MachineRecordRemoved( machine_key )
+        DeleteRecord( ( 'machine_inv', machine_key ) )
+        self.UpdateStatusCounts()
+        self.save_buttom.setEnabled( True )
+
+    def MachineRecordRemoved( self, machine_key: str ) -> None:
+        self.inv_tab_list_model.MachineRemoved( machine_key )
+        main_search_index.Remove( machine_key )
+        machine_cache.pop( machine_key, None )
+        if main_db_columns: main_db_columns.Remove( machine_key )
+        main_scheduler.RemoveMachine( machine_key )
+        if main_analytics.ready: main_analytics.RemoveMachine( machine_key )
+        if machine_uniqueness_index.Remove( machine_key ): self.inv_tab_list_model.RefreshNames()
+
+    def SetWorkOrderRecord( self, code: str, order: dict ) -> None:
+        previous_order = main_db.get( 'work_orders', dict() ).get( code )
+        SetRecord( ( 'work_orders', code ), order )
+        self.WorkOrderRecordChanged( previous_order, order )
+        self.SetWorkOrdersSheet( WorkOrdersSheet( WorkOrdersFrame( main_db[ 'work_orders' ] ) ) )
+        self.save_buttom.setEnabled( True )
+
+    def SetWorkOrderStatus( self, code: str, status: str ) -> None:
+        # Closing a work order dates the end of the repair, reopening it clears the date.
+        order = main_db[ 'work_orders' ][ code ] | { 'status': status }
+        order[ 'closed' ] = ( order.get( 'closed' ) or date.today().isoformat() ) if status in closed_work_order_statuses else None
+        self.SetWorkOrderRecord( code, order )
+
+    def DeleteWorkOrderRecord( self, code: str ) -> None:
+        previous_order = main_db.get( 'work_orders', dict() ).get( code )
+        DeleteRecord( ( 'work_orders', code ) )
+        self.WorkOrderRecordChanged( previous_order, None )
+        self.SetWorkOrdersSheet( WorkOrdersSheet( WorkOrdersFrame( main_db[ 'work_orders' ] ) ) )
+        self.save_buttom.setEnabled( True )
+
+    def WorkOrderRecordChanged( self, previous_order: dict | None, order: dict | None ) -> None:
+        # The KPIs trade the work order's old contribution for its new one, for edits made here and ones pulled from other workstations.
+        if main_analytics.ready: main_analytics.ReplaceWorkOrder( previous_order, order )
+
+    def CheckRemoteChanges( self ) -> None:
+        # Polled: a stat of the journal, and only when another workstation wrote to it are the new changes read.
+        if self.sync_running or self.database_loading or not main_db_storage.HasRemoteChanges(): return
+        self.sync_running = True
+        job_manager.Submit( SyncChangesJob, on_finished = self.RemoteChangesPulled, on_failed = self.RemoteChangesPulled, on_cancelled = self.RemoteChangesPulled )
+
+    def RemoteChangesPulled( self, *_ ) -> None:
+        self.sync_running = False
+        self.ApplyRemoteChanges()
+
+    def ApplyRemoteChanges( self ) -> None:
+        with main_db_lock: remote_changes, previous_records = main_db_storage.TakeRemoteChanges()
+        if not remote_changes: return
+        paths = [ change[ 'path' ] for change in remote_changes ]
+        if any( change[ 'op' ] == 'reload' for change in remote_changes ) or [ 'machine_inv' ] in paths:
+            self.database_loading = True
+            job_manager.Submit( RebuildIndexesJob, on_progress = self.ShowJobProgress, on_finished = self.DatabaseLoaded, on_failed = self.DatabaseLoadFailed )
+            return
+        for machine_key in dict.fromkeys( path[1] for path in paths if path[0] == 'machine_inv' ):
+            if machine_key in main_db[ 'machine_inv' ]: self.MachineRecordChanged( machine_key, main_db[ 'machine_inv' ][ machine_key ], previous_records.get( ( 'machine_inv', machine_key ) ) )
+            else: self.MachineRecordRemoved( machine_key )
+        if any( path[0] == 'machine_inv' for path in paths ): self.UpdateStatusCounts()
+        if any( path[0] == 'attachments' for path in paths ): self.UpdateAttachmentList()
+        if any( path[0] in { 'part_ledger', 'part_reservations' } for path in paths ): main_parts.ready = False # Rebuilt the next time stock is checked or forecast.
+        if any( path[0] in { 'parts', 'part_ledger', 'part_reservations', 'machine_inv' } for path in paths ): self.UpdatePartsForecast()
+        if any( path[0] == 'work_orders' for path in paths ):
+            if [ 'work_orders' ] in paths: main_analytics.ready = False # The whole table was replaced, rebuilt the next time it's shown.
+            else:
+                for code in dict.fromkeys( path[1] for path in paths if path[0] == 'work_orders' ): self.WorkOrderRecordChanged( previous_records.get( ( 'work_orders', code ) ), main_db[ 'work_orders' ].get( code ) )
+            self.SetWorkOrdersSheet( WorkOrdersSheet( WorkOrdersFrame( main_db.get( 'work_orders', dict() ) ) ) )
+        self.update_cal_tab_lists()
+
+    def ResolveConflicts( self, conflicts: list[ dict ] ) -> None:
+        record_names = dict.fromkeys( GetMachine( change[ 'path' ][1] ).GetName() if change[ 'path' ][0] == 'machine_inv' and len( change[ 'path' ] ) > 1 and change[ 'path' ][1] in main_db[ 'machine_inv' ] else ' / '.join( map( str, change[ 'path' ] ) ) for change in conflicts )
+        self.dialog_box = QMessageBox( self )
+        self.dialog_box.setWindowTitle( 'Conflito ao Salvar' )
+        self.dialog_box.setText( 'Outro usuário salvou alterações nestes registros enquanto você os editava:\n' + '\n'.join( list( record_names )[ :20 ] ) )
+        overwrite_button = self.dialog_box.addButton( 'Sobrescrever', QMessageBox.ButtonRole.AcceptRole )
+        self.dialog_box.addButton( 'Descartar Minhas Alterações', QMessageBox.ButtonRole.RejectRole )
+        self.dialog_box.exec()
+        if self.dialog_box.clickedButton() is overwrite_button:
+            with main_db_lock: main_db_storage.Overwrite( conflicts )
+            self.SaveChangesClick()
+        else: job_manager.Submit( DiscardChangesJob, conflicts, on_finished = self.ChangesSaved, on_failed = self.SaveChangesFailed )
+
+    def update_cal_tab_lists( self ) -> None:
+        if not self.TabBuilt( self.cal_tab ): return # Filled in when the tab is built.
+        today = date.today()
+        for cal_tab_list, occurrences in ( ( self.cal_tab_overdue_list, main_scheduler.Overdue( today ) ), ( self.cal_tab_upcoming_list, main_scheduler.DueBetween( today, today + timedelta( days = 7 ) ) ) ):
+            cal_tab_list.clear()
+            cal_tab_list.addItems( [ f'{ due_date.strftime( date_string_format ) } – { GetMachine( machine_key ).GetName() } – { procedure.get( 'name', '' ) }' for due_date, machine_key, procedure in occurrences ] )
+
+    def SetWorkOrdersSheet( self, work_orders_sheet: WorkOrdersSheet ) -> None:
+        self.work_orders_sheet = work_orders_sheet
+        if not self.TabBuilt( self.his_tab ): return # Shown when the tab is built.
+        if self.worksheet:
+            self.his_tab_layout.removeWidget( self.worksheet )
+            self.worksheet.deleteLater()
+        self.worksheet = work_orders_sheet.GetSheet()
+        self.his_tab_layout.addWidget( self.worksheet )
+        self.his_tab_status_filter.blockSignals( True )
+        self.his_tab_status_filter.clear()
+        self.his_tab_status_filter.addItems( [ 'Todos os status' ] + self.worksheet.model().Statuses() )
+        self.his_tab_status_filter.blockSignals( False )
+
+    def ShowMachineAttachments( self ) -> None:
+        if not self.TabBuilt( self.doc_tab ): return # Filled in when the tab is built.
+        machine_key = self.selected_machine_key if self.selected_machine_key in main_db[ 'machine_inv' ] else None
+        self.doc_tab_machine_label.setText( f'Máquina: { GetMachine( machine_key ).GetName() }' if machine_key else 'Selecione uma máquina no Inventário de Máquinas.' )
+        self.doc_tab_work_order.blockSignals( True )
+        self.doc_tab_work_order.clear()
+        self.doc_tab_work_order.addItems( [ 'Anexos da máquina' ] + ( [ f'Ordem de Serviço { code }' for code in MachineWorkOrderCodes( machine_key ) ] if machine_key else [] ) )
+        self.doc_tab_work_order.blockSignals( False )
+        self.doc_tab_attach.setEnabled( machine_key is not None )
+        self.UpdateAttachmentList()
+
+    def SelectedWorkOrder( self ) -> str | None:
+        return self.doc_tab_work_order.currentText().removeprefix( 'Ordem de Serviço ' ) if self.doc_tab_work_order.currentIndex() > 0 else None
+
+    def UpdateAttachmentList( self ) -> None:
+        if not self.TabBuilt( self.doc_tab ): return
+        attachments = MachineAttachments( self.selected_machine_key, self.SelectedWorkOrder() ) if self.selected_machine_key else dict()
+        self.doc_tab_attachments.clear()
+        self.doc_tab_items = dict()
+        file_icon = self.style().standardIcon( QStyle.StandardPixmap.SP_FileIcon )
+        for attachment_key, record in sorted( attachments.items(), key = lambda item: item[1][ 'name' ] ):
+            attachment_item = QListWidgetItem( file_icon, record[ 'name' ] )
+            attachment_item.setData( Qt.ItemDataRole.UserRole, attachment_key )
+            attachment_item.setToolTip( f'{ record[ 'name' ] }\n{ record[ 'size' ] / 1024 :.0f} KiB, anexado em { record[ 'added' ] }' )
+            self.doc_tab_attachments.addItem( attachment_item )
+            self.doc_tab_items[ attachment_key ] = attachment_item
+        self.UpdateAttachmentButtons()
+        # Thumbnails are decoded off the GUI thread and swapped in as a batch. Results for a list that has since been replaced are dropped.
+        self.doc_tab_thumbnails_sequence += 1
+        thumbnails_sequence = self.doc_tab_thumbnails_sequence
+        image_records = { attachment_key: record for attachment_key, record in attachments.items() if record.get( 'type', '' ).startswith( 'image/' ) }
+        if image_records: job_manager.Submit( AttachmentThumbnailsJob, image_records, on_finished = lambda thumbnails: self.AttachmentThumbnailsLoaded( thumbnails_sequence, thumbnails ) )
+
+    def AttachmentThumbnailsLoaded( self, thumbnails_sequence: int, thumbnails: dict[ str, QImage ] ) -> None:
+        if thumbnails_sequence != self.doc_tab_thumbnails_sequence: return
+        for attachment_key, thumbnail in thumbnails.items(): self.doc_tab_items[ attachment_key ].setIcon( QIcon( QPixmap.fromImage( thumbnail ) ) )
+
+    def UpdateAttachmentButtons( self ) -> None:
+        for doc_tab_button in ( self.doc_tab_open, self.doc_tab_save, self.doc_tab_remove ): doc_tab_button.setEnabled( bool( self.doc_tab_attachments.selectedItems() ) )
+
+    def SelectedAttachment( self ) -> tuple[ str, dict ] | tuple[ None, None ]:
+        selected_items = self.doc_tab_attachments.selectedItems()
+        if not selected_items: return None, None
+        attachment_key = selected_items[0].data( Qt.ItemDataRole.UserRole )
+        return attachment_key, main_db.get( 'attachments', dict() ).get( attachment_key )
+
+    def AttachFilesClick( self ) -> None:
+        paths, _ = QFileDialog.getOpenFileNames( self, 'Anexar Arquivos', folder_path )
+        if not paths: return
+        self.doc_tab_attach.setEnabled( False )
+        job_manager.Submit( IngestAttachmentsJob, paths, self.selected_machine_key, self.SelectedWorkOrder(), on_progress = self.ShowJobProgress, on_finished = self.AttachmentsIngested, on_failed = self.AttachmentsIngested, on_cancelled = self.AttachmentsIngested )
+
+    def AttachmentsIngested( self, error: Exception | int | None = None ) -> None:
+        # Files ingested before a failure or a cancellation stay attached.
+        self.HideJobProgress()
+        self.doc_tab_attach.setEnabled( True )
+        self.save_buttom.setEnabled( main_db_storage.HasPendingChanges() )
+        self.UpdateAttachmentList()
+        if isinstance( error, Exception ): self.WarningMessage( f'Falha ao anexar arquivos: { error }' )
+
+    def ExportAttachmentClick( self, open_file: bool ) -> None:
+        attachment_key, record = self.SelectedAttachment()
+        if not record: return
+        if open_file: path = JoinPath( gettempdir(), record[ 'hash' ][ :8 ] + ' ' + record[ 'name' ] ) # Opened from a copy named like the original, so the system knows which program to use.
+        else:
+            path, _ = QFileDialog.getSaveFileName( self, 'Salvar Anexo', AppFilePath( record[ 'name' ] ) )
+            if not path: return
+        job_manager.Submit( ExportAttachmentJob, record[ 'hash' ], path, on_finished = lambda path: QDesktopServices.openUrl( QUrl.fromLocalFile( path ) ) if open_file else None, on_failed = lambda error: self.WarningMessage( f'Falha ao abrir o anexo: { error }' ) )
+
+    def RemoveAttachmentClick( self ) -> None:
+        # Only the link is removed, the stored file may be attached elsewhere with the same content.
+        attachment_key, record = self.SelectedAttachment()
+        if not record: return
+        DeleteRecord( ( 'attachments', attachment_key ) )
+        self.save_buttom.setEnabled( True )
+        self.UpdateAttachmentList()
+
+    def UpdatePartsForecast( self ) -> None:
+        if not self.TabBuilt( self.par_tab ): return # Filled in when the tab is built.
+        self.par_tab_forecast_sequence += 1
+        forecast_sequence = self.par_tab_forecast_sequence
+        job_manager.Submit( PartsForecastJob, parts_horizon_days, on_finished = lambda forecast: self.PartsForecastBuilt( forecast_sequence, forecast ), on_failed = lambda error: self.WarningMessage( f'Falha ao calcular a previsão de peças: { error }' ) )
+    
+    def PartsForecastBuilt( self, forecast_sequence: int, forecast: pd.DataFrame ) -> None:
+        if forecast_sequence != self.par_tab_forecast_sequence: return # Superseded by a later change.
+        if self.par_tab_sheet:
+            self.par_tab_layout.removeWidget( self.par_tab_sheet )
+            self.par_tab_sheet.deleteLater()
+        self.par_tab_sheet = WorkOrdersSheet( forecast.round( 2 ).rename( columns = part_labels ) ).GetSheet()
+        self.par_tab_layout.addWidget( self.par_tab_sheet )
     
-    #search_filter_text = unidecode( search_filter_text.replace( '–', '' ) ).replace( '-','' ).replace( '  ', ' ' ).upper()
+    def PartsChanged( self ) -> None:
+        self.save_buttom.setEnabled( True )
+        self.UpdatePartsForecast()
+    
+    def AddPartClick( self ) -> None:
+        self.part_dialog = QDialog( self )
+        self.part_dialog.setWindowTitle( 'Cadastrar Peça' )
+        part_form = QFormLayout( self.part_dialog )
+        part_fields = { 'key': QLineEdit(), 'name': QLineEdit(), 'unit': QLineEdit( 'UN' ), 'reorder_point': QLineEdit( '0' ), 'reorder_quantity': QLineEdit( '0' ), 'lead_time_days': QLineEdit( str( PartsInventory.default_lead_time_days ) ) }
+        for label, part_field in zip( ( 'Código', 'Descrição', 'Unidade', 'Ponto de Pedido', 'Lote de Compra', 'Prazo de Entrega (dias)' ), part_fields.values() ): part_form.addRow( label, part_field )
+        save_part = QPushButton( 'Cadastrar' )
+        save_part.clicked.connect( self.part_dialog.accept )
+        part_form.addRow( save_part )
+        if not self.part_dialog.exec(): return
+        part_key = part_fields[ 'key' ].text().strip()
+        try: numbers = { name: float( part_fields[ name ].text().replace( ',', '.' ) ) for name in ( 'reorder_point', 'reorder_quantity', 'lead_time_days' ) }
+        except ValueError: return self.WarningMessage( 'Ponto de pedido, lote de compra e prazo de entrega devem ser números.' )
+        if not part_key: return self.WarningMessage( 'Informe o código da peça.' )
+        part = main_db.get( 'parts', dict() ).get( part_key, { 'machines': list() } ) | { 'name': part_fields[ 'name' ].text().strip(), 'unit': part_fields[ 'unit' ].text().strip() } | numbers
+        SetRecord( ( 'parts', part_key ), part )
+        self.PartsChanged()
+    
+    def ChoosePart( self, title: str, part_keys: list[ str ] ) -> str | None:
+        parts = main_db.get( 'parts', dict() )
+        if not part_keys: return self.WarningMessage( 'Nenhuma peça cadastrada.' )
+        part_items = [ f'{ part_key } – { parts[ part_key ].get( 'name', '' ) }' for part_key in part_keys ]
+        part_item, chosen = QInputDialog.getItem( self, title, 'Peça:', part_items, 0, False )
+        return part_keys[ part_items.index( part_item ) ] if chosen else None
+    
+    def ReceivePartClick( self ) -> None:
+        part_key = self.ChoosePart( 'Registrar Entrada', sorted( main_db.get( 'parts', dict() ) ) )
+        if part_key is None: return
+        quantity, chosen = QInputDialog.getDouble( self, 'Registrar Entrada', 'Quantidade recebida:', 1, 0, 1e9, 2 )
+        if not chosen: return
+        try: ReceivePart( part_key, quantity )
+        except Exception as error: return self.WarningMessage( f'Falha ao registrar a entrada: { error }' )
+        self.PartsChanged()
+    
+    def ReservePartClick( self ) -> None:
+        # The work order's machine puts the parts it uses first.
+        work_order, chosen = QInputDialog.getText( self, 'Reservar para Ordem de Serviço', 'Ordem de Serviço:' )
+        work_order = work_order.strip()
+        if not ( chosen and work_order ): return
+        machine_key = main_db.get( 'work_orders', dict() ).get( work_order, dict() ).get( 'machine' )
+        machine_key = str( machine_key ) if machine_key is not None else self.selected_machine_key
+        machine_parts = sorted( MachineParts( machine_key ) ) if machine_key in main_db[ 'machine_inv' ] else list()
+        part_key = self.ChoosePart( 'Reservar para Ordem de Serviço', machine_parts + sorted( set( main_db.get( 'parts', dict() ) ) - set( machine_parts ) ) )
+        if part_key is None: return
+        quantity, chosen = QInputDialog.getDouble( self, 'Reservar para Ordem de Serviço', f'Quantidade (disponível: { CurrentParts().Available( part_key ):g}):', 1, 0, 1e9, 2 )
+        if not chosen: return
+        try: ReservePart( part_key, quantity, work_order, machine_key )
+        except Exception as error: return self.WarningMessage( f'Falha ao reservar a peça: { error }' )
+        self.PartsChanged()
+    
+    def IssueReservationClick( self ) -> None:
+        reservations = sorted( main_db.get( 'part_reservations', dict() ).items(), key = lambda item: ( str( item[1][ 'work_order' ] ), item[1][ 'part' ] ) )
+        if not reservations: return self.WarningMessage( 'Nenhuma reserva em aberto.', 'Aviso' )
+        reservation_items = [ f'OS { reservation[ 'work_order' ] } – { reservation[ 'part' ] } – { reservation[ 'quantity' ]:g}' for _, reservation in reservations ]
+        reservation_item, chosen = QInputDialog.getItem( self, 'Baixar Reserva', 'Reserva:', reservation_items, 0, False )
+        if not chosen: return
+        try: IssueReservation( reservations[ reservation_items.index( reservation_item ) ][0] )
+        except Exception as error: return self.WarningMessage( f'Falha ao baixar a reserva: { error }' )
+        self.PartsChanged()
+    
+    def SelectedWorkOrderCode( self ) -> str | None:
+        selected_rows = self.worksheet.selectionModel().selectedRows() or [ self.worksheet.currentIndex() ]
+        code = self.worksheet.model().Value( selected_rows[0].row(), 'code' ) if selected_rows[0].isValid() else None
+        return str( code ) if code is not None and str( code ) in main_db.get( 'work_orders', dict() ) else None
+
+    def NewWorkOrderClick( self ) -> None:
+        if self.selected_machine_key not in main_db[ 'machine_inv' ]: return self.WarningMessage( 'Selecione uma máquina no Inventário de Máquinas.', 'Aviso' )
+        self.work_order_dialog = QDialog( self )
+        self.work_order_dialog.setWindowTitle( 'Nova Ordem de Serviço' )
+        work_order_form = QFormLayout( self.work_order_dialog )
+        code_field, description_field, status_field = QLineEdit(), QLineEdit(), QComboBox()
+        status_field.addItems( sorted( { 'Aberta' } | { str( order.get( 'status' ) ) for order in main_db.get( 'work_orders', dict() ).values() if order.get( 'status' ) } ) )
+        status_field.setCurrentText( 'Aberta' )
+        for label, work_order_field in ( ( 'Máquina', QLabel( GetMachine( self.selected_machine_key ).GetName() ) ), ( 'Ordem de Serviço', code_field ), ( 'Descrição', description_field ), ( 'Status', status_field ) ): work_order_form.addRow( label, work_order_field )
+        save_order = QPushButton( 'Abrir' )
+        save_order.clicked.connect( self.work_order_dialog.accept )
+        work_order_form.addRow( save_order )
+        if not self.work_order_dialog.exec(): return
+        code = code_field.text().strip()
+        if not code: return self.WarningMessage( 'Informe o código da ordem de serviço.' )
+        if code in main_db.get( 'work_orders', dict() ): return self.WarningMessage( f'A ordem de serviço { code } já existe.' )
+        status = status_field.currentText()
+        self.SetWorkOrderRecord( code, { 'machine': self.selected_machine_key, 'description': description_field.text().strip(), 'status': status, 'opened': date.today().isoformat(), 'closed': date.today().isoformat() if status in closed_work_order_statuses else None } )
+
+    def SetWorkOrderStatusClick( self ) -> None:
+        code = self.SelectedWorkOrderCode()
+        if code is None: return self.WarningMessage( 'Selecione uma ordem de serviço.', 'Aviso' )
+        statuses = sorted( { 'Aberta', 'Fechada' } | set( self.worksheet.model().Statuses() ) )
+        status, chosen = QInputDialog.getItem( self, 'Alterar Status', f'Status da ordem de serviço { code }:', statuses, statuses.index( main_db[ 'work_orders' ][ code ].get( 'status' ) ) if main_db[ 'work_orders' ][ code ].get( 'status' ) in statuses else 0, False )
+        if chosen: self.SetWorkOrderStatus( code, status )
+
+    def DeleteWorkOrderClick( self ) -> None:
+        code = self.SelectedWorkOrderCode()
+        if code is None: return self.WarningMessage( 'Selecione uma ordem de serviço.', 'Aviso' )
+        if QMessageBox.question( self, 'Excluir Ordem de Serviço', f'Excluir a ordem de serviço { code }?' ) == QMessageBox.StandardButton.Yes: self.DeleteWorkOrderRecord( code )
+
+    def FilterWorkOrders( self, status: str ) -> None:
+        self.worksheet.model().SetFilter( status = status if self.his_tab_status_filter.currentIndex() > 0 else None )
+
+    def ShowAnalytics( self ) -> None:
+        if not main_analytics.ready:
+            self.his_tab_analytics.setEnabled( False )
+            job_manager.Submit( AnalyticsJob, on_progress = self.ShowJobProgress, on_finished = self.AnalyticsBuilt, on_failed = lambda error: ( self.AnalyticsBuilt( None ), self.WarningMessage( f'Falha ao calcular os indicadores: { error }' ) ), on_cancelled = lambda *_: self.AnalyticsBuilt( None ) )
+            return
+        self.analytics_dialog = QDialog( self )
+        self.analytics_dialog.setWindowTitle( 'Indicadores de Confiabilidade' )
+        self.analytics_dialog.setLayout( QVBoxLayout() )
+        self.analytics_dimension = QComboBox()
+        self.analytics_dimension.addItems( [ analytics_labels[ dimension ] for dimension in MaintenanceAnalytics.dimensions ] )
+        self.analytics_dimension.currentIndexChanged.connect( self.UpdateAnalyticsSheet )
+        self.analytics_dialog.layout().addWidget( self.analytics_dimension, alignment = Qt.AlignmentFlag.AlignLeft )
+        self.analytics_sheet = None
+        self.UpdateAnalyticsSheet( 0 )
+        self.analytics_dialog.show()
+
+    def AnalyticsBuilt( self, analytics: MaintenanceAnalytics | None ) -> None:
+        global main_analytics
+        self.HideJobProgress()
+        self.his_tab_analytics.setEnabled( True )
+        if analytics is None: return
+        main_analytics = analytics
+        self.ShowAnalytics()
+
+    def UpdateAnalyticsSheet( self, dimension_idx: int ) -> None:
+        dimension = MaintenanceAnalytics.dimensions[ dimension_idx ]
+        kpis = main_analytics.KPIs( dimension ).round( 3 )
+        if dimension == 'machine': kpis[ 'machine' ] = [ GetMachine( machine_key ).GetName() if machine_key in main_db[ 'machine_inv' ] else machine_key for machine_key in kpis[ 'machine' ] ]
+        if self.analytics_sheet:
+            self.analytics_dialog.layout().removeWidget( self.analytics_sheet )
+            self.analytics_sheet.deleteLater()
+        self.analytics_sheet = WorkOrdersSheet( kpis.rename( columns = analytics_labels ) ).GetSheet()
+        self.analytics_dialog.layout().addWidget( self.analytics_sheet )
+
+    def ShowDiagnostics( self ) -> None:
+        self.diagnostics_dialog = QDialog( self )
+        self.diagnostics_dialog.setWindowTitle( 'Diagnóstico' )
+        self.diagnostics_dialog.setLayout( QVBoxLayout() )
+        self.diagnostics_table = QTableWidget( 0, 4 )
+        self.diagnostics_table.setHorizontalHeaderLabels( ( 'Operação', 'Execuções', 'Média (ms)', 'Máximo (ms)' ) )
+        self.diagnostics_table.verticalHeader().setVisible( False )
+        self.diagnostics_dialog.layout().addWidget( self.diagnostics_table )
+        self.diagnostics_counters = QLabel()
+        self.diagnostics_dialog.layout().addWidget( self.diagnostics_counters )
+        if diagnostics.profiler:
+            save_profile = QPushButton( 'Salvar Perfil' )
+            save_profile.clicked.connect( self.SaveProfileClick )
+            self.diagnostics_dialog.layout().addWidget( save_profile, alignment = Qt.AlignmentFlag.AlignLeft )
+        refresh_timer = QTimer( self.diagnostics_dialog )
+        refresh_timer.timeout.connect( self.UpdateDiagnostics )
+        refresh_timer.start( 1000 )
+        self.UpdateDiagnostics()
+        self.diagnostics_dialog.resize( 600, 400 )
+        self.diagnostics_dialog.show()
+
+    def UpdateDiagnostics( self ) -> None:
+        span_totals, counters, _ = diagnostics.Snapshot()
+        self.diagnostics_table.setRowCount( len( span_totals ) )
+        for row_idx, ( name, ( count, total_ms, max_ms ) ) in enumerate( sorted( span_totals.items(), key = lambda item: -item[1][1] ) ):
+            for col_idx, value in enumerate( ( name, str( count ), f'{ total_ms / count :.1f}', f'{ max_ms :.1f}' ) ): self.diagnostics_table.setItem( row_idx, col_idx, QTableWidgetItem( value ) )
+        self.diagnostics_counters.setText( '   '.join( f'{ name }: { value }' for name, value in sorted( counters.items() ) ) )
+
+    def SaveProfileClick( self ) -> None:
+        path, _ = QFileDialog.getSaveFileName( self, 'Salvar Perfil', folder_path, 'Perfil cProfile (*.prof)' )
+        if path: diagnostics.SaveProfile( path )
+
+    def ShowJobProgress( self, done: int, total: int ) -> None:
+        self.job_progress_bar.setMaximum( total )
+        self.job_progress_bar.setValue( done )
+        self.job_progress_bar.setVisible( True )
+        self.job_cancel_button.setVisible( True )
+
+    def HideJobProgress( self, *_ ) -> None:
+        self.job_progress_bar.setVisible( False )
+        self.job_cancel_button.setVisible( False )
+
+    def LoadDatabase( self ) -> None:
+        if not ( exists( main_db_storage.snapshot_path ) or exists( main_db_storage.journal_path ) ): return
+        self.database_loading = True # No pulls until main_db is the loaded one.
+        self.SetInventorySearchEnabled( False )
+        job_manager.Submit( LoadDatabaseJob, on_progress = self.ShowJobProgress, on_finished = self.DatabaseLoaded, on_failed = self.DatabaseLoadFailed, on_cancelled = self.DatabaseLoadFailed )
+
+    def DatabaseLoaded( self, load_result: tuple ) -> None:
+        self.HideJobProgress()
+        self.database_loading = False
+        InstallDatabase( *load_result )
+        self.inv_tab_list_model.machine_inv, self.inv_tab_list_model.search_index = main_db[ 'machine_inv' ], main_search_index
+        self.update_cal_tab_lists()
+        if 'work_orders' in main_db: self.SetWorkOrdersSheet( WorkOrdersSheet( WorkOrdersFrame( main_db[ 'work_orders' ] ) ) )
+        self.SetInventorySearchEnabled( True )
+        self.UpdateStatusCounts()
+        self.RunInventorySearch()
+        self.ShowMachineAttachments()
+        self.UpdatePartsForecast()
+
+    def DatabaseLoadFailed( self, *_ ) -> None:
+        self.HideJobProgress()
+        self.database_loading = False
+        self.SetInventorySearchEnabled( True )
+        self.WarningMessage( 'Erro ao tentar carregar banco de dados JSON.', 'Aviso' )
+
+    def ImportInventoryClick( self ) -> None:
+        path, _ = QFileDialog.getOpenFileName( self, 'Importar Planilha', folder_path, 'Planilhas (*.csv *.xlsx)' )
+        if not path: return
+        self.inv_tab_import.setEnabled( False )
+        job_manager.Submit( ImportInventoryJob, path, on_progress = self.ShowJobProgress, on_finished = self.InventoryImported, on_failed = self.ImportFailed, on_cancelled = self.ImportFailed )
+
+    def InventoryImported( self, import_result: tuple[ list[ tuple[ int, str | None, dict ] ], list[ str ] ] ) -> None:
+        # Applied here, so nothing iterating main_db on this thread sees it change; the indexes are rebuilt like after a load, the search off until they're in.
+        import_rows, row_errors = import_result
+        imported_rows, apply_errors = ApplyInventoryImport( import_rows )
+        row_errors += apply_errors
+        self.HideJobProgress()
+        self.inv_tab_import.setEnabled( True )
+        self.save_buttom.setEnabled( main_db_storage.HasPendingChanges() )
+        if imported_rows:
+            self.database_loading = True
+            self.SetInventorySearchEnabled( False )
+            job_manager.Submit( RebuildIndexesJob, on_progress = self.ShowJobProgress, on_finished = self.DatabaseLoaded, on_failed = self.DatabaseLoadFailed )
+        if row_errors: self.WarningMessage( f'{ imported_rows } máquinas importadas, { len( row_errors ) } linhas ignoradas:\n' + '\n'.join( row_errors[ :20 ] ), 'Aviso' )
+
+    def ImportFailed( self, error: Exception | None = None ) -> None:
+        # Nothing was applied, main_db is as it was.
+        self.HideJobProgress()
+        self.inv_tab_import.setEnabled( True )
+        if error: self.WarningMessage( f'Falha ao importar a planilha: { error }' )
+
+    def ImportSheetClick( self ) -> None:
+        machine_key = self.selected_machine_key
+        if machine_key not in main_db[ 'machine_inv' ]: return
+        sheet_names = { 'Especificações Técnicas': 'spec_sheet', 'Características Gerais': 'features_sheet' }
+        sheet_label, chosen = QInputDialog.getItem( self, 'Importar Ficha Técnica', f'Substituir na ficha de { GetMachine( machine_key ).GetName() }:', list( sheet_names ), 0, False )
+        if not chosen: return
+        path, _ = QFileDialog.getOpenFileName( self, 'Importar Ficha Técnica', folder_path, 'Planilhas (*.csv *.xlsx)' )
+        if not path: return
+        self.inv_tab_import_sheet.setEnabled( False )
+        job_manager.Submit( ImportSheetJob, path, on_finished = lambda sheet: self.SheetImported( machine_key, sheet_names[ sheet_label ], sheet ), on_failed = self.SheetImportFailed, on_cancelled = self.SheetImportFailed )
+
+    def SheetImported( self, machine_key: str, sheet_name: str, sheet: dict[ str, list ] ) -> None:
+        self.inv_tab_import_sheet.setEnabled( True )
+        if machine_key not in main_db[ 'machine_inv' ]: return # Removed while the sheet was read.
+        SetRecord( ( 'machine_inv', machine_key, sheet_name ), sheet )
+        self.save_buttom.setEnabled( True )
+        machine_cache.pop( machine_key, None )
+        if machine_key == self.selected_machine_key: self.ShowMachine( machine_key )
+
+    def SheetImportFailed( self, error: Exception | None = None ) -> None:
+        self.inv_tab_import_sheet.setEnabled( True )
+        if error: self.WarningMessage( f'Falha ao importar a ficha técnica: { error }' )
+
+    def ExportClick( self, export_job, dialog_title: str ) -> None:
+        path, _ = QFileDialog.getSaveFileName( self, dialog_title, folder_path, 'Planilha CSV (*.csv);;Planilha Excel (*.xlsx)' )
+        if path: job_manager.Submit( export_job, path, on_progress = self.ShowJobProgress, on_finished = self.HideJobProgress, on_failed = lambda error: ( self.HideJobProgress(), self.WarningMessage( f'Falha ao exportar: { error }' ) ), on_cancelled = self.HideJobProgress )
 
     def WarningMessage( self, dialog_box_message: str, dialog_box_title: str = 'Erro' ) -> None:
         self.dialog_box = QMessageBox( self )
@@ -339,15 +2482,33 @@ class MainWindow( QWidget ):
         self.dialog_box.exec()
     
     def SaveChangesClick( self ) -> None:
-        try: SaveChanges()
-        except: self.WarningMessage( 'Falha ao salvar as alterações.' )
-        else: self.save_buttom.setEnabled( False )
-
-def SaveChanges() -> None:
-    with open( folder_path + '\\' + main_db_name, 'w' ) as data_file:
-        data_file.write( json.dumps( main_db ) )
-
-app = QApplication( sys.argv )
-window = MainWindow()
-window.show()
-app.exec()
\ No newline at end of file
+        self.save_buttom.setEnabled( False )
+        job_manager.Submit( SaveChangesJob, on_finished = self.ChangesSaved, on_failed = self.SaveChangesFailed )
+
+    def ChangesSaved( self, _ ) -> None:
+        self.save_buttom.setEnabled( main_db_storage.HasPendingChanges() ) # Edits made while the save was running.
+        self.ApplyRemoteChanges() # Pulled from other workstations before saving.
+
+    def SaveChangesFailed( self, error: Exception | None = None ) -> None:
+        self.save_buttom.setEnabled( True )
+        self.ApplyRemoteChanges()
+        if isinstance( error, SaveConflict ): self.ResolveConflicts( error.changes )
+        else: self.WarningMessage( 'Falha ao salvar as alterações.' )
+
+    def closeEvent( self, event ) -> None:
+        self.sync_timer.stop()
+        job_manager.WaitForDone() # Never leave a save half-written.
+        diagnostics.Close()
+        super().closeEvent( event )
+
+@Timed( 'save_changes' )
+def SaveChanges() -> int:
+    with main_db_lock: return main_db_storage.Commit( main_db )
+
+if __name__ == '__main__': # Imported by the benchmarks without opening the window.
+    app = QApplication( sys.argv )
+    ScreenWidth, ScreenHeight = ScreenSize()
+    window = MainWindow()
+    window.show()
+    QTimer.singleShot( 0, window.Startup )
+    app.exec()
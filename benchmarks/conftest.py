@@ -0,0 +1,91 @@
+"""
+Benchmarks for MaCoPlA.py on synthetic fleets, run with pytest-benchmark.
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks --fleet-sizes 1000,10000,100000 --benchmark-autosave
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+
+The last command compares against the latest saved run and fails on a slowdown
+of more than 15%. Qt runs offscreen, so no display is needed.
+"""
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from fleet import generate_fleet
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def pytest_addoption(parser):
+    parser.addoption('--fleet-sizes', default='1000,10000', help='Comma separated machine counts to benchmark, e.g. 1000,10000,100000.')
+    parser.addoption('--work-orders-per-machine', type=int, default=20)
+
+
+def pytest_generate_tests(metafunc):
+    if 'fleet_size' in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption('--fleet-sizes').split(',')]
+        metafunc.parametrize('fleet_size', sizes, ids=[f'{size}-machines' for size in sizes], scope='session')
+
+
+class NullJob:
+    def ReportProgress(self, done, total):
+        pass
+
+
+@pytest.fixture(scope='session')
+def macopla(tmp_path_factory):
+    """MaCoPlA.py imported as a module, with its ini and database files kept in a temporary folder."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    work_dir = tmp_path_factory.mktemp('macopla')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    sys.path.insert(0, str(REPO_ROOT))
+    try:
+        module = importlib.import_module('MaCoPlA')
+    finally:
+        os.chdir(previous_dir)
+    from PyQt6.QtWidgets import QApplication
+    module.app = QApplication.instance() or QApplication([])
+    module.ScreenWidth, module.ScreenHeight = module.ScreenSize()
+    return module
+
+
+_fleets = {}
+
+
+@pytest.fixture(scope='session')
+def fleet(fleet_size, request):
+    """A generated ``main_db`` of ``fleet_size`` machines, shared by every benchmark of that size. Don't mutate it."""
+    if fleet_size not in _fleets:
+        _fleets[fleet_size] = generate_fleet(fleet_size, request.config.getoption('--work-orders-per-machine'))
+    return _fleets[fleet_size]
+
+
+@pytest.fixture
+def snapshot_path(macopla, fleet, tmp_path):
+    """The fleet saved to ``tmp_path`` through Compact, so loading reads the same index and details files the application writes."""
+    path = str(tmp_path / 'Maintenance Database.json')
+    macopla.JournaledStorage(path).Compact({'machine_inv': dict(fleet['machine_inv']), 'work_orders': fleet['work_orders']})
+    return path
+
+
+_installed = {}
+
+
+@pytest.fixture
+def installed_fleet(macopla, fleet, fleet_size, tmp_path):
+    """
+    The fleet installed as MaCoPlA's main_db with its indexes built, and storage
+    pointed at ``tmp_path``. Indexes are only rebuilt when the fleet size
+    changes, so benchmarks may edit records but shouldn't add or remove any.
+    """
+    if _installed.get('size') != fleet_size:
+        database = {'machine_inv': dict(fleet['machine_inv']), 'work_orders': fleet['work_orders']}
+        macopla.InstallDatabase(*macopla.BuildDatabaseIndexes(NullJob(), database))
+        _installed['size'] = fleet_size
+    macopla.main_db_storage = macopla.JournaledStorage(str(tmp_path / 'Maintenance Database.json'))
+    return macopla.main_db
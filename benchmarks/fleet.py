@@ -0,0 +1,134 @@
+"""
+Synthetic fleets in the ``main_db`` format read and written by MaCoPlA.py.
+
+Run as a script to write a snapshot the application can open::
+
+    python benchmarks/fleet.py 10000 "Maintenance Database.json" --work-orders-per-machine 20 --parts 1000
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+TYPES = ('Torno', 'Fresadora', 'Prensa', 'Dobradeira', 'Guilhotina', 'Compressor', 'Retífica', 'Furadeira', 'Serra', 'Solda')
+MANUFACTURERS = ('Romi', 'Nardini', 'Schuler', 'Amada', 'Trumpf', 'Atlas Copco', 'Mello', 'Desconhecido')
+SECTORS = ('Usinagem', 'Estamparia', 'Caldeiraria', 'Montagem', 'Manutenção', 'Não se aplica')
+SUPPLIERS = ('Fornecedor A', 'Fornecedor B', 'Desconhecido')
+STATUSES = ('Operante',) * 12 + ('Em Espera', 'Parcialmente Operante', 'Em Manutenção', 'Inoperante', 'Desativada', 'Ausente')
+WORK_ORDER_STATUSES = ('Aberta', 'Em Andamento', 'Aguardando Peças', 'Fechada', 'Fechada', 'Fechada', 'Fechada')
+PROCEDURES = (('Lubrificação', 7), ('Inspeção Elétrica', 30), ('Troca de Óleo', 90), ('Calibração', 180), ('Revisão Geral', 365))
+
+HISTORY_START = date(2018, 1, 1)
+HISTORY_DAYS = 365 * 6
+
+
+def spec_sheet(rng, rows):
+    return {
+        'A': ['Especificações Técnicas', 'Especificação'] + [f'Parâmetro {row}' for row in range(rows)],
+        'B': ['', 'Valor'] + [str(rng.randint(1, 5000)) for _ in range(rows)],
+        'C': ['', 'Unidade'] + [rng.choice(('MM', 'KN', 'KG', 'RPM', 'MM/S', '-')) for _ in range(rows)],
+    }
+
+
+def machine_record(rng, machine_id, spec_rows):
+    procedures, history = [], []
+    for name, interval_days in rng.sample(PROCEDURES, rng.randint(1, len(PROCEDURES))):
+        last_done = HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS))
+        procedures.append({'name': name, 'interval_days': interval_days, 'last_done': last_done.isoformat()})
+        due_date = last_done - timedelta(days=interval_days)
+        for _ in range(3):
+            history.append({
+                'procedure': name,
+                'due_date': due_date.isoformat(),
+                'done_date': (due_date + timedelta(days=rng.randint(-2, 5))).isoformat(),
+            })
+            due_date -= timedelta(days=interval_days)
+    return {
+        'type': rng.choice(TYPES),
+        'manufacturer': rng.choice(MANUFACTURERS),
+        'model': f'{rng.choice("ABCDEFGH")}{rng.randint(100, 999)}',
+        'supplier': rng.choice(SUPPLIERS),
+        'sector': rng.choice(SECTORS),
+        'id': machine_id,
+        'acquisition_date': (HISTORY_START - timedelta(days=rng.randrange(3650))).strftime('%d/%m/%y'),
+        'status': rng.choice(STATUSES),
+        'procedures_array': procedures,
+        'procedures_history': history,
+        'spec_sheet': spec_sheet(rng, spec_rows),
+        'features_sheet': {'A': ['Características Gerais', f'Peso = {rng.randint(50, 20000)}kg'], 'B': ['', ''], 'C': ['', '']},
+    }
+
+
+def add_parts(database, parts, entries_per_part=50, seed=0):
+    """Add ``parts`` spare parts to ``database``, with their stock ledger, open reservations and the parts its preventive procedures use."""
+    rng = random.Random(seed)
+    machine_keys, work_order_codes = list(database['machine_inv']), list(database['work_orders'])
+    part_keys = [f'P{number:06d}' for number in range(parts)]
+    database['parts'] = {
+        part_key: {
+            'name': f'{rng.choice(("Rolamento", "Correia", "Filtro", "Sensor", "Válvula", "Óleo"))} {rng.randint(100, 999)}',
+            'unit': rng.choice(('UN', 'L', 'M')),
+            'reorder_point': rng.randint(0, 20),
+            'reorder_quantity': rng.randint(5, 50),
+            'lead_time_days': rng.choice((7, 14, 30, 60)),
+            'machines': rng.sample(machine_keys, min(len(machine_keys), 3)),
+        }
+        for part_key in part_keys
+    }
+    for record in database['machine_inv'].values():
+        for procedure in record['procedures_array']:
+            procedure['parts'] = {part_key: rng.randint(1, 4) for part_key in rng.sample(part_keys, min(parts, rng.randint(0, 2)))}
+    today = date.today()
+    database['part_ledger'] = {}
+    for number in range(parts * entries_per_part):
+        part_key = rng.choice(part_keys)
+        database['part_ledger'][f'L{number:08d}'] = {
+            'part': part_key,
+            'quantity': rng.randint(10, 100) if rng.random() < 0.2 else -rng.randint(1, 5),
+            'date': (today - timedelta(days=rng.randrange(730))).isoformat(),
+            'machine': rng.choice(machine_keys),
+            'work_order': rng.choice(work_order_codes) if work_order_codes else None,
+            'procedure': rng.choice((None, None, 'Troca de Óleo')),
+        }
+    database['part_reservations'] = {
+        f'R{number:08d}': {'part': rng.choice(part_keys), 'quantity': rng.randint(1, 5), 'machine': rng.choice(machine_keys), 'work_order': rng.choice(work_order_codes) if work_order_codes else None, 'date': today.isoformat()}
+        for number in range(parts)
+    }
+    return database
+
+
+def generate_fleet(machines, work_orders_per_machine=20, spec_rows=12, seed=0, parts=0):
+    """Return a ``main_db`` dict with ``machines`` machines and about ``work_orders_per_machine`` work orders each, and ``parts`` spare parts."""
+    rng = random.Random(seed)
+    machine_inv = {str(key): machine_record(rng, 1000 + key, spec_rows) for key in range(1, machines + 1)}
+    work_orders = {}
+    for number in range(machines * work_orders_per_machine):
+        opened = HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS))
+        status = rng.choice(WORK_ORDER_STATUSES)
+        work_orders[f'OS{number:08d}'] = {
+            'machine': str(rng.randint(1, machines)),
+            'description': f'{rng.choice(("Troca de", "Reparo de", "Ajuste de"))} {rng.choice(("rolamento", "correia", "sensor", "motor", "válvula"))}',
+            'status': status,
+            'opened': opened.isoformat(),
+            'closed': (opened + timedelta(days=rng.randint(0, 30))).isoformat() if status == 'Fechada' else None,
+        }
+    database = {'machine_inv': machine_inv, 'work_orders': work_orders}
+    return add_parts(database, parts, seed=seed) if parts else database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('machines', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--work-orders-per-machine', type=int, default=20)
+    parser.add_argument('--spec-rows', type=int, default=12)
+    parser.add_argument('--parts', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+    database = generate_fleet(arguments.machines, arguments.work_orders_per_machine, arguments.spec_rows, arguments.seed, arguments.parts)
+    with open(arguments.output, 'w') as snapshot_file:
+        json.dump(database, snapshot_file)
+
+
+if __name__ == '__main__':
+    main()
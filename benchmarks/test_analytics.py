@@ -0,0 +1,29 @@
+import numpy as np
+
+from conftest import NullJob
+
+
+def test_analytics_rebuild(benchmark, macopla, installed_fleet):
+    benchmark.pedantic(macopla.AnalyticsJob, args=(NullJob(),), rounds=3)
+
+
+def test_work_order_update(benchmark, macopla, installed_fleet):
+    # Closing a work order only trades its old contribution for the new one; the sums must end up where a rebuild puts them.
+    analytics = macopla.AnalyticsJob(NullJob())
+    code, order = next((code, order) for code, order in installed_fleet['work_orders'].items() if not order['closed'])
+    closed_order = order | {'status': 'Fechada', 'closed': '2024-01-01'}
+    current = [order]
+
+    def toggle():
+        next_order = closed_order if current[0] is order else order
+        analytics.ReplaceWorkOrder(current[0], next_order)
+        current[0] = next_order
+
+    benchmark.pedantic(toggle, rounds=1000)
+    if current[0] is order:
+        toggle()
+    rebuilt = macopla.MaintenanceAnalytics()
+    work_orders = dict(installed_fleet['work_orders']) | {code: closed_order}
+    rebuilt.Rebuild(installed_fleet['machine_inv'], macopla.WorkOrdersFrame(work_orders), [(key, record.get('procedures_history')) for key, record in installed_fleet['machine_inv'].items()])
+    for dimension in rebuilt.dimensions:
+        assert all(np.allclose(sums, analytics.sums[dimension][group]) for group, sums in rebuilt.sums[dimension].items())
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def store(macopla, tmp_path):
+    return macopla.AttachmentStore(str(tmp_path / 'attachments'))
+
+
+@pytest.fixture
+def photo(macopla, tmp_path):
+    from PyQt6.QtGui import QImage
+    path = str(tmp_path / 'photo.jpg')
+    image = QImage(4000, 3000, QImage.Format.Format_RGB32)
+    image.fill(0x3366CC)
+    image.save(path)
+    return path
+
+
+def test_ingest(benchmark, store, tmp_path):
+    # A new 64 MiB file each round, so every round hashes, copies and renames one into the store.
+    paths = iter(range(1_000_000))
+
+    def new_file():
+        path = str(tmp_path / f'manual-{next(paths)}.pdf')
+        with open(path, 'wb') as manual:
+            manual.write(os.urandom(64 << 20))
+        return (path,), {}
+
+    benchmark.pedantic(store.Ingest, setup=new_file, rounds=5)
+
+
+def test_ingest_duplicate(benchmark, store, tmp_path):
+    path = str(tmp_path / 'manual.pdf')
+    with open(path, 'wb') as manual:
+        manual.write(os.urandom(64 << 20))
+    store.Ingest(path)
+    benchmark.pedantic(store.Ingest, args=(path,), rounds=5)
+
+
+def test_thumbnail(benchmark, store, photo):
+    record = store.Ingest(photo)
+
+    def decode():
+        store.thumbnails.clear()
+        store.thumbnails_bytes = 0
+        return store.Thumbnail(record, 128)
+
+    benchmark(decode)
+
+
+def test_cached_thumbnail(benchmark, store, photo):
+    record = store.Ingest(photo)
+    store.Thumbnail(record, 128)
+    benchmark(store.Thumbnail, record, 128)
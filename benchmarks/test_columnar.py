@@ -0,0 +1,57 @@
+import json
+import tracemalloc
+
+import pytest
+
+MODES = ['records', 'columnar']
+
+
+def loaded_inventory(macopla, fleet, mode):
+    """The machine records as Load leaves them, details paged out, each string its own object; with the columnar inventory built and the records stripped in columnar mode."""
+    index_data = json.dumps({machine_key: {name: value for name, value in record.items() if name not in macopla.JournaledStorage.detail_fields} for machine_key, record in fleet['machine_inv'].items()})
+    machine_inv = json.loads(index_data)
+    columns = None
+    if mode == 'columnar':
+        columns = macopla.ColumnarInventory()
+        columns.Rebuild(machine_inv)
+        machine_inv = {machine_key: columns.Strip(record) for machine_key, record in machine_inv.items()}
+    return machine_inv, columns
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_inventory_memory(benchmark, macopla, fleet, mode):
+    # Timed is the whole load. The bytes held once it's done are measured after the timed rounds, so lazily imported modules aren't counted, and go to extra_info.
+    benchmark.pedantic(loaded_inventory, args=(macopla, fleet, mode), rounds=3)
+    tracemalloc.start()
+    try:
+        machine_inv, columns = loaded_inventory(macopla, fleet, mode)
+        held_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info.update(held_bytes=held_bytes, bytes_per_machine=round(held_bytes / len(machine_inv)))
+    some_key = next(iter(fleet['machine_inv']))
+    assert macopla.MachineRecord(some_key, machine_inv[some_key])['type'] == fleet['machine_inv'][some_key]['type']
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_status_filter(benchmark, macopla, fleet, mode):
+    machine_inv, columns = loaded_inventory(macopla, fleet, mode)
+    status = macopla.machine_statuses[1]
+    machine_keys = benchmark(macopla.MachinesWithStatus, machine_inv, columns, status)
+    assert sorted(machine_keys) == sorted(machine_key for machine_key, record in fleet['machine_inv'].items() if record.get('status', macopla.default_status) == status)
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_status_counts(benchmark, macopla, fleet, mode):
+    machine_inv, columns = loaded_inventory(macopla, fleet, mode)
+    status_counts = benchmark(macopla.MachineStatusCounts, machine_inv, columns)
+    assert sum(status_counts.values()) == len(fleet['machine_inv'])
+
+
+def test_stored_machine_is_read_only(macopla, fleet):
+    machine_inv, columns = loaded_inventory(macopla, fleet, 'columnar')
+    some_key = next(iter(machine_inv))
+    machine = macopla.StoredMachine(columns, some_key)
+    with pytest.raises(AttributeError):
+        machine.status = macopla.machine_statuses[0]
+    assert machine.type == fleet['machine_inv'][some_key]['type']
@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import NullJob
+
+
+@pytest.fixture
+def small_inventory(macopla, monkeypatch, tmp_path):
+    monkeypatch.setattr(macopla, 'main_db', {'machine_inv': {'1': {'type': 'Torno', 'id': 7, 'status': 'Operante'}, '2': {'type': 'Prensa'}}})
+    monkeypatch.setattr(macopla, 'main_db_storage', macopla.JournaledStorage(str(tmp_path / 'Maintenance Database.json')))
+    return macopla.main_db
+
+
+def test_import_updates_and_adds(macopla, small_inventory, tmp_path):
+    path = tmp_path / 'inventory.csv'
+    path.write_text('Chave,Tipo,ID,Status,Setor\n,,7,,Usinagem\n2,,,Inexistente,\n,,,,Solda\n,Fresa,9,,\n', encoding='utf-8')
+    import_rows, row_errors = macopla.ImportInventoryJob(NullJob(), str(path))
+    assert small_inventory['machine_inv']['1'] == {'type': 'Torno', 'id': 7, 'status': 'Operante'}  # Nothing is applied off the GUI thread.
+    imported_rows, apply_errors = macopla.ApplyInventoryImport(import_rows)
+    assert imported_rows == 2
+    assert row_errors == ['Linha 3: status "Inexistente" inválido'] and apply_errors == ['Linha 4: tipo vazio']
+    # A blank type or status on an existing machine's row leaves them as they were.
+    assert small_inventory['machine_inv']['1'] == {'type': 'Torno', 'id': 7, 'status': 'Operante', 'sector': 'Usinagem'}
+    assert small_inventory['machine_inv']['3'] == {'type': 'Fresa', 'id': 9}
@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+
+def legacy_database(path, machines=3):
+    """A single-file database as written before details had their own file: every spec sheet and history inline, no schema version."""
+    database = {'machine_inv': {str(machine_key): {'type': 'Torno', 'status': 'Operante', 'spec_sheet': {'A': ['Força', '10 KN']}, 'procedures_history': [{'procedure': 0, 'due_date': '2025-01-01', 'done_date': '2025-01-02'}]} for machine_key in range(1, machines + 1)}}
+    with open(path, 'w') as data_file:
+        json.dump(database, data_file)
+    return database
+
+
+def test_legacy_database_is_split_on_load(macopla, tmp_path):
+    path = str(tmp_path / 'Maintenance Database.json')
+    legacy = legacy_database(path)
+    storage = macopla.JournaledStorage(path)
+    database = storage.Load()
+    storage.SplitDetails(database)
+    assert storage.details_generation == 1
+    assert all('spec_sheet' not in record for record in database['machine_inv'].values())
+    assert storage.PageInDetails(database, '2') == legacy['machine_inv']['2']
+    reloaded_storage = macopla.JournaledStorage(path)
+    reloaded = reloaded_storage.Load()
+    assert set(reloaded_storage.details_index) == set(reloaded['machine_inv']) == set(legacy['machine_inv'])
+    assert os.path.getsize(path) < os.path.getsize(reloaded_storage.DetailsPath(1))
+
+
+def test_split_database_isnt_compacted_again(macopla, tmp_path):
+    path = str(tmp_path / 'Maintenance Database.json')
+    legacy_database(path)
+    storage = macopla.JournaledStorage(path)
+    storage.SplitDetails(storage.Load())
+    storage = macopla.JournaledStorage(path)
+    database = storage.Load()
+    storage.PageInDetails(database, '1')
+    storage.SplitDetails(database)
+    assert storage.details_generation == 1 and not os.path.exists(storage.DetailsPath(2))
+
+
+def compacted_database(macopla, path, machines=3):
+    """A database already split in index and details, at generation 1 with an empty journal."""
+    macopla.JournaledStorage(path).Compact(legacy_database(path, machines))
+    return path
+
+
+def set_and_commit(macopla, storage, database, path, value):
+    macopla.ApplyChange(database, 'set', list(path), value)
+    storage.RecordSet(path, value)
+    return storage.Commit(database)
+
+
+def test_torn_last_line_is_truncated(macopla, tmp_path):
+    path = compacted_database(macopla, str(tmp_path / 'Maintenance Database.json'))
+    storage = macopla.JournaledStorage(path)
+    database = storage.Load()
+    set_and_commit(macopla, storage, database, ('machine_inv', '1', 'status'), 'Em Manutenção')
+    valid_size = os.path.getsize(storage.journal_path)
+    with open(storage.journal_path, 'ab') as journal_file:
+        journal_file.write(b'{"op": "set", "path": ["machine_inv", "2", "sta')  # A save interrupted mid-write.
+    storage = macopla.JournaledStorage(path)
+    database = storage.Load()
+    assert os.path.getsize(storage.journal_path) == valid_size
+    assert database['machine_inv']['1']['status'] == 'Em Manutenção' and database['machine_inv']['2']['status'] == 'Operante'
+    set_and_commit(macopla, storage, database, ('machine_inv', '2', 'status'), 'Inoperante')
+    assert macopla.JournaledStorage(path).Load()['machine_inv']['2']['status'] == 'Inoperante'
+
+
+def test_compaction_then_replay(macopla, tmp_path):
+    path = compacted_database(macopla, str(tmp_path / 'Maintenance Database.json'))
+    reader, writer = macopla.JournaledStorage(path), macopla.JournaledStorage(path)
+    reader_db, writer_db = reader.Load(), writer.Load()
+    set_and_commit(macopla, writer, writer_db, ('machine_inv', '1', 'spec_sheet'), {'A': ['Força', '20 KN']})
+    writer.Compact(writer_db)
+    assert writer.details_generation == 2 and os.path.exists(writer.DetailsPath(1))  # Kept for workstations still reading generation 1.
+    assert reader.PageInDetails(reader_db, '3')['spec_sheet'] == {'A': ['Força', '10 KN']}
+    # Changes after the compaction are replayed over the new snapshot; the reader sees the new generation and reloads.
+    set_and_commit(macopla, writer, writer_db, ('machine_inv', '2', 'status'), 'Inoperante')
+    assert reader.HasRemoteChanges()
+    reader.Synchronize(reader_db)
+    assert reader.details_generation == 2 and reader.TakeRemoteChanges()[0] == [{'op': 'reload', 'path': []}]
+    assert reader_db['machine_inv']['2']['status'] == 'Inoperante'
+    assert reader.PageInDetails(reader_db, '1')['spec_sheet'] == {'A': ['Força', '20 KN']}
+    writer.Compact(writer_db)
+    assert writer.details_generation == 3 and not os.path.exists(writer.DetailsPath(1)) and os.path.exists(writer.DetailsPath(2))
+    reloaded = macopla.JournaledStorage(path).Load()
+    assert reloaded['machine_inv']['2']['status'] == 'Inoperante'
+
+
+def conflicting_saves(macopla, path):
+    """Two workstations edit the status of machine 1; the first one saves, the second one's save is refused."""
+    first, second = macopla.JournaledStorage(path), macopla.JournaledStorage(path)
+    first_db, second_db = first.Load(), second.Load()
+    set_and_commit(macopla, first, first_db, ('machine_inv', '1', 'status'), 'Em Manutenção')
+    with pytest.raises(macopla.SaveConflict) as conflict:
+        set_and_commit(macopla, second, second_db, ('machine_inv', '1', 'status'), 'Inoperante')
+    assert [change['path'] for change in conflict.value.changes] == [['machine_inv', '1', 'status']]
+    return second, second_db, conflict.value.changes
+
+
+def test_conflict_resolved_by_overwrite(macopla, tmp_path):
+    path = compacted_database(macopla, str(tmp_path / 'Maintenance Database.json'))
+    storage, database, conflicts = conflicting_saves(macopla, path)
+    storage.Overwrite(conflicts)
+    storage.Commit(database)
+    assert macopla.JournaledStorage(path).Load()['machine_inv']['1']['status'] == 'Inoperante'
+
+
+def test_conflict_resolved_by_discard(macopla, tmp_path):
+    path = compacted_database(macopla, str(tmp_path / 'Maintenance Database.json'))
+    storage, database, conflicts = conflicting_saves(macopla, path)
+    storage.Discard(database, conflicts)
+    assert not storage.HasPendingChanges() and database['machine_inv']['1']['status'] == 'Em Manutenção'
+    assert macopla.JournaledStorage(path).Load()['machine_inv']['1']['status'] == 'Em Manutenção'
+
+
+def test_record_versions_after_pull(macopla, tmp_path):
+    path = compacted_database(macopla, str(tmp_path / 'Maintenance Database.json'))
+    reader, writer = macopla.JournaledStorage(path), macopla.JournaledStorage(path)
+    reader_db, writer_db = reader.Load(), writer.Load()
+    macopla.ApplyChange(reader_db, 'set', ['machine_inv', '2', 'status'], 'Inoperante')
+    reader.RecordSet(('machine_inv', '2', 'status'), 'Inoperante')  # Based on version 0.
+    for machine_key, status in (('1', 'Inoperante'), ('2', 'Em Manutenção'), ('1', 'Operante')):
+        macopla.ApplyChange(writer_db, 'set', ['machine_inv', machine_key, 'status'], status)
+        writer.RecordSet(('machine_inv', machine_key, 'status'), status)
+    writer.Commit(writer_db)
+    reader.Synchronize(reader_db)
+    assert reader.RecordVersion(('machine_inv', '1')) == 3 and reader.RecordVersion(('machine_inv', '2')) == 2 and reader.RecordVersion(('machine_inv', '3')) == 0
+    assert reader.RecordVersion(('machine_inv',)) == 3 and reader.last_seq == 3
+    assert reader_db['machine_inv']['2']['status'] == 'Inoperante'  # The pending change is still shown over the pulled one.
+    assert [change['path'] for change in reader.Conflicts()] == [['machine_inv', '2', 'status']]
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import pytest
+
+from fleet import generate_fleet
+
+HORIZON_DAYS = 90
+
+
+@pytest.fixture(scope='module')
+def parts_fleet(fleet_size, request):
+    """A fleet with a spare part for every ten machines, 50 stock moves per part and the parts its procedures use."""
+    return generate_fleet(fleet_size, request.config.getoption('--work-orders-per-machine'), parts=max(1, fleet_size // 10))
+
+
+def scheduler(macopla, machine_inv):
+    scheduler = macopla.MaintenanceScheduler()
+    scheduler.Rebuild(machine_inv)
+    return scheduler
+
+
+def part_uses(macopla, machine_inv, planning_days=HORIZON_DAYS):
+    return macopla.PlannedPartUses(scheduler(macopla, machine_inv), date.today(), planning_days)
+
+
+def test_parts_rebuild(benchmark, macopla, parts_fleet):
+    inventory = macopla.PartsInventory()
+    benchmark.pedantic(inventory.Rebuild, args=(parts_fleet['part_ledger'], parts_fleet['part_reservations']), rounds=5)
+    part_key = next(iter(parts_fleet['parts']))
+    assert inventory.on_hand.get(part_key, 0) == sum(entry['quantity'] for entry in parts_fleet['part_ledger'].values() if entry['part'] == part_key)
+
+
+def test_parts_forecast(benchmark, macopla, parts_fleet):
+    # Planning included: PlannedPartUses runs in the forecast job too.
+    inventory = macopla.PartsInventory()
+    inventory.Rebuild(parts_fleet['part_ledger'], parts_fleet['part_reservations'])
+    fleet_scheduler = scheduler(macopla, parts_fleet['machine_inv'])
+
+    def forecast():
+        return inventory.Forecast(parts_fleet['parts'], parts_fleet['part_ledger'], macopla.PlannedPartUses(fleet_scheduler, date.today(), HORIZON_DAYS), horizon_days=HORIZON_DAYS)
+
+    result = benchmark.pedantic(forecast, rounds=5)
+    assert len(result) == len(parts_fleet['parts'])
+    assert (result['order_quantity'] >= 0).all()
+    assert (result['horizon_demand'] > result['daily_usage'] * HORIZON_DAYS).any()
+
+
+@pytest.mark.parametrize('last_done_intervals_ago', [0.5, 3], ids=['current', 'overdue'])
+def test_planned_consumption(macopla, last_done_intervals_ago):
+    # Planned demand against executions counted one day at a time; an overdue procedure is done once today and keeps its cadence.
+    database = generate_fleet(50, 2, parts=10)
+    today = date.today()
+    expected = {}
+    for record in database['machine_inv'].values():
+        for procedure in record['procedures_array']:
+            interval = timedelta(days=procedure['interval_days'])
+            procedure['last_done'] = (today - interval * last_done_intervals_ago).isoformat()
+            due_date = date.fromisoformat(procedure['last_done']) + interval
+            executions = [today] if due_date < today else []
+            while due_date < today:
+                due_date += interval
+            while due_date <= today + timedelta(days=HORIZON_DAYS):
+                executions.append(due_date)
+                due_date += interval
+            for _ in executions:
+                for part_key, quantity in procedure['parts'].items():
+                    expected[part_key] = expected.get(part_key, 0) + quantity
+    inventory = macopla.PartsInventory()
+    inventory.Rebuild({}, {})
+    forecast = inventory.Forecast(database['parts'], {}, part_uses(macopla, database['machine_inv']), horizon_days=HORIZON_DAYS)
+    assert dict(zip(forecast['part'], forecast['horizon_demand'])) == {part_key: expected.get(part_key, 0) for part_key in database['parts']}
+    assert sum(expected.values()) > 0
+
+
+def test_forecast_without_parts(macopla):
+    # Procedures may list parts before any is registered.
+    uses = part_uses(macopla, {'1': {'procedures_array': [{'name': 'Troca de Óleo', 'interval_days': 30, 'parts': {'P1': 2}}]}})
+    assert uses
+    assert macopla.PartsInventory().Forecast({}, {}, uses).empty
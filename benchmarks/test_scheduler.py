@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+TODAY = date(2026, 3, 10)
+
+
+def weekly_scheduler(macopla, last_done):
+    scheduler = macopla.MaintenanceScheduler()
+    scheduler.Rebuild({'1': {'procedures_array': [{'name': 'Lubrificação', 'interval_days': 7, 'last_done': last_done.isoformat()}]}})
+    return scheduler
+
+
+def test_overdue_weekly_procedure_keeps_recurring(macopla):
+    # Due yesterday: overdue, and still listed every week from yesterday on.
+    scheduler = weekly_scheduler(macopla, TODAY - timedelta(days=8))
+    assert [due_date for due_date, _, _ in scheduler.Overdue(TODAY)] == [TODAY - timedelta(days=1)]
+    upcoming = scheduler.DueBetween(TODAY, TODAY + timedelta(days=14), TODAY)
+    assert [(due_date, machine_key) for due_date, machine_key, _ in upcoming] == [(TODAY + timedelta(days=6), '1'), (TODAY + timedelta(days=13), '1')]
+    assert scheduler.DueBetween(TODAY, TODAY + timedelta(days=14), TODAY) == upcoming
+
+
+def test_current_weekly_procedure(macopla):
+    scheduler = weekly_scheduler(macopla, TODAY - timedelta(days=2))
+    assert scheduler.Overdue(TODAY) == []
+    assert [due_date for due_date, _, _ in scheduler.DueBetween(TODAY, TODAY + timedelta(days=14), TODAY)] == [TODAY + timedelta(days=5), TODAY + timedelta(days=12)]
+
+
+def test_rescheduled_procedure_leaves_overdue(macopla):
+    scheduler = weekly_scheduler(macopla, TODAY - timedelta(days=8))
+    scheduler.Overdue(TODAY)
+    scheduler.ScheduleMachine('1', {'procedures_array': [{'name': 'Lubrificação', 'interval_days': 7, 'last_done': TODAY.isoformat()}]})
+    assert scheduler.Overdue(TODAY) == []
+    assert [due_date for due_date, _, _ in scheduler.DueBetween(TODAY, TODAY + timedelta(days=14), TODAY)] == [TODAY + timedelta(days=7), TODAY + timedelta(days=14)]
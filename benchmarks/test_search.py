@@ -0,0 +1,36 @@
+import pytest
+
+QUERIES = {'broad': 'Torno', 'selective': 'Torno Romi A1', 'asset-id': '1500'}
+
+
+@pytest.mark.parametrize('query', QUERIES.values(), ids=QUERIES.keys())
+def test_search_query(benchmark, macopla, installed_fleet, query):
+    benchmark(macopla.main_search_index.Query, macopla.NormalizeSearchText(query))
+
+
+@pytest.mark.parametrize('query', QUERIES.values(), ids=QUERIES.keys())
+def test_search_list_model(benchmark, macopla, installed_fleet, query):
+    list_model = macopla.MachineListModel(installed_fleet['machine_inv'], macopla.main_search_index)
+    search_filter_text = macopla.NormalizeSearchText(query)
+    benchmark(lambda: list_model.SetFilter(search_filter_text, macopla.main_search_index.Query(search_filter_text)))
+
+
+def test_get_name_cold(benchmark, macopla, installed_fleet):
+    records = list(installed_fleet['machine_inv'].items())[:1000]
+
+    def new_machines():
+        return ([macopla.MachineFromRecord(record, machine_key) for machine_key, record in records],), {}
+
+    benchmark.pedantic(lambda machines: [machine.GetName() for machine in machines], setup=new_machines, rounds=20)
+
+
+def test_get_name_cached(benchmark, macopla, installed_fleet):
+    machines = [macopla.GetMachine(machine_key) for machine_key in list(installed_fleet['machine_inv'])[:1000]]
+    benchmark(lambda: [machine.GetName() for machine in machines])
+
+
+def test_search_index_rebuild(benchmark, macopla, fleet):
+    # The fleet's records carry their spec sheets and histories, like a legacy database or machines opened since the last load.
+    search_index = macopla.MachineSearchIndex()
+    benchmark.pedantic(search_index.Rebuild, args=(fleet['machine_inv'],), rounds=3)
+    assert len(search_index.search_texts) == len(fleet['machine_inv'])
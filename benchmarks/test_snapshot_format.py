@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+FORMATS = ['json', 'msgpack']
+
+
+def saved_snapshot(macopla, fleet, path, snapshot_format):
+    if snapshot_format == 'msgpack':
+        pytest.importorskip('msgpack')
+    storage = macopla.JournaledStorage(path)
+    storage.snapshot_format = snapshot_format
+    storage.Compact({'machine_inv': dict(fleet['machine_inv']), 'work_orders': fleet['work_orders']})
+    return storage
+
+
+@pytest.mark.parametrize('snapshot_format', FORMATS)
+def test_compact_format(benchmark, macopla, fleet, tmp_path, snapshot_format):
+    path = str(tmp_path / 'Maintenance Database.json')
+    storage = saved_snapshot(macopla, fleet, path, snapshot_format)
+    database = storage.Load()
+    benchmark.pedantic(storage.Compact, args=(database,), rounds=5)
+    details_path = f'{path}.details.{storage.details_generation}'
+    benchmark.extra_info.update(index_bytes=os.path.getsize(path), details_bytes=os.path.getsize(details_path))
+
+
+@pytest.mark.parametrize('snapshot_format', FORMATS)
+def test_load_format(benchmark, macopla, fleet, tmp_path, snapshot_format):
+    # Load reads the index only; details stay on disk until a machine is opened. ReadAllDetails then decodes every one of them, as the history tab does.
+    path = str(tmp_path / 'Maintenance Database.json')
+    saved_snapshot(macopla, fleet, path, snapshot_format)
+
+    def load_everything():
+        storage = macopla.JournaledStorage(path)
+        database = storage.Load()
+        histories = dict(storage.ReadAllDetails('procedures_history'))
+        return database, histories
+
+    database, histories = benchmark.pedantic(load_everything, rounds=5)
+    assert histories == {key: record.get('procedures_history') for key, record in json.loads(json.dumps(fleet['machine_inv'])).items()}
+    assert database['work_orders'] == json.loads(json.dumps(fleet['work_orders']))
+    assert len(database['machine_inv']) == len(fleet['machine_inv'])
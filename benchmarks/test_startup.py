@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+
+# Runs MaCoPlA.py as __main__ in a fresh interpreter. QApplication.exec is swapped for a function that records when the window has been shown, lets the
+# deferred startup run, waits for the database load to finish and returns instead of entering the event loop.
+DRIVER = '''
+import json, runpy, sys, time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+timings = {}
+def exec_once(app):
+    script_globals = sys._getframe(1).f_globals
+    timings['shown_s'] = time.perf_counter() - start
+    app.processEvents()
+    script_globals['job_manager'].WaitForDone()
+    app.processEvents()
+    timings['loaded_s'] = time.perf_counter() - start
+    timings['heavy_modules_at_show'] = heavy_modules
+    return 0
+QApplication.exec = exec_once
+heavy_modules = None
+import PyQt6.QtWidgets
+original_show = PyQt6.QtWidgets.QWidget.show
+def show(widget):
+    global heavy_modules
+    heavy_modules = sorted(name for name in ('numpy', 'pandas', 'unidecode') if name in sys.modules)
+    original_show(widget)
+PyQt6.QtWidgets.QWidget.show = show
+runpy.run_path(sys.argv[1], run_name='__main__')
+print(json.dumps(timings))
+'''
+
+
+def run_startup(work_dir):
+    environment = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    output = subprocess.run(
+        [sys.executable, '-c', DRIVER, str(REPO_ROOT / 'MaCoPlA.py')],
+        cwd=work_dir, env=environment, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def record_startup(benchmark, work_dir):
+    runs = []
+    benchmark.pedantic(lambda: runs.append(run_startup(work_dir)), rounds=5)
+    for name in ('shown_s', 'loaded_s'):
+        benchmark.extra_info[f'median_{name}'] = sorted(run[name] for run in runs)[len(runs) // 2]
+    benchmark.extra_info['heavy_modules_at_show'] = runs[-1]['heavy_modules_at_show']
+
+
+def test_cold_start_without_database(benchmark, tmp_path):
+    record_startup(benchmark, tmp_path)
+
+
+def test_cold_start(benchmark, macopla, fleet, tmp_path):
+    macopla.JournaledStorage(os.path.join(tmp_path, macopla.main_db_name)).Compact({'machine_inv': dict(fleet['machine_inv']), 'work_orders': fleet['work_orders']})
+    record_startup(benchmark, tmp_path)
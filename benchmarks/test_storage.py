@@ -0,0 +1,27 @@
+from conftest import NullJob
+
+
+def test_load(benchmark, macopla, snapshot_path):
+    benchmark.pedantic(lambda: macopla.JournaledStorage(snapshot_path).Load(), rounds=5)
+
+
+def test_load_and_build_indexes(benchmark, macopla, snapshot_path):
+    benchmark.pedantic(lambda: macopla.BuildDatabaseIndexes(NullJob(), macopla.JournaledStorage(snapshot_path).Load()), rounds=3)
+
+
+def test_save_changes(benchmark, macopla, installed_fleet):
+    machine_keys = list(installed_fleet['machine_inv'])[:100]
+    statuses = ('Operante', 'Em Manutenção')
+    rounds = iter(range(1_000_000))
+
+    def edit_machines():
+        status = statuses[next(rounds) % 2]
+        for machine_key in machine_keys:
+            macopla.SetRecord(('machine_inv', machine_key, 'status'), status)
+
+    # Few enough rounds that the journal never reaches the compaction threshold, which test_compaction covers.
+    benchmark.pedantic(macopla.SaveChanges, setup=edit_machines, rounds=50)
+
+
+def test_compaction(benchmark, macopla, installed_fleet):
+    benchmark.pedantic(macopla.main_db_storage.Compact, args=(installed_fleet,), rounds=3)
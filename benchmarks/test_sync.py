@@ -0,0 +1,24 @@
+def test_pull_remote_changes(benchmark, macopla, snapshot_path):
+    # Two storages on the same files stand in for two workstations. Each round the writer saves 100 machine edits and the reader pulls them, reading only the
+    # journal lines appended since its last pull. Compare with test_load for what a full reload costs.
+    reader, writer = macopla.JournaledStorage(snapshot_path), macopla.JournaledStorage(snapshot_path)
+    reader_db, writer_db = reader.Load(), writer.Load()
+    machine_keys = list(writer_db['machine_inv'])[:100]
+    statuses = ('Operante', 'Em Manutenção')
+    rounds = iter(range(1_000_000))
+
+    def save_remote_edits():
+        status = statuses[next(rounds) % 2]
+        for machine_key in machine_keys:
+            macopla.ApplyChange(writer_db, 'set', ['machine_inv', machine_key, 'status'], status)
+            writer.RecordSet(('machine_inv', machine_key, 'status'), status)
+        writer.Commit(writer_db)
+
+    benchmark.pedantic(reader.Synchronize, args=(reader_db,), setup=save_remote_edits, rounds=50)
+    assert all(reader_db['machine_inv'][machine_key]['status'] == writer_db['machine_inv'][machine_key]['status'] for machine_key in machine_keys)
+
+
+def test_poll_without_changes(benchmark, macopla, snapshot_path):
+    storage = macopla.JournaledStorage(snapshot_path)
+    storage.Load()
+    benchmark(storage.HasRemoteChanges)
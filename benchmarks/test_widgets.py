@@ -0,0 +1,37 @@
+import random
+
+import pytest
+from PyQt6 import sip
+
+from fleet import spec_sheet
+
+
+def build_and_delete(build_widget):
+    # Without an event loop deleteLater never runs, so each widget is destroyed right away.
+    def run():
+        widget = build_widget()
+        if widget is not None:
+            sip.delete(widget)
+    return run
+
+
+@pytest.mark.parametrize('spec_rows', (12, 2000))
+def test_spec_sheet_widget(benchmark, macopla, spec_rows):
+    record = {'type': 'Torno', 'spec_sheet': spec_sheet(random.Random(0), spec_rows), 'features_sheet': {'A': ['Características Gerais', 'Peso = 500kg'], 'B': ['', ''], 'C': ['', '']}}
+    machine = macopla.MachineFromRecord(record)
+    benchmark(build_and_delete(machine.GetSpecSheetWidget))
+
+
+def test_work_orders_frame(benchmark, macopla, installed_fleet):
+    benchmark.pedantic(macopla.WorkOrdersFrame, args=(installed_fleet['work_orders'],), rounds=3)
+
+
+def test_work_orders_sheet(benchmark, macopla, installed_fleet):
+    work_orders_sheet = macopla.WorkOrdersSheet(macopla.WorkOrdersFrame(installed_fleet['work_orders']))
+    benchmark.pedantic(build_and_delete(work_orders_sheet.GetSheet), rounds=5)
+
+
+def test_work_orders_sort(benchmark, macopla, installed_fleet):
+    work_orders_model = macopla.WorkOrdersModel(macopla.WorkOrdersFrame(installed_fleet['work_orders']))
+    columns = iter(range(1_000_000))
+    benchmark.pedantic(lambda: work_orders_model.sort(next(columns) % work_orders_model.columnCount()), rounds=6)
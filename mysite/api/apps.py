@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from maintenance.models import Machine, Procedure, ScheduleEntry, WorkOrder
+        from maintenance.signals import data_imported
+
+        from .cache import bump_data_version
+        from .streams import feed
+
+        for model in (Machine, Procedure, ScheduleEntry, WorkOrder):
+            post_save.connect(bump_data_version, sender=model, dispatch_uid=f'api_post_save_{model.__name__}')
+            post_delete.connect(bump_data_version, sender=model, dispatch_uid=f'api_post_delete_{model.__name__}')
+        data_imported.connect(bump_data_version, dispatch_uid='api_data_imported')
+
+        for model in (Machine, WorkOrder):
+            post_save.connect(feed.notify, sender=model, dispatch_uid=f'api_feed_post_save_{model.__name__}')
+            post_delete.connect(feed.notify, sender=model, dispatch_uid=f'api_feed_post_delete_{model.__name__}')
+        data_imported.connect(feed.notify, dispatch_uid='api_feed_data_imported')
@@ -0,0 +1,66 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+CACHE_ALIAS = 'api'
+# LocMem is per process: writes made by another process (e.g. the import command)
+# only reach a running server once its entries expire.
+CACHE_TIMEOUT = 300
+VERSION_KEY = 'api:data-version'
+
+
+def get_data_version():
+    return caches[CACHE_ALIAS].get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_data_version(**kwargs):
+    """Invalidate every cached response at once by moving to a new key namespace."""
+    cache = caches[CACHE_ALIAS]
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def cache_key(request, version):
+    # Sort the query string so that ?a=1&b=2 and ?b=2&a=1 share an entry.
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return f'api:{version}:{request.path}?{query}'
+
+
+def cached_json(view):
+    """
+    Per-view cache for GET endpoints returning JSON.
+
+    Responses are stored together with a content ETag, keyed by the current
+    data version, so conditional requests from clients that are up to date get
+    a 304 without touching the database or re-serializing anything.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        cache = caches[CACHE_ALIAS]
+        key = cache_key(request, get_data_version())
+        entry = cache.get(key)
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = (response.content, f'"{hashlib.md5(response.content).hexdigest()}"')
+            cache.set(key, entry, CACHE_TIMEOUT)
+        content, etag = entry
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    return wrapper
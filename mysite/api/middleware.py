@@ -0,0 +1,55 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger('api.timing')
+
+
+class TimingMiddleware:
+    """
+    Opt-in request timing for the API, enabled with ``API_INSTRUMENTATION = True``.
+
+    Each /api/ request is logged to the ``api.timing`` logger as one JSON line
+    and gets a Server-Timing header, so slow endpoints show up in the browser's
+    network panel as well as in the log. Streaming responses are logged when
+    the stream starts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'API_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+        start = time.perf_counter()
+        return self.record(request, self.get_response(request), start)
+
+    async def __acall__(self, request):
+        if not request.path.startswith('/api/'):
+            return await self.get_response(request)
+        start = time.perf_counter()
+        return self.record(request, await self.get_response(request), start)
+
+    def record(self, request, response, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        response['Server-Timing'] = f'app;dur={elapsed_ms:.1f}'
+        logger.info(json.dumps({
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'ms': round(elapsed_ms, 3),
+            'bytes': None if response.streaming else len(response.content),
+        }))
+        return response
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from maintenance.models import MachineStatusChange, WorkOrder
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_BACKLOG = 256
+
+MACHINE_STATUS = 'machine_status'
+WORK_ORDER = 'work_order'
+
+
+class Subscription:
+    def __init__(self, kinds, replay):
+        self.kinds = kinds
+        self.replay = replay
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+
+
+class ChangeFeed:
+    """
+    Single per-process source of fleet events for every streaming client.
+
+    While anyone is subscribed, one poller task reads the machine status
+    changes and work orders added since its last look, then fans each event
+    out to the subscribers' queues. Hundreds of open dashboards therefore cost
+    one indexed query per poll interval instead of one each. Status changes
+    are logged by database triggers, so writes from other processes and raw
+    SQL show up too; writes made through the ORM in this process wake the
+    poller early, so those reach clients without waiting a full interval. A
+    short history lets reconnecting clients resume from Last-Event-ID.
+
+    The poller runs on the event loop of the subscriber that started it and
+    is started again on the next subscriber's loop once that loop is closed.
+    Subscribers on other loops get their events through their own loop.
+    """
+
+    def __init__(self, poll_seconds, history=1000):
+        self.poll_seconds = poll_seconds
+        self.subscriptions = set()
+        self.history = deque(maxlen=history)
+        self.sequence = 0
+        self.last_status_change = None
+        self.last_work_order = None
+        self.loop = None
+        self.wakeup = None
+        self.poller = None
+
+    def subscribe(self, kinds, last_event_id=None):
+        replay = []
+        if last_event_id is not None:
+            replay = [event for event in self.history if event[0] > last_event_id and event[1] in kinds]
+        subscription = Subscription(kinds, replay)
+        self.subscriptions.add(subscription)
+        if self.poller is None or self.loop.is_closed():
+            # A poller whose loop was closed died with it, without clearing itself.
+            self.loop = subscription.loop
+            self.wakeup = asyncio.Event()
+            self.poller = self.loop.create_task(self.poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions:
+            self.notify()
+
+    def notify(self, **kwargs):
+        # Called from signal handlers and other loops, which may run on any thread.
+        if self.poller is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def publish(self, kind, data):
+        self.sequence += 1
+        event = (self.sequence, kind, data)
+        self.history.append(event)
+        for subscription in list(self.subscriptions):
+            if kind not in subscription.kinds:
+                continue
+            if subscription.loop is self.loop:
+                self.deliver(subscription, event)
+            elif subscription.loop.is_closed():
+                self.subscriptions.discard(subscription)
+            else:
+                subscription.loop.call_soon_threadsafe(self.deliver, subscription, event)
+
+    def deliver(self, subscription, event):
+        if subscription.queue is None:
+            return
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind gets disconnected and resumes
+            # from Last-Event-ID instead of holding events in memory.
+            self.unsubscribe(subscription)
+            subscription.queue = None
+
+    async def poll(self):
+        try:
+            while self.subscriptions:
+                await self.check()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_seconds)
+                except TimeoutError:
+                    pass
+                self.wakeup.clear()
+        finally:
+            if self.poller is asyncio.current_task():
+                self.poller = None
+
+    async def check(self):
+        if self.last_work_order is None:
+            self.last_status_change = await MachineStatusChange.objects.order_by('-id').values_list('id', flat=True).afirst() or 0
+            self.last_work_order = await WorkOrder.objects.order_by('-id').values_list('id', flat=True).afirst() or 0
+            return
+
+        status_changes = MachineStatusChange.objects.filter(id__gt=self.last_status_change).order_by('id').values(
+            'id', 'machine_key', 'status', 'previous',
+        )
+        async for change in status_changes:
+            self.last_status_change = change['id']
+            self.publish(MACHINE_STATUS, {'key': change['machine_key'], 'status': change['status'], 'previous': change['previous']})
+
+        new_orders = WorkOrder.objects.filter(id__gt=self.last_work_order).order_by('id').values(
+            'id', 'code', 'machine__key', 'description', 'status', 'opened', 'closed',
+        )
+        async for order in new_orders:
+            self.last_work_order = order.pop('id')
+            order['machine'] = order.pop('machine__key')
+            self.publish(WORK_ORDER, order)
+
+
+feed = ChangeFeed(getattr(settings, 'API_FEED_POLL_SECONDS', 2.0))
+
+
+def parse_last_event_id(request):
+    try:
+        return int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        return None
+
+
+def event_stream(request, kinds):
+    async def events():
+        subscription = feed.subscribe(kinds, parse_last_event_id(request))
+        try:
+            yield 'retry: 3000\n\n'
+            for event in subscription.replay:
+                yield format_event(event)
+            while subscription.queue is not None:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event(event)
+        finally:
+            feed.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def format_event(event):
+    sequence, kind, data = event
+    return f'id: {sequence}\nevent: {kind}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+@require_safe
+async def fleet_status_stream(request):
+    return event_stream(request, {MACHINE_STATUS})
+
+
+@require_safe
+async def work_order_stream(request):
+    return event_stream(request, {WORK_ORDER})
+
+
+@require_safe
+async def change_stream(request):
+    return event_stream(request, {MACHINE_STATUS, WORK_ORDER})
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import streams, views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('machines/', views.machine_list, name='machine-list'),
+    path('machines/<str:key>/', views.machine_detail, name='machine-detail'),
+    path('schedules/', views.schedule_list, name='schedule-list'),
+    path('work-orders/', views.work_order_list, name='work-order-list'),
+    path('work-orders/<str:code>/', views.work_order_detail, name='work-order-detail'),
+    path('stream/', streams.change_stream, name='change-stream'),
+    path('stream/fleet/', streams.fleet_status_stream, name='fleet-status-stream'),
+    path('stream/work-orders/', streams.work_order_stream, name='work-order-stream'),
+]
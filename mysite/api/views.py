@@ -0,0 +1,206 @@
+import base64
+import json
+from datetime import date
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from maintenance.models import Machine, ScheduleEntry, WorkOrder
+
+from .cache import cached_json
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Public field name -> ORM lookup. The sheets are large JSON blobs, so list
+# endpoints leave them out unless they are asked for explicitly.
+MACHINE_FIELDS = {
+    'key': 'key',
+    'type': 'type',
+    'manufacturer': 'manufacturer',
+    'model': 'model',
+    'supplier': 'supplier',
+    'sector': 'sector',
+    'asset_id': 'asset_id',
+    'acquisition_date': 'acquisition_date',
+    'status': 'status',
+    'spec_sheet': 'spec_sheet',
+    'features_sheet': 'features_sheet',
+}
+MACHINE_LIST_FIELDS = tuple(name for name in MACHINE_FIELDS if not name.endswith('_sheet'))
+
+SCHEDULE_FIELDS = {
+    'id': 'id',
+    'machine': 'machine__key',
+    'procedure': 'procedure__name',
+    'due_date': 'due_date',
+    'done': 'done',
+}
+
+WORK_ORDER_FIELDS = {
+    'code': 'code',
+    'machine': 'machine__key',
+    'description': 'description',
+    'status': 'status',
+    'opened': 'opened',
+    'closed': 'closed',
+}
+
+
+class ApiError(Exception):
+    pass
+
+
+def api_view(view):
+    @require_safe
+    @cached_json
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except (ApiError, ValidationError, ValueError) as error:
+            message = error.messages[0] if isinstance(error, ValidationError) else str(error)
+            return JsonResponse({'error': message}, status=400)
+
+    return wrapper
+
+
+def selected_fields(request, available, default):
+    if 'fields' not in request.GET:
+        return default
+    names = [name.strip() for name in request.GET['fields'].split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(f'Unknown fields: {", ".join(unknown)}.')
+    return names or default
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit must be an integer.')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def parse_date(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f'{name} must be an ISO date.')
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return value, int(pk)
+    except (ValueError, TypeError):
+        raise ApiError('Invalid cursor.')
+
+
+def keyset_page(request, queryset, fields, available, order_by, descending=False):
+    """
+    Return one page of ``queryset`` ordered by ``(order_by, id)``.
+
+    Instead of OFFSET, the ``cursor`` parameter carries the sort key of the
+    last row already sent, so every page is a bounded index range scan no
+    matter how deep the client has paged. ``order_by`` may be nullable; nulls
+    sort last in both directions.
+    """
+    limit = parse_limit(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        past = f'{order_by}__lt' if descending else f'{order_by}__gt'
+        pk_past = 'id__lt' if descending else 'id__gt'
+        if order_by == 'id':
+            queryset = queryset.filter(**{pk_past: pk})
+        elif value is None:
+            queryset = queryset.filter(**{f'{order_by}__isnull': True, pk_past: pk})
+        else:
+            queryset = queryset.filter(
+                Q(**{past: value}) | Q(**{order_by: value, pk_past: pk}) | Q(**{f'{order_by}__isnull': True})
+            )
+    column = F(order_by)
+    ordering = (column.desc(nulls_last=True), '-id') if descending else (column.asc(nulls_last=True), 'id')
+    lookups = [available[name] for name in fields]
+    rows = list(queryset.order_by(*ordering).values_list(order_by, 'id', *lookups)[:limit + 1])
+
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        query = request.GET.copy()
+        query['cursor'] = encode_cursor(rows[-1][:2])
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    return JsonResponse({
+        'results': [dict(zip(fields, row[2:])) for row in rows],
+        'next': next_url,
+    })
+
+
+def exact_filters(request, names):
+    return {name: request.GET[name] for name in names if request.GET.get(name)}
+
+
+@api_view
+def machine_list(request):
+    fields = selected_fields(request, MACHINE_FIELDS, MACHINE_LIST_FIELDS)
+    queryset = Machine.objects.filter(**exact_filters(request, ('type', 'manufacturer', 'model', 'supplier', 'sector', 'status')))
+    return keyset_page(request, queryset, fields, MACHINE_FIELDS, 'id')
+
+
+@api_view
+def machine_detail(request, key):
+    fields = selected_fields(request, MACHINE_FIELDS, tuple(MACHINE_FIELDS))
+    machine = Machine.objects.filter(key=key).values(*(MACHINE_FIELDS[name] for name in fields)).first()
+    if machine is None:
+        return JsonResponse({'error': 'Machine not found.'}, status=404)
+    return JsonResponse({name: machine[MACHINE_FIELDS[name]] for name in fields})
+
+
+@api_view
+def schedule_list(request):
+    fields = selected_fields(request, SCHEDULE_FIELDS, tuple(SCHEDULE_FIELDS))
+    queryset = ScheduleEntry.objects.all()
+    if request.GET.get('machine'):
+        queryset = queryset.filter(machine__key=request.GET['machine'])
+    if request.GET.get('done'):
+        queryset = queryset.filter(done=request.GET['done'].lower() in ('1', 'true', 'yes'))
+    if due_from := parse_date(request, 'due_from'):
+        queryset = queryset.filter(due_date__gte=due_from)
+    if due_to := parse_date(request, 'due_to'):
+        queryset = queryset.filter(due_date__lte=due_to)
+    return keyset_page(request, queryset, fields, SCHEDULE_FIELDS, 'due_date')
+
+
+@api_view
+def work_order_list(request):
+    fields = selected_fields(request, WORK_ORDER_FIELDS, tuple(WORK_ORDER_FIELDS))
+    queryset = WorkOrder.objects.filter(**exact_filters(request, ('status',)))
+    if request.GET.get('machine'):
+        queryset = queryset.filter(machine__key=request.GET['machine'])
+    if opened_from := parse_date(request, 'opened_from'):
+        queryset = queryset.filter(opened__gte=opened_from)
+    if opened_to := parse_date(request, 'opened_to'):
+        queryset = queryset.filter(opened__lte=opened_to)
+    return keyset_page(request, queryset, fields, WORK_ORDER_FIELDS, 'opened', descending=True)
+
+
+@api_view
+def work_order_detail(request, code):
+    fields = selected_fields(request, WORK_ORDER_FIELDS, tuple(WORK_ORDER_FIELDS))
+    work_order = WorkOrder.objects.filter(code=code).values(*(WORK_ORDER_FIELDS[name] for name in fields)).first()
+    if work_order is None:
+        return JsonResponse({'error': 'Work order not found.'}, status=404)
+    return JsonResponse({name: work_order[WORK_ORDER_FIELDS[name]] for name in fields})
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Machine, Procedure, ScheduleEntry, WorkOrder
+
+
+@admin.register(Machine)
+class MachineAdmin(admin.ModelAdmin):
+    list_display = ('key', 'type', 'manufacturer', 'model', 'sector', 'status')
+    list_filter = ('status', 'sector')
+    search_fields = ('type', 'manufacturer', 'model', 'asset_id')
+
+
+@admin.register(WorkOrder)
+class WorkOrderAdmin(admin.ModelAdmin):
+    list_display = ('code', 'machine', 'status', 'opened', 'closed')
+    list_filter = ('status',)
+    list_select_related = ('machine',)
+    raw_id_fields = ('machine',)
+
+
+admin.site.register(Procedure)
+admin.site.register(ScheduleEntry)
@@ -0,0 +1,179 @@
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from maintenance.models import Machine, Procedure, ScheduleEntry, WorkOrder
+from maintenance.signals import data_imported
+
+MACHINE_FIELDS = {
+    'type': 'type',
+    'manufacturer': 'manufacturer',
+    'model': 'model',
+    'supplier': 'supplier',
+    'sector': 'sector',
+    'id': 'asset_id',
+    'acquisition_date': 'acquisition_date',
+    'status': 'status',
+}
+
+
+DEFAULT_USAGE_HOURS_PER_DAY = 8
+
+SNAPSHOT_MAGIC = b'MaCoPlA\x00'
+
+
+def unpack_snapshot(data):
+    """Decode a binary snapshot, written with ``snapshot_format = msgpack``, and return it with the decoder for its details."""
+    try:
+        import msgpack
+    except ImportError:
+        raise CommandError('This is a binary snapshot and msgpack is not installed. Install it, or set snapshot_format = json '
+                           'in MaCoPlA.ini so the desktop app writes JSON at its next compaction.')
+    absent = object()
+    payload = msgpack.unpackb(data[len(SNAPSHOT_MAGIC) + 2:], ext_hook=lambda code, ext_data: absent)
+    database = payload['values']
+    for name, table in payload['tables'].items():
+        # Tables are stored by column; fields a record doesn't have are marked with an extension type.
+        database[name] = {
+            key: {field: value for field, value in zip(table['fields'], row) if value is not absent}
+            for key, row in zip(table['keys'], zip(*table['columns']))
+        }
+    return database, msgpack.unpackb
+
+
+def load_main_db(path):
+    """Read the desktop snapshot, its details file and change journal, like MaCoPlA.py does."""
+    database, decode_details = {'machine_inv': {}}, json.loads
+    if path.exists():
+        data = path.read_bytes()
+        database, decode_details = unpack_snapshot(data) if data.startswith(SNAPSHOT_MAGIC) else (json.loads(data), json.loads)
+    details_generation = database.pop('_details_generation', None)
+    if details_generation is not None:
+        with path.with_name(f'{path.name}.details.{details_generation}').open('rb') as details_file:
+            for record in database['machine_inv'].values():
+                offset, length = record.pop('_details')
+                details_file.seek(offset)
+                record.update(decode_details(details_file.read(length)))
+    journal_path = path.with_name(path.name + '.journal')
+    if journal_path.exists():
+        with journal_path.open('rb') as journal_file:
+            for line in journal_file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    break
+                if change['op'] == 'base':
+                    continue
+                container = database
+                for key in change['path'][:-1]:
+                    container = container.setdefault(key, {})
+                if change['op'] == 'set':
+                    container[change['path'][-1]] = change.get('value')
+                else:
+                    container.pop(change['path'][-1], None)
+    return database
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def next_due(procedure, usage_hours_per_day):
+    """The procedure's next due date, worked out like MaintenanceScheduler.NextDue in MaCoPlA.py; None if it doesn't recur."""
+    intervals = [timedelta(days=procedure['interval_days'])] if procedure.get('interval_days') else []
+    if procedure.get('interval_hours'):
+        intervals.append(timedelta(days=procedure['interval_hours'] / usage_hours_per_day))
+    if not intervals:
+        return None
+    last_done = parse_date(procedure.get('last_done'))
+    if last_done:
+        return last_done + min(intervals)
+    return parse_date(procedure.get('start')) or date.today()
+
+
+class Command(BaseCommand):
+    help = 'One-shot migration of the desktop "Maintenance Database.json" into the relational schema.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('json_path', type=Path)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--replace', action='store_true', help='Delete existing rows before importing.')
+
+    def handle(self, json_path, batch_size, replace, **options):
+        if not json_path.exists():
+            raise CommandError(f'{json_path} does not exist.')
+        main_db = load_main_db(json_path)
+        machine_inv = main_db.get('machine_inv', {})
+        work_orders = main_db.get('work_orders', {})
+
+        with transaction.atomic():
+            if replace:
+                WorkOrder.objects.all().delete()
+                Machine.objects.all().delete()
+            Machine.objects.bulk_create(
+                (
+                    Machine(
+                        key=str(key),
+                        spec_sheet=record.get('spec_sheet') or {},
+                        features_sheet=record.get('features_sheet') or {},
+                        **{field: str(record[name]) for name, field in MACHINE_FIELDS.items() if name in record},
+                    )
+                    for key, record in machine_inv.items()
+                ),
+                batch_size=batch_size,
+            )
+            machine_pks = dict(Machine.objects.values_list('key', 'pk'))
+
+            procedures, schedule = [], []
+            for key, record in machine_inv.items():
+                for procedure in record.get('procedures_array', ()):
+                    procedures.append(Procedure(
+                        machine_id=machine_pks[str(key)],
+                        name=procedure.get('name', ''),
+                        description=procedure.get('description', ''),
+                        interval_days=procedure.get('interval_days'),
+                        interval_hours=procedure.get('interval_hours'),
+                    ))
+            Procedure.objects.bulk_create(procedures, batch_size=batch_size)
+            procedure_pks = {
+                (machine_pk, name): pk for pk, machine_pk, name in Procedure.objects.values_list('pk', 'machine_id', 'name')
+            }
+            # The desktop app keeps no schedule, only each procedure's interval and last execution; every procedure gets one pending entry, its next due date.
+            for key, record in machine_inv.items():
+                machine_pk = machine_pks[str(key)]
+                usage_hours_per_day = record.get('usage_hours_per_day') or DEFAULT_USAGE_HOURS_PER_DAY
+                for procedure in record.get('procedures_array', ()):
+                    due_date = next_due(procedure, usage_hours_per_day)
+                    procedure_pk = procedure_pks.get((machine_pk, procedure.get('name', '')))
+                    if due_date and procedure_pk:
+                        schedule.append(ScheduleEntry(procedure_id=procedure_pk, machine_id=machine_pk, due_date=due_date))
+            ScheduleEntry.objects.bulk_create(schedule, batch_size=batch_size)
+
+            WorkOrder.objects.bulk_create(
+                (
+                    WorkOrder(
+                        code=str(code),
+                        machine_id=machine_pks.get(str(order.get('machine'))),
+                        description=order.get('description', ''),
+                        status=order.get('status', ''),
+                        opened=parse_date(order.get('opened')),
+                        closed=parse_date(order.get('closed')),
+                    )
+                    for code, order in work_orders.items()
+                ),
+                batch_size=batch_size,
+            )
+
+        data_imported.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(machine_pks)} machines, {len(procedures)} procedures, '
+            f'{len(schedule)} schedule entries and {len(work_orders)} work orders.'
+        ))
@@ -0,0 +1,77 @@
+# Generated by Django 5.0 on 2026-10-18 13:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Machine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('type', models.CharField(max_length=128)),
+                ('manufacturer', models.CharField(default='Desconhecido', max_length=128)),
+                ('model', models.CharField(default='Desconhecido', max_length=128)),
+                ('supplier', models.CharField(default='Desconhecido', max_length=128)),
+                ('sector', models.CharField(default='Não se aplica', max_length=128)),
+                ('asset_id', models.CharField(default='Não consta', max_length=64)),
+                ('acquisition_date', models.CharField(default='Desconhecida', max_length=32)),
+                ('status', models.CharField(default='Operante', max_length=32)),
+                ('spec_sheet', models.JSONField(blank=True, default=dict)),
+                ('features_sheet', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'ordering': ['type', 'manufacturer', 'model', 'id'],
+                'indexes': [models.Index(fields=['sector'], name='machine_sector_idx'), models.Index(fields=['status'], name='machine_status_idx'), models.Index(fields=['manufacturer'], name='machine_manufacturer_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Procedure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128)),
+                ('description', models.TextField(blank=True)),
+                ('interval_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('interval_hours', models.PositiveIntegerField(blank=True, null=True)),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='procedures', to='maintenance.machine')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField()),
+                ('done', models.BooleanField(default=False)),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='maintenance.machine')),
+                ('procedure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='maintenance.procedure')),
+            ],
+            options={
+                'ordering': ['due_date'],
+                'indexes': [models.Index(fields=['due_date'], name='schedule_due_date_idx'), models.Index(fields=['done', 'due_date'], name='schedule_pending_due_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=64, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(max_length=32)),
+                ('opened', models.DateField(blank=True, null=True)),
+                ('closed', models.DateField(blank=True, null=True)),
+                ('machine', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='work_orders', to='maintenance.machine')),
+            ],
+            options={
+                'ordering': ['-opened', 'code'],
+                'indexes': [models.Index(fields=['status'], name='workorder_status_idx'), models.Index(fields=['opened'], name='workorder_opened_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations, models
+
+SQLITE_TRIGGERS = [
+    '''CREATE TRIGGER maintenance_machine_status_insert AFTER INSERT ON maintenance_machine
+       BEGIN INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (NEW.key, NEW.status, NULL); END''',
+    '''CREATE TRIGGER maintenance_machine_status_update AFTER UPDATE OF status ON maintenance_machine WHEN OLD.status IS NOT NEW.status
+       BEGIN INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (NEW.key, NEW.status, OLD.status); END''',
+    '''CREATE TRIGGER maintenance_machine_status_delete AFTER DELETE ON maintenance_machine
+       BEGIN INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (OLD.key, NULL, OLD.status); END''',
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS maintenance_machine_status_insert',
+    'DROP TRIGGER IF EXISTS maintenance_machine_status_update',
+    'DROP TRIGGER IF EXISTS maintenance_machine_status_delete',
+]
+
+POSTGRESQL_TRIGGERS = [
+    '''CREATE FUNCTION maintenance_machine_status_log() RETURNS trigger AS $$
+       BEGIN
+           IF TG_OP = 'DELETE' THEN
+               INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (OLD.key, NULL, OLD.status);
+               RETURN OLD;
+           ELSIF TG_OP = 'INSERT' THEN
+               INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (NEW.key, NEW.status, NULL);
+           ELSIF NEW.status IS DISTINCT FROM OLD.status THEN
+               INSERT INTO maintenance_machinestatuschange (machine_key, status, previous) VALUES (NEW.key, NEW.status, OLD.status);
+           END IF;
+           RETURN NEW;
+       END $$ LANGUAGE plpgsql''',
+    '''CREATE TRIGGER maintenance_machine_status_log AFTER INSERT OR UPDATE OF status OR DELETE ON maintenance_machine
+       FOR EACH ROW EXECUTE FUNCTION maintenance_machine_status_log()''',
+]
+POSTGRESQL_DROP = [
+    'DROP TRIGGER IF EXISTS maintenance_machine_status_log ON maintenance_machine',
+    'DROP FUNCTION IF EXISTS maintenance_machine_status_log()',
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor not in statements:
+            raise NotImplementedError(f'No machine status triggers for {vendor}.')
+        for statement in statements[vendor]:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MachineStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('machine_key', models.CharField(max_length=64)),
+                ('status', models.CharField(max_length=32, null=True)),
+                ('previous', models.CharField(max_length=32, null=True)),
+            ],
+        ),
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_TRIGGERS, 'postgresql': POSTGRESQL_TRIGGERS}),
+            run_statements({'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP}),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import models
+
+
+class Machine(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    type = models.CharField(max_length=128)
+    manufacturer = models.CharField(max_length=128, default='Desconhecido')
+    model = models.CharField(max_length=128, default='Desconhecido')
+    supplier = models.CharField(max_length=128, default='Desconhecido')
+    sector = models.CharField(max_length=128, default='Não se aplica')
+    asset_id = models.CharField(max_length=64, default='Não consta')
+    acquisition_date = models.CharField(max_length=32, default='Desconhecida')
+    status = models.CharField(max_length=32, default='Operante')
+    spec_sheet = models.JSONField(default=dict, blank=True)
+    features_sheet = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['type', 'manufacturer', 'model', 'id']
+        indexes = [
+            models.Index(fields=['sector'], name='machine_sector_idx'),
+            models.Index(fields=['status'], name='machine_status_idx'),
+            models.Index(fields=['manufacturer'], name='machine_manufacturer_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.type} {self.manufacturer} {self.model}'
+
+
+class MachineStatusChange(models.Model):
+    """
+    Log of machine status changes, appended by database triggers (see
+    migration 0002) on every insert, status update and delete, whoever makes
+    it. ``status`` is null for a deleted machine, ``previous`` for a new one.
+    """
+
+    machine_key = models.CharField(max_length=64)
+    status = models.CharField(max_length=32, null=True)
+    previous = models.CharField(max_length=32, null=True)
+
+
+class Procedure(models.Model):
+    machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='procedures')
+    name = models.CharField(max_length=128)
+    description = models.TextField(blank=True)
+    interval_days = models.PositiveIntegerField(null=True, blank=True)
+    interval_hours = models.PositiveIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ScheduleEntry(models.Model):
+    procedure = models.ForeignKey(Procedure, on_delete=models.CASCADE, related_name='schedule')
+    machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='schedule')
+    due_date = models.DateField()
+    done = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['due_date'], name='schedule_due_date_idx'),
+            models.Index(fields=['done', 'due_date'], name='schedule_pending_due_idx'),
+        ]
+
+
+class WorkOrder(models.Model):
+    code = models.CharField(max_length=64, unique=True)
+    machine = models.ForeignKey(Machine, on_delete=models.SET_NULL, null=True, blank=True, related_name='work_orders')
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=32)
+    opened = models.DateField(null=True, blank=True)
+    closed = models.DateField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-opened', 'code']
+        indexes = [
+            models.Index(fields=['status'], name='workorder_status_idx'),
+            models.Index(fields=['opened'], name='workorder_opened_idx'),
+        ]
+
+    def __str__(self):
+        return self.code
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent after bulk writes that bypass post_save/post_delete, e.g. bulk_create in the import command.
+data_imported = Signal()
@@ -3,6 +3,10 @@ ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The Server-Sent Events streams under /api/stream/ hold a connection open per
+client and need this entry point, e.g. ``uvicorn mysite.asgi:application``;
+under WSGI each open stream would tie up a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -37,9 +37,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'maintenance',
+    'api',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,6 +84,51 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The API keeps rendered responses per process; entries are invalidated through
+# a data version bumped on every write (see api/cache.py).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+
+# Request timing for /api/, logged as JSON lines to api-timing.jsonl (see api/middleware.py).
+
+API_INSTRUMENTATION = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'api_timing': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'api-timing.jsonl',
+            'maxBytes': 1 << 20,
+            'backupCount': 3,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['api_timing'] if API_INSTRUMENTATION else [],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 